@@ -0,0 +1,142 @@
+"""Tự defer interaction khi handler chưa trả lời kịp hạn 3 giây của Discord.
+
+Mỗi slash command được gắn một ``AutoDeferResponse`` (thay cho
+``interaction.response``). Nếu sau ``budget`` giây handler vẫn chưa trả lời,
+response tự ``defer(thinking=True)``; các lời gọi ``send_message`` sau đó được
+chuyển sang ``interaction.followup`` nên handler không cần sửa gì.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Optional, TypeVar
+
+import discord
+from discord import app_commands
+
+from diagnostics import DeferStats
+
+T = TypeVar("T", bound=app_commands.Command)
+
+# ``Interaction.response`` là cached slot property lưu ở ``_cs_response`` (đã
+# kiểm tra với discord.py 2.7.1). Đây là chi tiết nội bộ: nếu bản discord.py
+# khác đổi cách lưu thì tắt auto-defer thay vì gán nhầm thuộc tính.
+_RESPONSE_SLOT = "_cs_response"
+_CAN_SWAP_RESPONSE = (
+    isinstance(discord.Interaction.__dict__.get("response"), discord.utils.CachedSlotProperty)
+    and getattr(discord.Interaction.__dict__["response"], "name", None) == _RESPONSE_SLOT
+)
+if not _CAN_SWAP_RESPONSE:
+    print(
+        f"⚠️ discord.py {discord.__version__}: không thay được Interaction.response "
+        "→ tắt auto-defer"
+    )
+
+
+def auto_defer(*, ephemeral: bool = False) -> Callable[[T], T]:
+    """Chọn kiểu "đang suy nghĩ…" khi lệnh bị defer tự động.
+
+    Đặt phía trên ``@app_commands.command`` cho lệnh mà câu trả lời chậm là tin
+    nhắn ẩn (vd: lệnh gửi DM rồi báo kết quả cho riêng người gọi).
+    """
+
+    def decorator(command: T) -> T:
+        command.extras["defer_ephemeral"] = ephemeral
+        return command
+
+    return decorator
+
+
+class AutoDeferResponse(discord.InteractionResponse):
+    """InteractionResponse tự defer khi quá hạn và chuyển tin nhắn muộn sang followup."""
+
+    __slots__ = ("_stats", "_lock", "_watcher", "_auto_deferred", "_deferred_ephemeral", "_pending")
+
+    def __init__(self, parent: discord.Interaction, stats: DeferStats):
+        super().__init__(parent)
+        self._stats = stats
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+        self._auto_deferred = False
+        self._deferred_ephemeral = False
+        # Tin "đang suy nghĩ…" chưa được thay bằng câu trả lời thật
+        self._pending = False
+
+    @classmethod
+    def install(
+        cls, interaction: discord.Interaction, stats: DeferStats, budget: float
+    ) -> Optional[AutoDeferResponse]:
+        """Gắn vào interaction của slash command và bắt đầu đếm giờ."""
+        command = interaction.command
+        if (
+            budget <= 0
+            or not _CAN_SWAP_RESPONSE
+            or not isinstance(command, app_commands.Command)
+        ):
+            return None
+        response = cls(interaction, stats)
+        try:
+            setattr(interaction, _RESPONSE_SLOT, response)
+        except AttributeError:
+            return None
+        if interaction.response is not response:
+            return None
+        stats.record_call(command.qualified_name)
+        response._watcher = asyncio.create_task(
+            response._watch(budget, command.extras.get("defer_ephemeral", False))
+        )
+        return response
+
+    def stop(self):
+        """Handler đã chạy xong → không defer nữa."""
+        if self._watcher and not self._watcher.done():
+            self._watcher.cancel()
+
+    async def _watch(self, budget: float, ephemeral: bool):
+        await asyncio.sleep(budget)
+        async with self._lock:
+            if self.is_done():
+                return
+            try:
+                await super().defer(ephemeral=ephemeral, thinking=True)
+            except discord.HTTPException as e:
+                print(f"⚠️ Không defer được /{self._parent.command.qualified_name}: {e}")
+                return
+            self._auto_deferred = True
+            self._deferred_ephemeral = ephemeral
+            self._pending = True
+        self._stats.record_deferred(self._parent.command.qualified_name)
+
+    # ------------------------------------------------------------------
+    # InteractionResponse
+    # ------------------------------------------------------------------
+
+    async def defer(self, **kwargs) -> Any:
+        async with self._lock:
+            if self._auto_deferred:
+                return None
+            return await super().defer(**kwargs)
+
+    async def send_message(self, content: Optional[Any] = None, **kwargs) -> Any:
+        async with self._lock:
+            if not self._auto_deferred:
+                return await super().send_message(content, **kwargs)
+            return await self._send_followup(content, **kwargs)
+
+    async def _send_followup(self, content: Optional[Any], **kwargs):
+        delete_after = kwargs.pop("delete_after", None)
+        ephemeral = kwargs.get("ephemeral", False)
+
+        if self._pending and ephemeral and not self._deferred_ephemeral:
+            # Followup đầu tiên sẽ thay tin "đang suy nghĩ…" công khai → xoá tin
+            # đó trước để câu trả lời ẩn không bị lộ ra kênh
+            try:
+                await self._parent.delete_original_response()
+            except discord.HTTPException:
+                pass
+        self._pending = False
+
+        message = await self._parent.followup.send(content, wait=True, **kwargs)
+        if delete_after is not None:
+            await message.delete(delay=delete_after)
+        return None
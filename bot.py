@@ -1,49 +1,581 @@
+import asyncio
+import hashlib
+import json
+import math
+import os
+import pickle
+import signal
+import time
+
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
+import config
+from auto_defer import AutoDeferResponse
+from cluster import ClusterCoordinator
+from diagnostics import DeferStats, ShardMetrics, memory_usage_mb
+from dm_service import DMService
 from enums import GameState, GameType, GameInterval
+from game_registry import CORE_EXTENSIONS, GameRegistry
 from games.base_game import BaseGame
-from games.li_xi_game import LiXiNgayTetGame
-from games.kro_game import KRoGame
-from games.jco_game import JCoGame
-from games.chen_thanh_game import ChenThanhGame
-from games.arena_game import ArenaGame
+from loop_watchdog import LoopWatchdog
+from profile_store import ProfileStore
+from sampling_profiler import SamplingProfiler
+from sessions import SessionRouter, current_guild_id
+from state_backend import SQLiteBackend, StateBackend, create_backend
+
+
+class MinigameTree(app_commands.CommandTree):
+    """Command tree gắn mỗi interaction với game của guild tương ứng."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        bot: MinigameBot = self.client
+        if bot.shutting_down:
+            # Đang lưu snapshot để tắt: không nhận thêm hành động nào
+            await interaction.response.send_message(
+                "🔄 Bot đang khởi động lại, thử lại sau ít giây!", ephemeral=True
+            )
+            return False
+        bot.in_flight.add(interaction.id)
+        guild_id = bot.sessions.resolve_guild(interaction)
+        # Chạy trong task riêng của interaction nên không ảnh hưởng lệnh khác
+        current_guild_id.set(guild_id)
+        bot.shard_metrics.record_event(bot.sessions.shard_for(interaction.guild_id))
+        # Handler chậm (fetch_user, DM...) → tự defer trước hạn 3 giây
+        AutoDeferResponse.install(interaction, bot.defer_stats, config.AUTO_DEFER_MS / 1000)
+        return True
+
 
+# Nhiều guild: AutoShardedBot tự chia shard (số shard do Discord đề xuất)
+_BotBase = commands.AutoShardedBot if config.SHARDING else commands.Bot
 
-class MinigameBot(commands.Bot):
+
+class MinigameBot(_BotBase):
     def __init__(self):
         intents = discord.Intents.default()
-        intents.message_content = True
-        intents.members = True
+        intents.message_content = config.ENABLE_PREFIX_COMMANDS
+        cache_all_members = config.MEMBER_CACHE_POLICY == "all"
+        intents.members = cache_all_members
 
         super().__init__(
             command_prefix="g!",
             intents=intents,
             help_command=None,
+            member_cache_flags=(
+                discord.MemberCacheFlags.from_intents(intents)
+                if cache_all_members
+                else discord.MemberCacheFlags.none()
+            ),
+            chunk_guilds_at_startup=config.CHUNK_GUILDS_AT_STARTUP,
+            max_messages=config.MAX_MESSAGES or None,
+            tree_cls=MinigameTree,
+            **self._shard_options(),
+        )
+
+        # Mỗi guild một game; current_game trỏ tới game của guild đang xử lý
+        self.sessions = SessionRouter(self)
+        self.shard_metrics = ShardMetrics()
+        self.defer_stats = DeferStats()
+        self.dm = DMService(
+            self, config.DM_CONCURRENCY, config.DM_MAX_RETRIES, config.DM_FORBIDDEN_TTL_SECONDS
+        )
+        # Kết quả các game đã kết thúc (dùng cho /profile)
+        self.profiles = ProfileStore(config.PROFILE_DB_PATH)
+        # Sampling profiler bật bằng /profiler hoặc HTTP (mặc định không chạy)
+        self.profiler = SamplingProfiler(
+            config.PROFILER_INTERVAL_MS / 1000, config.PROFILER_MAX_SECONDS
+        )
+        # Độ trễ event loop + stack của callback chặn loop (xem /metrics)
+        self.watchdog: Optional[LoopWatchdog] = (
+            LoopWatchdog(
+                config.LOOP_WATCHDOG_INTERVAL_MS / 1000,
+                config.LOOP_BLOCK_THRESHOLD_MS / 1000,
+                config.LOOP_LAG_WINDOW_SECONDS,
+            )
+            if config.LOOP_BLOCK_THRESHOLD_MS > 0
+            else None
+        )
+
+        # Nhiều worker: snapshot game + lease trong state backend dùng chung
+        backend = create_backend(config.STATE_BACKEND, config.STATE_DB_PATH)
+        self.cluster: Optional[ClusterCoordinator] = (
+            ClusterCoordinator(self, backend, config.WORKER_ID, config.LEASE_SECONDS)
+            if backend
+            else None
+        )
+        # Snapshot lúc tắt bot: dùng chung backend với cluster, không thì file riêng
+        self.snapshots: StateBackend = (
+            self.cluster.backend if self.cluster else SQLiteBackend(config.SNAPSHOT_DB_PATH)
         )
+        self.shutting_down = False
+        # Interaction đang xử lý (chờ xong trước khi chụp snapshot lúc tắt)
+        self.in_flight: set = set()
+        self._restored = False
+
+        enabled = [
+            gt for gt in GameType
+            if not config.ENABLED_GAMES or gt.value in config.ENABLED_GAMES
+        ]
+        self.games = GameRegistry(self, enabled)
+
+        # Mốc khởi động để đo time-to-ready
+        self.boot_started = time.perf_counter()
+        self.time_to_ready: Optional[float] = None
+
+    @staticmethod
+    def _shard_options() -> dict:
+        if not config.SHARDING:
+            return {}
+        options = {"shard_count": config.SHARD_COUNT}
+        if config.SHARD_IDS:
+            options["shard_ids"] = config.SHARD_IDS
+        elif config.WORKER_COUNT > 1:
+            if not config.SHARD_COUNT:
+                raise ValueError("WORKER_COUNT > 1 cần đặt SHARD_COUNT")
+            # Chia đều shard cho các worker: worker i nhận shard i, i + N, ...
+            options["shard_ids"] = list(
+                range(config.WORKER_ID, config.SHARD_COUNT, config.WORKER_COUNT)
+            )
+        return options
+
+    # ------------------------------------------------------------------
+    # Game của guild hiện tại
+    # ------------------------------------------------------------------
+
+    @property
+    def current_game(self) -> Optional[BaseGame]:
+        session = self.sessions.current
+        return session.game if session else None
+
+    async def host_game(self, game: BaseGame) -> bool:
+        """Gắn game mới vào guild hiện tại. False nếu worker khác đang giữ
+        lease của guild (game không được gắn)."""
+        guild_id = current_guild_id.get()
+        if self.cluster:
+            blob = self.cluster.snapshot(guild_id, game)
+            if not await asyncio.to_thread(self.cluster.claim, guild_id, blob):
+                return False
+        elif guild_id is not None:
+            # Snapshot cũ chưa khôi phục được (guild outage, game bị tắt...) đã
+            # bị game mới thay → bỏ để lần khởi động sau không khôi phục nhầm
+            await asyncio.to_thread(self.snapshots.delete_game, str(guild_id))
+        self.sessions.set_current(game)
+        return True
+
+    async def end_current_game(self):
+        """Gỡ game của guild hiện tại; nhiều worker thì xoá snapshot + trả lease."""
+        guild_id = current_guild_id.get()
+        self.sessions.set_current(None)
+        if self.cluster:
+            await asyncio.to_thread(self.cluster.release, guild_id)
+
+    async def confirm_lease(self, game: BaseGame) -> bool:
+        """Worker này còn giữ game không (luôn True khi chạy một process).
+
+        Round loop gọi ngay trước khi xử lý vòng để hai worker không cùng
+        resolve một vòng.
+        """
+        if not self.cluster:
+            return True
+        return await self.cluster.confirm(game.guild_id)
+
+    @property
+    def current_game_type(self) -> Optional[GameType]:
+        game = self.current_game
+        return game.game_type if game else None
+
+    async def archive_game(self, game: BaseGame):
+        """Lưu kết quả game vừa kết thúc vào profile store (mỗi game một lần).
+
+        Transaction SQLite chạy trong thread: DB dùng chung giữa các worker có
+        thể bị khoá tới ``timeout`` giây, không được chặn event loop.
+        """
+        if game.archived or game.start_time is None or game.game_type is None:
+            return
+        game.archived = True
+        try:
+            results = game.get_results()
+            if results:
+                game_id = await asyncio.to_thread(
+                    self.profiles.record_game,
+                    game.guild_id, game.game_type.value, results,
+                )
+                self.profiles.apply_to_ranks(
+                    game_id, game.guild_id, game.game_type.value, results
+                )
+        except Exception as e:
+            print(f"⚠️ Không lưu được kết quả game guild {game.guild_id}: {e}")
+
+    def get_round_cog(self, game: BaseGame):
+        """Cog chạy vòng lặp của game (None nếu game không chạy theo vòng)."""
+        plugin = self.games.get(game.game_type)
+        cog = self.get_cog(plugin.cog_name) if plugin else None
+        if cog and hasattr(cog, "start_round_loop"):
+            return cog
+        return None
+
+    def start_round_loop(self, game: BaseGame) -> bool:
+        """Chạy round loop của game trong cog hiện tại (task gắn với guild của game).
 
-        self.current_game: Optional[BaseGame] = None
-        self.current_game_type: Optional[GameType] = None
+        Vòng lặp đang chạy thì giữ nguyên. Trả về False nếu game không chạy theo vòng.
+        """
+        cog = self.get_round_cog(game)
+        if cog is None:
+            return False
+        if game.round_task is None or game.round_task.done():
+            # Task kế thừa guild đang bind
+            with self.sessions.bind(game.guild_id):
+                game.round_task = asyncio.create_task(cog.start_round_loop())
+        return True
 
     async def setup_hook(self):
-        # Load command cogs
-        await self.load_extension("commands.host_commands")
-        await self.load_extension("commands.user_commands")
-        await self.load_extension("commands.lixi_commands")
-        await self.load_extension("commands.kro_commands")
-        await self.load_extension("commands.jco_commands")
-        await self.load_extension("commands.chen_thanh_commands")
-        await self.load_extension("commands.arena_commands")
-
-        await self.tree.sync()
-        print("Commands synced!")
+        if self.watchdog:
+            self.watchdog.start()
+
+        # Cog chung nạp ngay; cog của từng game nạp ở lần /host đầu tiên
+        for name in CORE_EXTENSIONS:
+            await self.games.load_extension(name)
+
+        # SIGTERM (redeploy) → tắt êm như Ctrl+C: lưu snapshot rồi mới thoát
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.create_task(self.close())
+            )
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows
+
+        self.tree.error(self.on_tree_error)
+        # Các worker dùng chung một application → chỉ worker 0 sync
+        if config.WORKER_ID == 0:
+            await self.sync_command_tree()
+
+        print("Import report:\n" + self.games.format_import_report())
 
     async def on_ready(self):
+        if self.time_to_ready is None:
+            self.time_to_ready = time.perf_counter() - self.boot_started
+            print(f"Time-to-ready: {self.time_to_ready:.2f}s")
+            self.print_cache_report()
         print(f"{self.user} đã online!")
         if not self.check_game_interval.is_running():
             self.check_game_interval.start()
+        if self.cluster and not self.cluster_heartbeat.is_running():
+            self.cluster_heartbeat.start()
+        # Nhiều worker: heartbeat tự nhận game bị bỏ lại; một process: khôi phục ở đây
+        if not self.cluster and not self._restored:
+            self._restored = True
+            await self.restore_snapshots()
+
+    # ------------------------------------------------------------------
+    # Shutdown / khôi phục
+    # ------------------------------------------------------------------
+
+    async def close(self):
+        if not self.shutting_down:
+            self.shutting_down = True
+            await self.checkpoint_all()
+        if self.watchdog:
+            self.watchdog.stop()
+        await super().close()
+
+    async def checkpoint_all(self):
+        """Ngừng nhận lệnh, chờ lệnh đang chạy xong, lưu snapshot mọi game rồi dừng round loop."""
+        started = time.perf_counter()
+        deadline = time.monotonic() + config.SHUTDOWN_GRACE_SECONDS
+        while self.in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        saved = 0
+        for session in self.sessions.all():
+            game = session.game
+            # Chụp trước khi huỷ timer để giữ deadline của vòng
+            if session.guild_id is not None and game.state != GameState.ENDED:
+                try:
+                    if self.cluster:
+                        self.cluster.hand_off(session.guild_id, game)
+                    else:
+                        self.snapshots.save_game(str(session.guild_id), pickle.dumps(game))
+                    saved += 1
+                except Exception as e:
+                    print(f"⚠️ Không lưu được snapshot guild {session.guild_id}: {e}")
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
+            if game.round_timer:
+                game.round_timer.cancel()
+        print(
+            f"Tắt bot: lưu {saved} game trong "
+            f"{(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    async def restore_snapshots(self):
+        """Khôi phục các game đã lưu lúc tắt bot (chế độ một process).
+
+        Snapshot chỉ bị xoá khi khôi phục xong; guild chưa sẵn sàng (outage)
+        được giữ lại cho ``on_guild_available``.
+        """
+        waiting = []
+        for key in await asyncio.to_thread(self.snapshots.list_games):
+            guild_id = int(key)
+            if self.get_guild(guild_id) is None:
+                waiting.append(key)
+                continue
+            await self.restore_snapshot(guild_id)
+        if waiting:
+            print(
+                f"⚠️ Giữ {len(waiting)} snapshot của guild chưa sẵn sàng: {', '.join(waiting)}"
+            )
+
+    async def restore_snapshot(self, guild_id: int) -> bool:
+        """Khôi phục snapshot của một guild; lỗi thì giữ snapshot để thử lại sau."""
+        key = str(guild_id)
+        if self.sessions.get(guild_id):
+            # Guild đã có game mới → snapshot cũ không còn dùng
+            await asyncio.to_thread(self.snapshots.delete_game, key)
+            return False
+        blob = await asyncio.to_thread(self.snapshots.load_game, key)
+        if blob is None:
+            return False
+        try:
+            game: BaseGame = pickle.loads(blob)
+        except Exception as e:
+            # Không bao giờ khôi phục được → bỏ luôn
+            print(f"⚠️ Snapshot guild {guild_id} hỏng, xoá: {e}")
+            await asyncio.to_thread(self.snapshots.delete_game, key)
+            return False
+        try:
+            restored = await self.restore_game(guild_id, game)
+        except Exception as e:
+            print(f"⚠️ Không khôi phục được game guild {guild_id}: {e}")
+            restored = False
+        if not restored:
+            print(f"⚠️ Giữ snapshot guild {guild_id} để thử lại lần sau")
+            return False
+        await asyncio.to_thread(self.snapshots.delete_game, key)
+        game.log_event("Khôi phục game sau khi khởi động lại")
+        print(f"Đã khôi phục game của guild {guild_id}")
+        return True
+
+    async def restore_game(self, guild_id: int, game: BaseGame) -> bool:
+        """Gắn game từ snapshot vào guild, chỉnh lại deadline và chạy tiếp round loop."""
+        if game.game_type and not await self.games.ensure_loaded(game.game_type):
+            print(f"⚠️ Guild {guild_id}: game {game.game_type.value} không được bật")
+            return False
+
+        game.rearm_after_restore(config.RESTORE_POLICY, config.RESTORE_GRACE_SECONDS)
+        with self.sessions.bind(guild_id):
+            self.sessions.set_current(game)
+        if game.state in (GameState.RUNNING, GameState.PAUSED):
+            self.start_round_loop(game)
+        return True
+
+    # ------------------------------------------------------------------
+    # User cache
+    # ------------------------------------------------------------------
+
+    def get_user(self, id: int, /) -> Optional[discord.User]:
+        user = super().get_user(id)
+        if user:
+            return user
+        for session in self.sessions.all():
+            if id in session.users:
+                return session.users[id]
+        return None
+
+    def remember_player(self, user: discord.abc.User):
+        """Giữ lại user của host / người chơi để hiển thị tên."""
+        session = self.sessions.current
+        if session:
+            session.users[user.id] = user
+
+    def forget_player(self, user_id: int):
+        session = self.sessions.current
+        if session:
+            session.users.pop(user_id, None)
+
+    def reset_player_cache(self, host: Optional[discord.abc.User] = None):
+        """Xoá cache của game cũ trong guild khi có game mới."""
+        session = self.sessions.current
+        if session:
+            session.users.clear()
+        if host:
+            self.remember_player(host)
+
+    def print_cache_report(self):
+        rss = memory_usage_mb()
+        members = sum(len(g.members) for g in self.guilds)
+        print(
+            f"Cache: policy={config.MEMBER_CACHE_POLICY}, "
+            f"guilds={len(self.guilds)}, members={members}, "
+            f"users={len(self.users)}, "
+            f"players={sum(len(s.users) for s in self.sessions.all())}, "
+            f"RSS={f'{rss:.1f} MB' if rss is not None else 'N/A'}"
+        )
+
+    # ------------------------------------------------------------------
+    # Shard metrics
+    # ------------------------------------------------------------------
+
+    async def on_guild_available(self, guild: discord.Guild):
+        # Guild bị outage lúc on_ready: snapshot của nó vẫn được giữ → khôi phục
+        if not self.cluster and self._restored and not self.sessions.get(guild.id):
+            await self.restore_snapshot(guild.id)
+
+    async def on_message(self, message: discord.Message):
+        guild_id = message.guild.id if message.guild else None
+        self.shard_metrics.record_event(self.sessions.shard_for(guild_id))
+        await self.process_commands(message)
+
+    async def on_shard_connect(self, shard_id: int):
+        self.shard_metrics.record_connect(shard_id)
+
+    async def on_shard_disconnect(self, shard_id: int):
+        self.shard_metrics.record_disconnect(shard_id)
+
+    async def on_connect(self):
+        if not config.SHARDING:
+            self.shard_metrics.record_connect(0)
+
+    async def on_disconnect(self):
+        if not config.SHARDING:
+            self.shard_metrics.record_disconnect(0)
+
+    def shard_stats(self) -> List[dict]:
+        """Số liệu từng shard: latency, event/phút, số game và round loop."""
+        if config.SHARDING:
+            latencies = dict(self.latencies)
+        else:
+            latencies = {0: self.latency}
+
+        stats = []
+        for shard_id in sorted(latencies):
+            latency = latencies[shard_id]
+            sessions = self.sessions.by_shard(shard_id)
+            stats.append(
+                {
+                    "shard_id": shard_id,
+                    "latency_ms": (
+                        round(latency * 1000, 1) if math.isfinite(latency) else None
+                    ),
+                    "guilds": sum(
+                        1 for g in list(self.guilds)
+                        if self.sessions.shard_for(g.id) == shard_id
+                    ),
+                    "events_per_minute": round(
+                        self.shard_metrics.events_per_minute(shard_id), 1
+                    ),
+                    "total_events": self.shard_metrics.total_events[shard_id],
+                    "connects": self.shard_metrics.connects[shard_id],
+                    "disconnects": self.shard_metrics.disconnects[shard_id],
+                    "games": len(sessions),
+                    "round_loops": sum(
+                        1 for s in sessions
+                        if s.game.round_task and not s.game.round_task.done()
+                    ),
+                }
+            )
+        return stats
+
+    # ------------------------------------------------------------------
+    # Slash command sync (chỉ sync khi command tree thay đổi)
+    # ------------------------------------------------------------------
+
+    def command_tree_hash(self, guild: Optional[discord.Object] = None) -> str:
+        """Hash ổn định của command tree (global hoặc của một guild)."""
+        payload = sorted(
+            (cmd.to_dict(self.tree) for cmd in self.tree.get_commands(guild=guild)),
+            key=lambda d: (d.get("type", 1), d["name"]),
+        )
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _load_command_hashes() -> dict:
+        try:
+            with open(config.COMMAND_HASH_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_command_hashes(hashes: dict):
+        tmp_path = f"{config.COMMAND_HASH_FILE}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(hashes, f, indent=2)
+            os.replace(tmp_path, config.COMMAND_HASH_FILE)
+        except OSError as e:
+            print(f"⚠️ Không ghi được cache command hash: {e}")
+
+    async def sync_command_tree(self):
+        """Sync slash command lên Discord nếu tree khác lần sync trước.
+
+        Cog của game được nạp lười, nên bước đầu chỉ so hash mã nguồn các
+        extension (kèm module của project mà chúng import và giá trị config);
+        chỉ khi hash đó đổi mới nạp đủ cog để tính hash tree.
+        """
+        started = time.perf_counter()
+        guild = None
+        scope = "global"
+        if config.DEV_GUILD_ID:
+            guild = discord.Object(id=config.DEV_GUILD_ID)
+            scope = f"guild:{config.DEV_GUILD_ID}"
+
+        hashes = self._load_command_hashes()
+        cached = hashes.get(scope)
+        if not isinstance(cached, dict):
+            cached = {}
+        source_digest = self.games.source_digest()
+
+        if not config.FORCE_COMMAND_SYNC and cached.get("source") == source_digest:
+            print(f"Commands không đổi ({scope}), bỏ qua sync.")
+            return
+
+        # Mã nguồn đã đổi → cần tree đầy đủ để so sánh / sync
+        await self.games.load_all()
+        if guild:
+            self.tree.copy_global_to(guild=guild)
+        tree_hash = self.command_tree_hash(guild)
+
+        if config.FORCE_COMMAND_SYNC or cached.get("tree") != tree_hash:
+            await self.tree.sync(guild=guild)
+        else:
+            print(f"Command tree không đổi ({scope}), bỏ qua sync.")
+        hashes[scope] = {"source": source_digest, "tree": tree_hash}
+        self._save_command_hashes(hashes)
+        print(
+            f"Kiểm tra / sync commands ({scope}) trong "
+            f"{time.perf_counter() - started:.2f}s"
+        )
+
+    async def on_tree_error(
+        self,
+        interaction: discord.Interaction,
+        error: app_commands.AppCommandError,
+    ):
+        self._stop_auto_defer(interaction)
+        if isinstance(error, app_commands.CommandNotFound):
+            # Lệnh của game chưa được nạp (chưa ai /host game đó)
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "❌ Không có game nào đang chạy cho lệnh này!", ephemeral=True
+                )
+            return
+        await app_commands.CommandTree.on_error(self.tree, interaction, error)
+
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        command: app_commands.Command | app_commands.ContextMenu,
+    ):
+        self._stop_auto_defer(interaction)
+
+    def _stop_auto_defer(self, interaction: discord.Interaction):
+        self.in_flight.discard(interaction.id)
+        if isinstance(interaction.response, AutoDeferResponse):
+            interaction.response.stop()
 
     # ------------------------------------------------------------------
     # Interval map helper
@@ -65,17 +597,17 @@ class MinigameBot(commands.Bot):
 
     @tasks.loop(minutes=10)
     async def check_game_interval(self):
-        """Kiểm tra và xử lý chuyển ngày game."""
-        if not self.current_game:
-            return
+        """Kiểm tra và xử lý chuyển ngày game (game Lì Xì của mọi guild)."""
+        for session in self.sessions.all():
+            if session.game_type != GameType.LI_XI_NGAY_TET:
+                continue
+            with self.sessions.bind(session.guild_id):
+                await self._check_day_change(session.game)
 
-        if self.current_game.state != GameState.RUNNING:
+    async def _check_day_change(self, game: BaseGame):
+        if game.state != GameState.RUNNING:
             return
 
-        if not isinstance(self.current_game, LiXiNgayTetGame):
-            return
-
-        game = self.current_game
         now = datetime.now()
 
         interval_td = self.get_interval_timedelta(
@@ -87,6 +619,11 @@ class MinigameBot(commands.Bot):
             base_time = game.start_time or now
             game.next_day_at = base_time + interval_td
 
+        # Worker khác đã nhận game → không chuyển ngày ở đây
+        if game.next_day_at and now >= game.next_day_at:
+            if not await self.confirm_lease(game):
+                return
+
         # Catch-up nếu bot bị sleep / trễ nhiều chu kỳ
         while game.next_day_at and now >= game.next_day_at:
             await game.on_day_change()
@@ -131,8 +668,8 @@ class MinigameBot(commands.Bot):
                     except discord.Forbidden:
                         pass
 
-                self.current_game = None
-                self.current_game_type = None
+                await self.archive_game(game)
+                await self.end_current_game()
                 return
 
             # Thông báo đổi ngày
@@ -158,3 +695,15 @@ class MinigameBot(commands.Bot):
     @check_game_interval.before_loop
     async def before_check_game_interval(self):
         await self.wait_until_ready()
+
+    # ------------------------------------------------------------------
+    # Background task – lease / checkpoint (chế độ nhiều worker)
+    # ------------------------------------------------------------------
+
+    @tasks.loop(seconds=max(1, config.LEASE_SECONDS / 3))
+    async def cluster_heartbeat(self):
+        await self.cluster.heartbeat()
+
+    @cluster_heartbeat.before_loop
+    async def before_cluster_heartbeat(self):
+        await self.wait_until_ready()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+from typing import TYPE_CHECKING, Optional
+
+from games.base_game import BaseGame
+from state_backend import StateBackend
+
+if TYPE_CHECKING:
+    from bot import MinigameBot
+
+
+def _key(guild_id: Optional[int]) -> Optional[str]:
+    # Game tạo trong DM không gắn với guild nào → không chia sẻ giữa worker
+    return str(guild_id) if guild_id is not None else None
+
+
+class ClusterCoordinator:
+    """Checkpoint game vào state backend và giữ lease cho từng game.
+
+    Chỉ worker giữ lease mới chạy round loop của game. Khi một worker chết,
+    lease của nó hết hạn; worker đang phục vụ guild đó (worker khởi động lại
+    hoặc worker nhận shard) sẽ lấy lease và khôi phục game từ snapshot.
+    """
+
+    def __init__(
+        self,
+        bot: MinigameBot,
+        backend: StateBackend,
+        worker_id: int,
+        lease_seconds: float,
+    ):
+        self.bot = bot
+        self.backend = backend
+        self.owner = f"worker-{worker_id}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+
+    # ------------------------------------------------------------------
+    # Lease
+    # ------------------------------------------------------------------
+
+    def claim(self, guild_id: Optional[int], blob: Optional[bytes]) -> bool:
+        """Lấy lease cho game mới tạo và lưu snapshot đầu tiên.
+
+        Ghi SQLite → gọi qua ``asyncio.to_thread`` với ``blob`` đã pickle sẵn
+        trên event loop (``snapshot``).
+        """
+        key = _key(guild_id)
+        if key is None:
+            return True
+        if not self.backend.acquire_lease(key, self.owner, self.lease_seconds):
+            print(
+                f"⚠️ Guild {guild_id}: lease đang thuộc "
+                f"{self.backend.lease_owner(key)}"
+            )
+            return False
+        self._save(guild_id, blob)
+        return True
+
+    async def confirm(self, guild_id: Optional[int]) -> bool:
+        """Round loop gọi ngay trước khi xử lý vòng: gia hạn lease, mất lease
+        (worker khác đã nhận game) thì dừng bản local và trả về False."""
+        key = _key(guild_id)
+        if key is None:
+            return True
+        if await asyncio.to_thread(
+            self.backend.acquire_lease, key, self.owner, self.lease_seconds
+        ):
+            return True
+        print(f"⚠️ Mất lease guild {guild_id}, bỏ qua vòng và dừng game local")
+        self._drop(guild_id)
+        return False
+
+    def release(self, guild_id: Optional[int]):
+        """Game kết thúc: xoá snapshot và trả lease."""
+        key = _key(guild_id)
+        if key is None:
+            return
+        self.backend.delete_game(key)
+        self.backend.release_lease(key, self.owner)
+
+    def hand_off(self, guild_id: Optional[int], game: BaseGame):
+        """Tắt bot: lưu snapshot cuối rồi trả lease để worker khác / lần khởi
+        động sau nhận game ngay, không phải chờ lease hết hạn."""
+        key = _key(guild_id)
+        if key is None:
+            return
+        self.checkpoint(guild_id, game)
+        self.backend.release_lease(key, self.owner)
+
+    def checkpoint(self, guild_id: Optional[int], game: BaseGame):
+        self._save(guild_id, self.snapshot(guild_id, game))
+
+    def snapshot(self, guild_id: Optional[int], game: BaseGame) -> Optional[bytes]:
+        """Pickle game trên event loop: game không bị đổi giữa chừng nên
+        snapshot luôn nhất quán (vote / tally, heap / ``_dead``...)."""
+        if _key(guild_id) is None:
+            return None
+        try:
+            return pickle.dumps(game)
+        except Exception as e:
+            print(f"⚠️ Không pickle được game guild {guild_id}: {e}")
+            return None
+
+    def _save(self, guild_id: Optional[int], blob: Optional[bytes]):
+        key = _key(guild_id)
+        if key is None or blob is None:
+            return
+        try:
+            self.backend.save_game(key, blob)
+        except Exception as e:
+            print(f"⚠️ Không lưu được snapshot guild {guild_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Heartbeat
+    # ------------------------------------------------------------------
+
+    def _renew(self, guild_id: int, blob: Optional[bytes]) -> bool:
+        if not self.backend.acquire_lease(_key(guild_id), self.owner, self.lease_seconds):
+            return False
+        self._save(guild_id, blob)
+        return True
+
+    async def heartbeat(self):
+        """Gia hạn lease + checkpoint game của worker này, nhận game bị bỏ rơi.
+
+        Pickle chạy trên event loop (snapshot nhất quán), chỉ phần ghi SQLite
+        chạy trong thread để không chặn loop.
+        """
+        for session in self.bot.sessions.all():
+            if _key(session.guild_id) is None:
+                continue
+            blob = self.snapshot(session.guild_id, session.game)
+            if not await asyncio.to_thread(self._renew, session.guild_id, blob):
+                # Worker khác đã lấy game (ta bị treo quá lâu) → dừng bản local
+                print(f"⚠️ Mất lease guild {session.guild_id}, dừng game local")
+                self._drop(session.guild_id)
+
+        local = {_key(s.guild_id) for s in self.bot.sessions.all()}
+        for key in await asyncio.to_thread(self.backend.list_games):
+            if key in local:
+                continue
+            guild_id = int(key)
+            # Chỉ nhận game của guild mà worker này đang kết nối tới
+            if self.bot.get_guild(guild_id) is None:
+                continue
+            if await asyncio.to_thread(self.backend.lease_owner, key) is not None:
+                continue
+            if await asyncio.to_thread(
+                self.backend.acquire_lease, key, self.owner, self.lease_seconds
+            ):
+                await self._restore(guild_id)
+
+    def _drop(self, guild_id: int):
+        session = self.bot.sessions.get(guild_id)
+        if not session:
+            return
+        game = session.game
+        if game.round_task and not game.round_task.done():
+            game.round_task.cancel()
+        if game.round_timer:
+            game.round_timer.cancel()
+        self.bot.sessions.discard(guild_id)
+
+    async def _restore(self, guild_id: int):
+        blob = await asyncio.to_thread(self.backend.load_game, str(guild_id))
+        if blob is None:
+            await asyncio.to_thread(self.backend.release_lease, str(guild_id), self.owner)
+            return
+        try:
+            game: BaseGame = pickle.loads(blob)
+        except Exception as e:
+            print(f"⚠️ Snapshot guild {guild_id} hỏng: {e}")
+            await asyncio.to_thread(self.release, guild_id)
+            return
+
+        if not await self.bot.restore_game(guild_id, game):
+            await asyncio.to_thread(self.backend.release_lease, str(guild_id), self.owner)
+            return
+        game.log_event(f"Khôi phục game trên {self.owner}")
+        print(f"Đã nhận game của guild {guild_id} ({self.owner})")
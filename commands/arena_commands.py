@@ -7,8 +7,11 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+import config
+from auto_defer import auto_defer
 from enums import GameState, GameType
 from games.arena_game import ArenaGame, ArenaRoundResult
+from live_board import LiveBoard
 
 if TYPE_CHECKING:
     from bot import MinigameBot
@@ -136,11 +139,11 @@ class ArenaCommands(commands.Cog):
 
     def __init__(self, bot: MinigameBot):
         self.bot = bot
-        self._round_task: Optional[asyncio.Task] = None
 
     def cog_unload(self):
-        if self._round_task and not self._round_task.done():
-            self._round_task.cancel()
+        for game in self.bot.sessions.games_of(GameType.ARENA):
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -158,12 +161,20 @@ class ArenaCommands(commands.Cog):
 
     async def start_round_loop(self):
         """Vòng lặp tự động cho Đấu trường sinh tử."""
-        game = self._get_running_game()
-        if not game:
+        # Game đang tạm dừng vẫn chạy loop (timer đứng yên), vd: sau /reload
+        game = self.bot.current_game
+        if not isinstance(game, ArenaGame) or game.state not in (
+            GameState.RUNNING,
+            GameState.PAUSED,
+        ):
             return
 
-        while game.state == GameState.RUNNING:
-            game.current_actions.clear()
+        board: Optional[LiveBoard] = None
+        while game.state in (GameState.RUNNING, GameState.PAUSED):
+            # Vòng đang dở khi khôi phục từ snapshot: giữ lựa chọn, không thông báo lại
+            resumed = game.take_restored_round()
+            if resumed is None:
+                game.clear_actions()
             alive = game.alive_players
             if len(alive) <= 1:
                 break
@@ -173,7 +184,28 @@ class ArenaCommands(commands.Cog):
                 if game.notif_channel_id
                 else None
             )
-            if channel:
+            # Timer chạy trước để board hiển thị được giờ kết thúc vòng
+            timer = game.start_round_timer(
+                game.interval_seconds if resumed is None else resumed
+            )
+            if channel and board is None and config.LIVE_BOARD:
+                board = await LiveBoard.open(
+                    self.bot,
+                    game,
+                    channel,
+                    title="Đấu Trường",
+                    hint=(
+                        "Dùng `/action_arena` để chọn hành động: "
+                        "ATTACK / DEFEND / CHARGE / DESTROY."
+                    ),
+                    submitted=lambda: len(game.current_actions),
+                    color=discord.Color.red(),
+                    mid_round=config.LIVE_BOARD_MID_ROUND_UPDATE,
+                )
+            elif board:
+                await board.refresh(force=True)
+
+            if channel and resumed is None and board is None:
                 next_round = game.current_round + 1
                 M = game.settings["M"]
                 embed = discord.Embed(
@@ -201,12 +233,17 @@ class ArenaCommands(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-            # Wait for round interval
-            await asyncio.sleep(game.interval_seconds)
+            # Wait for the round interval (pausing freezes the remaining time)
+            await game.wait_round(timer, board)
 
-            if game.state != GameState.RUNNING:
+            # Game may have ended during the round
+            if game.state not in (GameState.RUNNING, GameState.PAUSED):
                 break
 
+            # Worker khác đã nhận game (mất lease) → không resolve vòng này
+            if not await self.bot.confirm_lease(game):
+                return
+
             # Resolve
             result = game.resolve_round()
             if not result:
@@ -217,8 +254,13 @@ class ArenaCommands(commands.Cog):
                 f"deaths={result.deaths}"
             )
 
-            # Announce result
-            if channel:
+            # Announce result (có live board thì chỉ gửi khi có người bị loại)
+            if board:
+                board.last_result = (
+                    f"💀 Ngã xuống: **{len(result.deaths)}** | "
+                    f"💥 Hủy diệt: **{len(result.destroy_kills)}**"
+                )
+            if channel and (board is None or result.deaths):
                 embed = _build_round_embed(result, self.bot)
                 try:
                     await channel.send(embed=embed)
@@ -237,10 +279,15 @@ class ArenaCommands(commands.Cog):
                     except discord.Forbidden:
                         pass
 
-                self.bot.current_game = None
-                self.bot.current_game_type = None
+                if board:
+                    await board.close()
+                await self.bot.archive_game(game)
+                await self.bot.end_current_game()
                 return
 
+        if board:
+            await board.close()
+
     def _build_endgame_embed(
         self,
         game: ArenaGame,
@@ -285,6 +332,7 @@ class ArenaCommands(commands.Cog):
     # /action_arena
     # ------------------------------------------------------------------
 
+    @auto_defer(ephemeral=True)
     @app_commands.command(
         name="action_arena",
         description="[Đấu Trường] Chọn hành động: ATTACK/DEFEND/CHARGE/DESTROY",
@@ -335,38 +383,22 @@ class ArenaCommands(commands.Cog):
         if target:
             msg += f" → **{target.display_name}**"
 
-        # Send via DM
-        try:
-            dm = await interaction.user.create_dm()
-            await dm.send(msg)
+        # Send via DM (không gửi được thì trả lời ẩn trong kênh)
+        success, _ = await self.bot.dm.send(
+            interaction.user, content=msg, user_initiated=True
+        )
+        if success:
             await interaction.response.send_message(
                 "✅ Hành động đã được ghi nhận! Kiểm tra DM.", ephemeral=True
             )
-        except discord.Forbidden:
+        else:
             await interaction.response.send_message(msg, ephemeral=True)
 
     # ------------------------------------------------------------------
     # /stats_arena
     # ------------------------------------------------------------------
 
-    @app_commands.command(
-        name="stats_arena",
-        description="[Đấu Trường] Xem Stamina hiện tại của mọi người",
-    )
-    async def stats_arena(self, interaction: discord.Interaction):
-        if not _in_game_channel(self.bot, interaction):
-            await interaction.response.send_message(
-                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
-            )
-            return
-
-        game = self._get_running_game()
-        if not game:
-            await interaction.response.send_message(
-                "❌ Không có game Đấu Trường nào đang chạy!", ephemeral=True
-            )
-            return
-
+    def _build_stats_embed(self, game: ArenaGame) -> discord.Embed:
         M = game.settings["M"]
         embed = discord.Embed(
             title="📊 Stamina Đấu Trường",
@@ -411,9 +443,37 @@ class ArenaCommands(commands.Cog):
                 value="\n".join(elim_lines),
                 inline=False,
             )
+        return embed
+
+    @app_commands.command(
+        name="stats_arena",
+        description="[Đấu Trường] Xem Stamina hiện tại của mọi người",
+    )
+    async def stats_arena(self, interaction: discord.Interaction):
+        if not _in_game_channel(self.bot, interaction):
+            await interaction.response.send_message(
+                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
+            )
+            return
 
+        game = self._get_running_game()
+        if not game:
+            await interaction.response.send_message(
+                "❌ Không có game Đấu Trường nào đang chạy!", ephemeral=True
+            )
+            return
+
+        embed = game.cached_view("stats", lambda: self._build_stats_embed(game))
         await interaction.response.send_message(embed=embed)
 
+        # Riêng người gọi: số người đang nhắm vào mình (đếm sẵn lúc chọn)
+        if interaction.user.id in game.players and interaction.user.id not in game.eliminated:
+            attackers = game.attackers_of(interaction.user.id)
+            await interaction.followup.send(
+                f"🎯 Vòng này có **{attackers}** người đang nhắm vào bạn.",
+                ephemeral=True,
+            )
+
     # ------------------------------------------------------------------
     # /history_arena
     # ------------------------------------------------------------------
@@ -8,8 +8,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+import config
 from enums import GameState, GameType
 from games.chen_thanh_game import ChenThanhGame, ChenThanhRoundResult
+from live_board import LiveBoard
 
 if TYPE_CHECKING:
     from bot import MinigameBot
@@ -140,11 +142,11 @@ class ChenThanhCommands(commands.Cog):
 
     def __init__(self, bot: MinigameBot):
         self.bot = bot
-        self._round_task: Optional[asyncio.Task] = None
 
     def cog_unload(self):
-        if self._round_task and not self._round_task.done():
-            self._round_task.cancel()
+        for game in self.bot.sessions.games_of(GameType.CHEN_THANH):
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -162,13 +164,21 @@ class ChenThanhCommands(commands.Cog):
 
     async def start_round_loop(self):
         """Bắt đầu vòng lặp tự động cho Chén Thánh."""
-        game = self._get_running_game()
-        if not game:
+        # Game đang tạm dừng vẫn chạy loop (timer đứng yên), vd: sau /reload
+        game = self.bot.current_game
+        if not isinstance(game, ChenThanhGame) or game.state not in (
+            GameState.RUNNING,
+            GameState.PAUSED,
+        ):
             return
 
-        while game.state == GameState.RUNNING:
-            game.current_actions.clear()
-            game.current_dares.clear()
+        board: Optional[LiveBoard] = None
+        while game.state in (GameState.RUNNING, GameState.PAUSED):
+            # Vòng đang dở khi khôi phục từ snapshot: giữ lựa chọn, không thông báo lại
+            resumed = game.take_restored_round()
+            if resumed is None:
+                game.current_actions.clear()
+                game.current_dares.clear()
             alive = game.alive_players
             if len(alive) <= 1:
                 break
@@ -179,7 +189,33 @@ class ChenThanhCommands(commands.Cog):
                 if game.notif_channel_id
                 else None
             )
-            if channel:
+            # Timer chạy trước để board hiển thị được giờ kết thúc vòng
+            timer = game.start_round_timer(
+                game.interval_seconds if resumed is None else resumed
+            )
+            hint = (
+                f"Dùng `/action_chenthanh` để **Đóng góp** hoặc **Đánh cắp** "
+                f"({game.settings['M']} xu).\n"
+                f"🏺 Hũ hiện tại: **{game.pot}** xu."
+            )
+            if game.current_round >= 1:
+                hint += "\nDùng `/dare` để thách thức người bạn nghi đã Đánh cắp!"
+            if channel and board is None and config.LIVE_BOARD:
+                board = await LiveBoard.open(
+                    self.bot,
+                    game,
+                    channel,
+                    title="Chén Thánh",
+                    hint=hint,
+                    submitted=lambda: len(game.current_actions),
+                    color=discord.Color.dark_gold(),
+                    mid_round=config.LIVE_BOARD_MID_ROUND_UPDATE,
+                )
+            elif board:
+                board.hint = hint
+                await board.refresh(force=True)
+
+            if channel and resumed is None and board is None:
                 next_round = game.current_round + 1
                 embed = discord.Embed(
                     title=f"🔔 Vòng {next_round} bắt đầu!",
@@ -206,14 +242,19 @@ class ChenThanhCommands(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-            # Wait for the round interval
-            await asyncio.sleep(game.interval_seconds)
+            # Wait for the round interval (pausing freezes the remaining time)
+            await game.wait_round(timer, board)
 
-            # Game may have been paused / ended during sleep
-            if game.state != GameState.RUNNING:
+            # Game may have ended during the round
+            if game.state not in (GameState.RUNNING, GameState.PAUSED):
                 break
 
+            # Worker khác đã nhận game (mất lease) → không resolve vòng này
+            if not await self.bot.confirm_lease(game):
+                return
+
             # Resolve
+            eliminated_before = len(game.eliminated)
             result = game.resolve_round()
             if not result:
                 continue
@@ -225,8 +266,14 @@ class ChenThanhCommands(commands.Cog):
                 f"pot={result.pot_before}→{result.pot_after}"
             )
 
-            # Announce result
-            if channel:
+            # Announce result (có live board thì chỉ gửi khi có người bị loại)
+            if board:
+                board.last_result = (
+                    f"Đóng góp: **{result.contributor_count}** | "
+                    f"Đánh cắp: **{result.stealer_count}** | "
+                    f"Hũ: **{result.pot_before}** → **{result.pot_after}**"
+                )
+            if channel and (board is None or len(game.eliminated) > eliminated_before):
                 embed = _build_round_embed(result, self.bot)
                 try:
                     await channel.send(embed=embed)
@@ -245,10 +292,15 @@ class ChenThanhCommands(commands.Cog):
                     except discord.Forbidden:
                         pass
 
-                self.bot.current_game = None
-                self.bot.current_game_type = None
+                if board:
+                    await board.close()
+                await self.bot.archive_game(game)
+                await self.bot.end_current_game()
                 return
 
+        if board:
+            await board.close()
+
     async def _build_endgame_embed(
         self,
         game: ChenThanhGame,
@@ -396,10 +448,10 @@ class ChenThanhCommands(commands.Cog):
                 except discord.Forbidden:
                     pass
             # Cancel round loop
-            if self._round_task and not self._round_task.done():
-                self._round_task.cancel()
-            self.bot.current_game = None
-            self.bot.current_game_type = None
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
+            await self.bot.archive_game(game)
+            await self.bot.end_current_game()
 
     # ------------------------------------------------------------------
     # /history_chenthanh
@@ -437,24 +489,7 @@ class ChenThanhCommands(commands.Cog):
     # /status_chenthanh
     # ------------------------------------------------------------------
 
-    @app_commands.command(
-        name="status_chenthanh",
-        description="[Chén Thánh] Xem trạng thái game",
-    )
-    async def status_chenthanh(self, interaction: discord.Interaction):
-        if not _in_game_channel(self.bot, interaction):
-            await interaction.response.send_message(
-                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
-            )
-            return
-
-        game = self._get_running_game()
-        if not game:
-            await interaction.response.send_message(
-                "❌ Không có game Chén Thánh nào đang chạy!", ephemeral=True
-            )
-            return
-
+    def _build_status_embed(self, game: ChenThanhGame) -> discord.Embed:
         N = game.settings["N"]
         embed = discord.Embed(
             title="📋 Trạng thái Game Chén Thánh",
@@ -465,13 +500,9 @@ class ChenThanhCommands(commands.Cog):
             color=discord.Color.dark_gold(),
         )
 
-        # Alive players sorted by balance
+        # Alive players sorted by balance (đọc từ bảng xếp hạng của game)
         alive_lines = []
-        sorted_alive = sorted(
-            game.alive_players,
-            key=lambda pid: game.balances.get(pid, 0),
-            reverse=True,
-        )
+        sorted_alive = game.ranking()
         for pid in sorted_alive:
             user = self.bot.get_user(pid)
             name = user.display_name if user else f"ID {pid}"
@@ -500,7 +531,27 @@ class ChenThanhCommands(commands.Cog):
                 value="\n".join(elim_lines),
                 inline=False,
             )
+        return embed
+
+    @app_commands.command(
+        name="status_chenthanh",
+        description="[Chén Thánh] Xem trạng thái game",
+    )
+    async def status_chenthanh(self, interaction: discord.Interaction):
+        if not _in_game_channel(self.bot, interaction):
+            await interaction.response.send_message(
+                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
+            )
+            return
+
+        game = self._get_running_game()
+        if not game:
+            await interaction.response.send_message(
+                "❌ Không có game Chén Thánh nào đang chạy!", ephemeral=True
+            )
+            return
 
+        embed = game.cached_view("status", lambda: self._build_status_embed(game))
         await interaction.response.send_message(embed=embed)
 
 
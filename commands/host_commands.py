@@ -10,14 +10,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from auto_defer import auto_defer
 from enums import GameInterval, GameState, GameType
 from game_factory import GameFactory
 from games.base_game import BaseGame
-from games.li_xi_game import LiXiNgayTetGame
-from games.kro_game import KRoGame
-from games.jco_game import JCoGame
-from games.chen_thanh_game import ChenThanhGame
-from games.arena_game import ArenaGame
 
 if TYPE_CHECKING:
     from bot import MinigameBot
@@ -53,6 +49,13 @@ class HostCommands(commands.Cog):
             )
             return
 
+        # Nạp cog + engine của game ở lần /host đầu tiên
+        if not await self.bot.games.ensure_loaded(gt):
+            await interaction.response.send_message(
+                "❌ Loại game này không được bật trên bot!", ephemeral=True
+            )
+            return
+
         game = GameFactory.create_game(gt, interaction.user.id)
         if not game:
             await interaction.response.send_message(
@@ -60,8 +63,13 @@ class HostCommands(commands.Cog):
             )
             return
 
-        self.bot.current_game = game
-        self.bot.current_game_type = gt
+        if not await self.bot.host_game(game):
+            await interaction.response.send_message(
+                "❌ Game của server này đang được worker khác xử lý, thử lại sau!",
+                ephemeral=True,
+            )
+            return
+        self.bot.reset_player_cache(interaction.user)
 
         embed = discord.Embed(
             title="🎮 Game mới đã được tạo!",
@@ -106,7 +114,7 @@ class HostCommands(commands.Cog):
                 super().__init__()
                 modal_self.game = game
 
-                if isinstance(game, LiXiNgayTetGame):
+                if game.game_type == GameType.LI_XI_NGAY_TET:
                     modal_self.m_input = discord.ui.TextInput(
                         label="M (Tiền ban đầu: 10-10000)",
                         default=str(game.settings["M"]),
@@ -142,7 +150,7 @@ class HostCommands(commands.Cog):
                     )
                     modal_self.add_item(modal_self.interval_input)
 
-                elif isinstance(game, KRoGame):
+                elif game.game_type == GameType.KRO:
                     modal_self.max_penalty = discord.ui.TextInput(
                         label="Điểm phạt tối đa (5-20)",
                         default=str(game.settings["max_penalty"]),
@@ -151,9 +159,9 @@ class HostCommands(commands.Cog):
                     modal_self.add_item(modal_self.max_penalty)
 
                     modal_self.player_limit = discord.ui.TextInput(
-                        label="Giới hạn người chơi (2-5)",
+                        label="Giới hạn người chơi (2-1000)",
                         default=str(game.settings["player_limit"]),
-                        max_length=1,
+                        max_length=4,
                     )
                     modal_self.add_item(modal_self.player_limit)
 
@@ -164,7 +172,7 @@ class HostCommands(commands.Cog):
                     )
                     modal_self.add_item(modal_self.interval_input)
 
-                elif isinstance(game, JCoGame):
+                elif game.game_type == GameType.JCO:
                     modal_self.m_input = discord.ui.TextInput(
                         label="M - Giới hạn số (2-10)",
                         default=str(game.settings["M"]),
@@ -193,7 +201,14 @@ class HostCommands(commands.Cog):
                     )
                     modal_self.add_item(modal_self.rotation_input)
 
-                elif isinstance(game, ChenThanhGame):
+                    modal_self.early_input = discord.ui.TextInput(
+                        label="Kết thúc vòng sớm khi đủ >50% vote (on/off)",
+                        default="on" if game.settings.get("early_resolve") else "off",
+                        max_length=3,
+                    )
+                    modal_self.add_item(modal_self.early_input)
+
+                elif game.game_type == GameType.CHEN_THANH:
                     modal_self.m_input = discord.ui.TextInput(
                         label="M - Xu mỗi vòng (10-100)",
                         default=str(game.settings["M"]),
@@ -222,7 +237,7 @@ class HostCommands(commands.Cog):
                     )
                     modal_self.add_item(modal_self.interval_input)
 
-                elif isinstance(game, ArenaGame):
+                elif game.game_type == GameType.ARENA:
                     modal_self.m_input = discord.ui.TextInput(
                         label="M - Stamina ban đầu (50-500)",
                         default=str(game.settings["M"]),
@@ -248,7 +263,7 @@ class HostCommands(commands.Cog):
                 try:
                     new_settings: dict = {}
 
-                    if isinstance(modal_self.game, LiXiNgayTetGame):
+                    if modal_self.game.game_type == GameType.LI_XI_NGAY_TET:
                         new_settings["M"] = int(modal_self.m_input.value)
                         new_settings["N"] = int(modal_self.n_input.value)
                         new_settings["player_limit"] = int(
@@ -261,7 +276,7 @@ class HostCommands(commands.Cog):
                             modal_self.interval_input.value.strip().lower()
                         )
 
-                    elif isinstance(modal_self.game, KRoGame):
+                    elif modal_self.game.game_type == GameType.KRO:
                         new_settings["max_penalty"] = int(
                             modal_self.max_penalty.value
                         )
@@ -272,7 +287,7 @@ class HostCommands(commands.Cog):
                             modal_self.interval_input.value.strip().lower()
                         )
 
-                    elif isinstance(modal_self.game, JCoGame):
+                    elif modal_self.game.game_type == GameType.JCO:
                         new_settings["M"] = int(modal_self.m_input.value)
                         new_settings["player_limit"] = int(
                             modal_self.player_limit.value
@@ -282,8 +297,10 @@ class HostCommands(commands.Cog):
                         )
                         rot_val = modal_self.rotation_input.value.strip().lower()
                         new_settings["rotation"] = rot_val == "on"
+                        early_val = modal_self.early_input.value.strip().lower()
+                        new_settings["early_resolve"] = early_val == "on"
 
-                    elif isinstance(modal_self.game, ChenThanhGame):
+                    elif modal_self.game.game_type == GameType.CHEN_THANH:
                         new_settings["M"] = int(modal_self.m_input.value)
                         new_settings["N"] = int(modal_self.n_input.value)
                         new_settings["player_limit"] = int(
@@ -293,7 +310,7 @@ class HostCommands(commands.Cog):
                             modal_self.interval_input.value.strip().lower()
                         )
 
-                    elif isinstance(modal_self.game, ArenaGame):
+                    elif modal_self.game.game_type == GameType.ARENA:
                         new_settings["M"] = int(modal_self.m_input.value)
                         new_settings["player_limit"] = int(
                             modal_self.player_limit.value
@@ -310,6 +327,7 @@ class HostCommands(commands.Cog):
                         return
 
                     modal_self.game.settings.update(new_settings)
+                    modal_self.game.bump_version()
 
                     embed = discord.Embed(
                         title="✅ Đã cập nhật cài đặt",
@@ -415,7 +433,7 @@ class HostCommands(commands.Cog):
         game.state = GameState.RUNNING
         game.start_time = datetime.now()
 
-        if isinstance(game, LiXiNgayTetGame):
+        if game.game_type == GameType.LI_XI_NGAY_TET:
             interval_td = self.bot.get_interval_timedelta(
                 game.settings.get("game_interval", GameInterval.ONE_DAY)
             )
@@ -429,7 +447,7 @@ class HostCommands(commands.Cog):
             embed = discord.Embed(
                 title="🎮 GAME BẮT ĐẦU!",
                 description=(
-                    f"**Game:** {self.bot.current_game_type.value}\n"
+                    f"**Game:** {game.game_type.value}\n"
                     f"**Số người chơi:** {len(game.players)}"
                 ),
                 color=discord.Color.gold(),
@@ -439,37 +457,8 @@ class HostCommands(commands.Cog):
             except discord.Forbidden:
                 pass
 
-        # K Rô: start round loop
-        if isinstance(game, KRoGame):
-            kro_cog = self.bot.get_cog("KRoCommands")
-            if kro_cog:
-                kro_cog._round_task = asyncio.create_task(
-                    kro_cog.start_round_loop()
-                )
-
-        # J Cơ: start round loop
-        if isinstance(game, JCoGame):
-            jco_cog = self.bot.get_cog("JCoCommands")
-            if jco_cog:
-                jco_cog._round_task = asyncio.create_task(
-                    jco_cog.start_round_loop()
-                )
-
-        # Chén Thánh: start round loop
-        if isinstance(game, ChenThanhGame):
-            ct_cog = self.bot.get_cog("ChenThanhCommands")
-            if ct_cog:
-                ct_cog._round_task = asyncio.create_task(
-                    ct_cog.start_round_loop()
-                )
-
-        # Đấu Trường: start round loop
-        if isinstance(game, ArenaGame):
-            arena_cog = self.bot.get_cog("ArenaCommands")
-            if arena_cog:
-                arena_cog._round_task = asyncio.create_task(
-                    arena_cog.start_round_loop()
-                )
+        # Game chạy theo vòng: khởi động round loop trong cog của game
+        self.bot.start_round_loop(game)
 
     # ------------------------------------------------------------------
     # /pausegame
@@ -495,11 +484,53 @@ class HostCommands(commands.Cog):
             )
             return
 
-        self.bot.current_game.state = GameState.PAUSED
+        self.bot.current_game.pause()
         self.bot.current_game.log_event("Game bị tạm dừng")
 
         await interaction.response.send_message("⏸️ Game đã tạm dừng!")
 
+        # Board không tự sửa giữa vòng → vẽ lại trạng thái tạm dừng
+        if self.bot.current_game.live_board:
+            await self.bot.current_game.live_board.refresh()
+
+    # ------------------------------------------------------------------
+    # /resumegame
+    # ------------------------------------------------------------------
+
+    @app_commands.command(name="resumegame", description="Tiếp tục game đang tạm dừng")
+    async def resume_game(self, interaction: discord.Interaction):
+        if not self.bot.current_game:
+            await interaction.response.send_message(
+                "❌ Không có game nào đang diễn ra!", ephemeral=True
+            )
+            return
+
+        if self.bot.current_game.host_id != interaction.user.id:
+            await interaction.response.send_message(
+                "❌ Chỉ host mới có quyền tiếp tục game!", ephemeral=True
+            )
+            return
+
+        if self.bot.current_game.state != GameState.PAUSED:
+            await interaction.response.send_message(
+                "❌ Game không đang tạm dừng!", ephemeral=True
+            )
+            return
+
+        game = self.bot.current_game
+        game.resume()
+        game.log_event("Game tiếp tục")
+
+        message = "▶️ Game tiếp tục!"
+        if game.round_timer:
+            message += f" Vòng hiện tại còn **{int(game.round_timer.remaining)}** giây."
+        await interaction.response.send_message(message)
+        if game.live_board:
+            await game.live_board.refresh()
+
+        # Vòng lặp vẫn đang chờ timer; chỉ khởi động lại nếu nó đã dừng hẳn
+        self.bot.start_round_loop(game)
+
     # ------------------------------------------------------------------
     # /endgame
     # ------------------------------------------------------------------
@@ -520,38 +551,21 @@ class HostCommands(commands.Cog):
 
         game = self.bot.current_game
 
-        # Cancel K Rô round task if running
-        if isinstance(game, KRoGame):
-            kro_cog = self.bot.get_cog("KRoCommands")
-            if kro_cog and kro_cog._round_task and not kro_cog._round_task.done():
-                kro_cog._round_task.cancel()
-
-        # Cancel J Cơ round task if running
-        if isinstance(game, JCoGame):
-            jco_cog = self.bot.get_cog("JCoCommands")
-            if jco_cog and jco_cog._round_task and not jco_cog._round_task.done():
-                jco_cog._round_task.cancel()
-
-        # Cancel Chén Thánh round task if running
-        if isinstance(game, ChenThanhGame):
-            ct_cog = self.bot.get_cog("ChenThanhCommands")
-            if ct_cog and ct_cog._round_task and not ct_cog._round_task.done():
-                ct_cog._round_task.cancel()
-
-        # Cancel Đấu Trường round task if running
-        if isinstance(game, ArenaGame):
-            arena_cog = self.bot.get_cog("ArenaCommands")
-            if arena_cog and arena_cog._round_task and not arena_cog._round_task.done():
-                arena_cog._round_task.cancel()
+        # Cancel round task if running
+        if game.round_task and not game.round_task.done():
+            game.round_task.cancel()
+
+        if game.round_timer:
+            game.round_timer.cancel()
 
         # Lấy leaderboard TRƯỚC khi đổi state
-        leaderboard = game.get_leaderboard() if isinstance(game, LiXiNgayTetGame) else []
+        leaderboard = game.get_leaderboard() if game.game_type == GameType.LI_XI_NGAY_TET else []
 
         await game.on_game_end()
         game.state = GameState.ENDED
         game.log_event("Game kết thúc")
 
-        if isinstance(game, LiXiNgayTetGame) and leaderboard:
+        if game.game_type == GameType.LI_XI_NGAY_TET and leaderboard:
             embed = discord.Embed(
                 title="🏆 GAME KẾT THÚC - BẢNG XẾP HẠNG CUỐI CÙNG",
                 color=discord.Color.gold(),
@@ -569,7 +583,7 @@ class HostCommands(commands.Cog):
 
             embed.description = description or "Không có người chơi"
             await interaction.response.send_message(embed=embed)
-        elif isinstance(game, KRoGame):
+        elif game.game_type == GameType.KRO:
             alive = game.alive_players
             embed = discord.Embed(
                 title="🏁 GAME K RÔ KẾT THÚC",
@@ -593,7 +607,7 @@ class HostCommands(commands.Cog):
                     lines.append(f"{medal} **{n}**: {pen} phạt{status}")
                 embed.description = "\n".join(lines) if lines else "Không có người chơi"
             await interaction.response.send_message(embed=embed)
-        elif isinstance(game, JCoGame):
+        elif game.game_type == GameType.JCO:
             jco_user = self.bot.get_user(game.jco_id) if game.jco_id else None
             jco_name = jco_user.display_name if jco_user else f"ID {game.jco_id}"
             embed = discord.Embed(
@@ -611,7 +625,7 @@ class HostCommands(commands.Cog):
                 inline=False,
             )
             await interaction.response.send_message(embed=embed)
-        elif isinstance(game, ChenThanhGame):
+        elif game.game_type == GameType.CHEN_THANH:
             is_over, reason, winners = game.check_game_over()
             embed = discord.Embed(
                 title="🏁 GAME CHÉN THÁNH KẾT THÚC",
@@ -646,7 +660,7 @@ class HostCommands(commands.Cog):
                 inline=False,
             )
             await interaction.response.send_message(embed=embed)
-        elif isinstance(game, ArenaGame):
+        elif game.game_type == GameType.ARENA:
             is_over, reason, winners = game.check_game_over()
             embed = discord.Embed(
                 title="🏁 GAME ĐẤU TRƯỜNG KẾT THÚC",
@@ -682,14 +696,19 @@ class HostCommands(commands.Cog):
         else:
             await interaction.response.send_message("🏁 Game đã kết thúc!")
 
-        # Reset
-        self.bot.current_game = None
-        self.bot.current_game_type = None
+        # Round loop đã bị huỷ ở trên → tự đóng live board (vẽ lần cuối, bỏ ghim)
+        if game.live_board:
+            await game.live_board.close()
+
+        # Lưu kết quả rồi reset
+        await self.bot.archive_game(game)
+        await self.bot.end_current_game()
 
     # ------------------------------------------------------------------
     # /log – gửi log qua DM cho host
     # ------------------------------------------------------------------
 
+    @auto_defer(ephemeral=True)
     @app_commands.command(name="log", description="Xuất log game (gửi qua DM)")
     async def log_command(self, interaction: discord.Interaction):
         if not self.bot.current_game:
@@ -709,13 +728,15 @@ class HostCommands(commands.Cog):
             io.BytesIO(log_content.encode("utf-8")), filename="game_log.txt"
         )
 
-        try:
-            dm = await interaction.user.create_dm()
-            await dm.send("📝 Game log:", file=file)
+        # DM chậm / phải retry thì interaction được tự defer (xem auto_defer)
+        success, error = await self.bot.dm.send(
+            interaction.user, content="📝 Game log:", file=file, user_initiated=True
+        )
+        if success:
             await interaction.response.send_message(
                 "✅ Đã gửi log qua DM!", ephemeral=True
             )
-        except discord.Forbidden:
+        else:
             await interaction.response.send_message(
                 "❌ Không thể gửi DM. Hãy bật nhận tin nhắn từ thành viên server!",
                 ephemeral=True,
@@ -777,6 +798,119 @@ class HostCommands(commands.Cog):
             f"✅ Đã set game channel: {channel.mention}"
         )
 
+    # ------------------------------------------------------------------
+    # /reload – nạp lại cog của một game, vòng đang chạy không bị gián đoạn
+    # ------------------------------------------------------------------
+
+    @app_commands.command(name="reload", description="Nạp lại code của một game (chủ bot)")
+    @app_commands.describe(game_type="Game cần nạp lại")
+    @app_commands.choices(
+        game_type=[app_commands.Choice(name=gt.value, value=gt.value) for gt in GameType]
+    )
+    async def reload_game(
+        self, interaction: discord.Interaction, game_type: app_commands.Choice[str]
+    ):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "❌ Chỉ chủ bot mới có quyền reload!", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        success, error, elapsed = await self.bot.games.reload(GameType(game_type.value))
+        if not success:
+            await interaction.followup.send(f"❌ {error}", ephemeral=True)
+            return
+
+        live = len(self.bot.sessions.games_of(GameType(game_type.value)))
+        await interaction.followup.send(
+            f"✅ Đã reload **{game_type.value}** trong **{elapsed * 1000:.1f} ms** "
+            f"({live} game đang chạy tiếp).\n"
+            "Nếu đổi tham số lệnh, cần khởi động lại để sync command tree.",
+            ephemeral=True,
+        )
+
+    # ------------------------------------------------------------------
+    # /profiler – bật / tắt sampling profiler, báo cáo gửi dạng file zip
+    # ------------------------------------------------------------------
+
+    @auto_defer(ephemeral=True)
+    @app_commands.command(name="profiler", description="Bật / tắt profiler của bot (host hoặc chủ bot)")
+    @app_commands.describe(action="start: bắt đầu lấy mẫu, stop: dừng và nhận báo cáo")
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="start", value="start"),
+            app_commands.Choice(name="stop", value="stop"),
+        ]
+    )
+    async def profiler(
+        self, interaction: discord.Interaction, action: app_commands.Choice[str]
+    ):
+        game = self.bot.current_game
+        is_host = game is not None and game.host_id == interaction.user.id
+        if not is_host and not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "❌ Chỉ host hoặc chủ bot mới có quyền dùng profiler!", ephemeral=True
+            )
+            return
+
+        profiler = self.bot.profiler
+        if action.value == "start":
+            success, error = profiler.start()
+            if not success:
+                await interaction.response.send_message(f"❌ {error}", ephemeral=True)
+                return
+            await interaction.response.send_message(
+                f"✅ Đã bật profiler (mỗi {profiler.interval * 1000:.0f} ms, "
+                f"tự dừng sau {profiler.max_seconds:.0f} giây). "
+                "Dùng `/profiler stop` để nhận báo cáo.",
+                ephemeral=True,
+            )
+            return
+
+        success, error = profiler.stop()
+        if not success:
+            await interaction.response.send_message(f"❌ {error}", ephemeral=True)
+            return
+        # Timer đã tắt → nén báo cáo ngoài event loop
+        report = await asyncio.to_thread(profiler.build_report)
+        file = discord.File(io.BytesIO(report), filename=profiler.report_filename())
+        await interaction.response.send_message(
+            f"📈 Báo cáo profiler: **{profiler.samples}** mẫu bận, "
+            f"**{profiler.idle}** mẫu rảnh.",
+            file=file,
+            ephemeral=True,
+        )
+
+    # ------------------------------------------------------------------
+    # /shards
+    # ------------------------------------------------------------------
+
+    @app_commands.command(name="shards", description="Xem tình trạng các shard")
+    @app_commands.default_permissions(manage_guild=True)
+    async def shards(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="🛰️ Shards", color=discord.Color.blurple())
+        # Embed tối đa 25 field
+        for stats in self.bot.shard_stats()[:25]:
+            latency = (
+                f"{stats['latency_ms']} ms"
+                if stats["latency_ms"] is not None
+                else "N/A"
+            )
+            embed.add_field(
+                name=f"Shard {stats['shard_id']}",
+                value=(
+                    f"Latency: **{latency}**\n"
+                    f"Guild: **{stats['guilds']}**\n"
+                    f"Event/phút: **{stats['events_per_minute']}**\n"
+                    f"Game: **{stats['games']}** "
+                    f"(round loop: {stats['round_loops']})\n"
+                    f"Reconnect: {stats['disconnects']}"
+                ),
+                inline=True,
+            )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot: MinigameBot):
     await bot.add_cog(HostCommands(bot))
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-import asyncio
 import math
+from collections.abc import Sequence
 from typing import TYPE_CHECKING, Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+import config
+from auto_defer import auto_defer
 from enums import GameState, GameType
 from games.jco_game import JCoGame, JCoRoundResult
+from live_board import LiveBoard
 
 if TYPE_CHECKING:
     from bot import MinigameBot
@@ -33,9 +36,9 @@ class CheckNumberView(discord.ui.View):
 
     PER_PAGE = 10
 
-    def __init__(self, data: list[tuple[int, int]], bot: MinigameBot, user_id: int):
+    def __init__(self, data: Sequence[tuple[int, int]], bot: MinigameBot, user_id: int):
         super().__init__(timeout=120)
-        self.data = data  # [(player_id, number)]
+        self.data = data  # [(player_id, number)], dùng chung bảng số của vòng
         self.bot = bot
         self.user_id = user_id
         self.current_page = 0
@@ -183,11 +186,11 @@ class JCoCommands(commands.Cog):
 
     def __init__(self, bot: MinigameBot):
         self.bot = bot
-        self._round_task: Optional[asyncio.Task] = None
 
     def cog_unload(self):
-        if self._round_task and not self._round_task.done():
-            self._round_task.cancel()
+        for game in self.bot.sessions.games_of(GameType.JCO):
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -207,12 +210,6 @@ class JCoCommands(commands.Cog):
         """Gửi DM cho J Cơ hiện tại biết mình là J Cơ."""
         if not game.jco_id:
             return
-        user = self.bot.get_user(game.jco_id)
-        if not user:
-            try:
-                user = await self.bot.fetch_user(game.jco_id)
-            except Exception:
-                return
         if is_rotation:
             embed = discord.Embed(
                 title="🔄 BẠN LÀ J CƠ MỚI!",
@@ -233,11 +230,9 @@ class JCoCommands(commands.Cog):
                 ),
                 color=discord.Color.dark_red(),
             )
-        try:
-            dm = await user.create_dm()
-            await dm.send(embed=embed)
-        except discord.Forbidden:
-            pass
+        success, error = await self.bot.dm.send(game.jco_id, embed=embed)
+        if not success:
+            print(f"⚠️ Không gửi được DM J Cơ cho {game.jco_id}: {error}")
 
     # ------------------------------------------------------------------
     # Round loop
@@ -245,16 +240,25 @@ class JCoCommands(commands.Cog):
 
     async def start_round_loop(self):
         """Vòng lặp tự động cho J Cơ."""
-        game = self._get_running_game()
-        if not game:
+        # Game đang tạm dừng vẫn chạy loop (timer đứng yên), vd: sau /reload
+        game = self.bot.current_game
+        if not isinstance(game, JCoGame) or game.state not in (
+            GameState.RUNNING,
+            GameState.PAUSED,
+        ):
             return
 
-        # DM thông báo J Cơ đầu game
-        await self._notify_jco_dm(game, is_rotation=False)
-
-        while game.state == GameState.RUNNING:
-            game.current_answers.clear()
-            game.current_votes.clear()
+        # DM thông báo J Cơ đầu game (game khôi phục từ snapshot đã DM rồi)
+        if game.restored_round is None:
+            await self._notify_jco_dm(game, is_rotation=False)
+
+        board: Optional[LiveBoard] = None
+        while game.state in (GameState.RUNNING, GameState.PAUSED):
+            # Vòng đang dở khi khôi phục từ snapshot: giữ lựa chọn, không thông báo lại
+            resumed = game.take_restored_round()
+            if resumed is None:
+                game.current_answers.clear()
+                game.clear_votes()
             alive = game.alive_players
             if len(alive) <= 1:
                 break
@@ -265,7 +269,31 @@ class JCoCommands(commands.Cog):
                 if game.notif_channel_id
                 else None
             )
-            if channel:
+            # Timer chạy trước để board hiển thị được giờ kết thúc vòng
+            timer = game.start_round_timer(
+                game.interval_seconds if resumed is None else resumed
+            )
+            hint = f"Dùng `/answer` để nhập số của bạn (1-{game.settings['M']})."
+            if game.current_round >= 1:
+                hint += "\nDùng `/vote` để vote loại người nghi ngờ là J Cơ."
+            if game.settings["rotation"]:
+                hint += f"\n🔄 Chuỗi vòng không loại: **{game.no_elimination_streak}/3**"
+            if channel and board is None and config.LIVE_BOARD:
+                board = await LiveBoard.open(
+                    self.bot,
+                    game,
+                    channel,
+                    title="J Cơ",
+                    hint=hint,
+                    submitted=lambda: len(game.current_answers),
+                    color=discord.Color.green(),
+                    mid_round=config.LIVE_BOARD_MID_ROUND_UPDATE,
+                )
+            elif board:
+                board.hint = hint
+                await board.refresh(force=True)
+
+            if channel and resumed is None and board is None:
                 M = game.settings["M"]
                 round_num = game.current_round + 1
                 embed = discord.Embed(
@@ -295,24 +323,35 @@ class JCoCommands(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-            # Đợi hết thời gian vòng
-            await asyncio.sleep(game.interval_seconds)
+            # Đợi hết thời gian vòng (tạm dừng sẽ đóng băng thời gian còn lại)
+            await game.wait_round(timer, board)
 
-            if game.state != GameState.RUNNING:
+            # Game có thể đã kết thúc trong lúc chờ
+            if game.state not in (GameState.RUNNING, GameState.PAUSED):
                 break
 
+            # Worker khác đã nhận game (mất lease) → không xử lý vòng này
+            if not await self.bot.confirm_lease(game):
+                return
+
             # Resolve vòng
             result = game.resolve_round()
             if not result:
                 continue
 
-            # Announce
+            # Announce (có live board thì chỉ gửi khi có người bị loại)
+            if board:
+                board.last_result = (
+                    f"💀 Bị loại: **{len(result.eliminated)}** | "
+                    f"🗳️ Bị vote loại: **{len(result.voted_out)}**"
+                )
             if channel:
-                embed = self._build_result_embed(result)
-                try:
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    pass
+                if board is None or result.eliminated or result.voted_out:
+                    embed = self._build_result_embed(result)
+                    try:
+                        await channel.send(embed=embed)
+                    except discord.Forbidden:
+                        pass
 
                 # Notify rotation secretly — chỉ ẩn danh, thông báo chung có "đảo vai xảy ra"
                 if result.rotation_happened:
@@ -343,10 +382,15 @@ class JCoCommands(commands.Cog):
                     except discord.Forbidden:
                         pass
 
-                self.bot.current_game = None
-                self.bot.current_game_type = None
+                if board:
+                    await board.close()
+                await self.bot.archive_game(game)
+                await self.bot.end_current_game()
                 return
 
+        if board:
+            await board.close()
+
     def _build_result_embed(self, rr: JCoRoundResult) -> discord.Embed:
         embed = discord.Embed(
             title=f"📊 Kết quả Vòng {rr.round_number}",
@@ -423,6 +467,7 @@ class JCoCommands(commands.Cog):
     # /checknumber
     # ------------------------------------------------------------------
 
+    @auto_defer(ephemeral=True)
     @app_commands.command(
         name="checknumber",
         description="[J Cơ] Xem số trên gáy người khác (gửi qua DM)",
@@ -443,13 +488,15 @@ class JCoCommands(commands.Cog):
         view = CheckNumberView(data, self.bot, interaction.user.id)
         embed = view.get_page_embed()
 
-        try:
-            dm = await interaction.user.create_dm()
-            await dm.send(embed=embed, view=view)
+        # DM chậm / phải retry thì interaction được tự defer (xem auto_defer)
+        success, error = await self.bot.dm.send(
+            interaction.user, embed=embed, view=view, user_initiated=True
+        )
+        if success:
             await interaction.response.send_message(
                 "✅ Đã gửi danh sách số qua DM!", ephemeral=True
             )
-        except discord.Forbidden:
+        else:
             await interaction.response.send_message(
                 "❌ Không thể gửi DM. Hãy bật nhận tin nhắn từ thành viên server!",
                 ephemeral=True,
@@ -522,24 +569,7 @@ class JCoCommands(commands.Cog):
     # /status_jco
     # ------------------------------------------------------------------
 
-    @app_commands.command(
-        name="status_jco",
-        description="[J Cơ] Xem số người còn lại và chuỗi vòng không loại",
-    )
-    async def status_jco(self, interaction: discord.Interaction):
-        if not _in_game_channel(self.bot, interaction):
-            await interaction.response.send_message(
-                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
-            )
-            return
-
-        game = self._get_running_game()
-        if not game:
-            await interaction.response.send_message(
-                "❌ Không có game J Cơ nào đang chạy!", ephemeral=True
-            )
-            return
-
+    def _build_status_embed(self, game: JCoGame) -> discord.Embed:
         alive = game.alive_players
         embed = discord.Embed(
             title="📋 Trạng thái Game J Cơ",
@@ -568,6 +598,22 @@ class JCoCommands(commands.Cog):
                 name="🔄 Đảo vai", value="Tắt", inline=False
             )
 
+        # Vote hiện tại (đọc thẳng từ tally)
+        if game.current_round >= 1:
+            top_votes = sorted(
+                game.vote_counts.items(), key=lambda kv: kv[1], reverse=True
+            )[:5]
+            lines = []
+            for pid, count in top_votes:
+                user = self.bot.get_user(pid)
+                name = user.display_name if user else f"ID {pid}"
+                lines.append(f"• **{name}**: {count} phiếu")
+            embed.add_field(
+                name=f"🗳️ Vote (cần > {game.alive_count // 2} phiếu)",
+                value="\n".join(lines) if lines else "Chưa có ai vote",
+                inline=False,
+            )
+
         # Show alive player names
         alive_names = []
         for pid in alive:
@@ -578,7 +624,27 @@ class JCoCommands(commands.Cog):
             value=", ".join(alive_names) if alive_names else "Không có",
             inline=False,
         )
+        return embed
+
+    @app_commands.command(
+        name="status_jco",
+        description="[J Cơ] Xem số người còn lại và chuỗi vòng không loại",
+    )
+    async def status_jco(self, interaction: discord.Interaction):
+        if not _in_game_channel(self.bot, interaction):
+            await interaction.response.send_message(
+                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
+            )
+            return
 
+        game = self._get_running_game()
+        if not game:
+            await interaction.response.send_message(
+                "❌ Không có game J Cơ nào đang chạy!", ephemeral=True
+            )
+            return
+
+        embed = game.cached_view("status", lambda: self._build_status_embed(game))
         await interaction.response.send_message(embed=embed)
 
     # ------------------------------------------------------------------
@@ -628,15 +694,41 @@ class JCoCommands(commands.Cog):
             )
             return
 
+        changed = interaction.user.id in game.current_votes
         success, error = game.vote(interaction.user.id, player.id)
         if not success:
             await interaction.response.send_message(f"❌ {error}", ephemeral=True)
             return
 
         await interaction.response.send_message(
-            f"🗳️ Bạn đã vote **{player.display_name}**", ephemeral=True
+            f"🗳️ Bạn đã {'đổi vote sang' if changed else 'vote'} "
+            f"**{player.display_name}**",
+            ephemeral=True,
         )
 
+        # Đủ >50% phiếu → kết thúc vòng sớm (nếu host bật)
+        if (
+            game.majority_target is not None
+            and game.settings.get("early_resolve")
+            and game.state == GameState.RUNNING
+            and game.round_timer
+            and not game.round_timer.expired
+        ):
+            game.log_event("Vòng kết thúc sớm do đủ phiếu vote")
+            game.round_timer.finish()
+            channel = (
+                self.bot.get_channel(game.notif_channel_id)
+                if game.notif_channel_id
+                else None
+            )
+            if channel:
+                try:
+                    await channel.send(
+                        "🗳️ Đã có người nhận hơn 50% phiếu — vòng kết thúc sớm!"
+                    )
+                except discord.Forbidden:
+                    pass
+
     # ------------------------------------------------------------------
     # /cheat_jco (J Cơ only)
     # ------------------------------------------------------------------
@@ -682,7 +774,7 @@ class JCoCommands(commands.Cog):
             )
             return
 
-        game.state = GameState.PAUSED
+        game.pause()
         game.log_event("Game J Cơ tạm dừng")
         await interaction.response.send_message("⏸️ Game J Cơ đã tạm dừng!")
 
@@ -719,13 +811,16 @@ class JCoCommands(commands.Cog):
             )
             return
 
-        game.state = GameState.RUNNING
+        game.resume()
         game.log_event("Game J Cơ tiếp tục")
-        await interaction.response.send_message("▶️ Game J Cơ tiếp tục!")
+        remaining = game.round_timer.remaining if game.round_timer else None
+        await interaction.response.send_message(
+            "▶️ Game J Cơ tiếp tục!"
+            + (f" Vòng còn **{int(remaining)}** giây." if remaining is not None else "")
+        )
 
-        # Restart round loop
-        if self._round_task is None or self._round_task.done():
-            self._round_task = asyncio.create_task(self.start_round_loop())
+        # Vòng lặp vẫn đang chờ timer, chỉ khởi động lại nếu nó đã dừng hẳn
+        self.bot.start_round_loop(game)
 
 
 async def setup(bot: MinigameBot):
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
+import config
 from enums import GameState, GameType
 from games.kro_game import KRoGame, RoundResult
+from live_board import LiveBoard
 
 if TYPE_CHECKING:
     from bot import MinigameBot
@@ -22,6 +24,16 @@ def _in_game_channel(bot: MinigameBot, interaction: discord.Interaction) -> bool
     return interaction.channel_id == bot.current_game.game_channel_id
 
 
+# Bàn lớn: embed field tối đa 1024 ký tự → chỉ liệt kê một phần
+MAX_LISTED = 20
+
+
+def _join_limited(lines: List[str], sep: str = "\n") -> str:
+    if len(lines) <= MAX_LISTED:
+        return sep.join(lines)
+    return sep.join(lines[:MAX_LISTED]) + f"{sep}… và {len(lines) - MAX_LISTED} người khác"
+
+
 class HistoryView(discord.ui.View):
     """Pagination view cho /history."""
 
@@ -99,7 +111,7 @@ def _build_round_embed(
         pick_lines.append(f"• **{name}**: {num}{marker}")
     embed.add_field(
         name="🔢 Số đã chọn",
-        value="\n".join(pick_lines) if pick_lines else "Không ai chọn",
+        value=_join_limited(pick_lines) if pick_lines else "Không ai chọn",
         inline=False,
     )
 
@@ -129,7 +141,7 @@ def _build_round_embed(
         for pid in pids:
             user = bot.get_user(pid)
             names.append(user.display_name if user else f"ID {pid}")
-        return ", ".join(names) if names else "Không có"
+        return _join_limited(names, ", ") if names else "Không có"
 
     if rr.rule_0_100_winner:
         user = bot.get_user(rr.rule_0_100_winner)
@@ -166,11 +178,11 @@ class KRoCommands(commands.Cog):
 
     def __init__(self, bot: MinigameBot):
         self.bot = bot
-        self._round_task: Optional[asyncio.Task] = None
 
     def cog_unload(self):
-        if self._round_task and not self._round_task.done():
-            self._round_task.cancel()
+        for game in self.bot.sessions.games_of(GameType.KRO):
+            if game.round_task and not game.round_task.done():
+                game.round_task.cancel()
 
     # ------------------------------------------------------------------
     # Helpers
@@ -188,12 +200,20 @@ class KRoCommands(commands.Cog):
 
     async def start_round_loop(self):
         """Bắt đầu vòng lặp tự động cho K Rô."""
-        game = self._get_running_game()
-        if not game:
+        # Game đang tạm dừng vẫn chạy loop (timer đứng yên), vd: sau /reload
+        game = self.bot.current_game
+        if not isinstance(game, KRoGame) or game.state not in (
+            GameState.RUNNING,
+            GameState.PAUSED,
+        ):
             return
 
-        while game.state == GameState.RUNNING:
-            game.current_picks.clear()
+        board: Optional[LiveBoard] = None
+        while game.state in (GameState.RUNNING, GameState.PAUSED):
+            # Vòng đang dở khi khôi phục từ snapshot: giữ lựa chọn, không thông báo lại
+            resumed = game.take_restored_round()
+            if resumed is None:
+                game.clear_picks()
             alive = game.alive_players
             if len(alive) <= 1:
                 break
@@ -204,7 +224,30 @@ class KRoCommands(commands.Cog):
                 if game.notif_channel_id
                 else None
             )
-            if channel:
+            # Timer chạy trước để board hiển thị được giờ kết thúc vòng
+            timer = game.start_round_timer(
+                game.interval_seconds if resumed is None else resumed
+            )
+            hint = "Dùng `/pick` để chọn số từ **0** đến **100**."
+            rules = game.get_active_rules()
+            if rules:
+                hint += "\n" + "\n".join(rules)
+            if channel and board is None and config.LIVE_BOARD:
+                board = await LiveBoard.open(
+                    self.bot,
+                    game,
+                    channel,
+                    title="K Rô",
+                    hint=hint,
+                    submitted=lambda: len(game.current_picks),
+                    color=discord.Color.green(),
+                    mid_round=config.LIVE_BOARD_MID_ROUND_UPDATE,
+                )
+            elif board:
+                board.hint = hint
+                await board.refresh(force=True)
+
+            if channel and resumed is None and board is None:
                 alive_count = len(alive)
                 embed = discord.Embed(
                     title=f"🔔 Vòng {game.current_round + 1} bắt đầu!",
@@ -227,14 +270,19 @@ class KRoCommands(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-            # Wait for the round interval
-            await asyncio.sleep(game.interval_seconds)
+            # Wait for the round interval (pausing freezes the remaining time)
+            await game.wait_round(timer, board)
 
-            # Game may have been paused / ended during sleep
-            if game.state != GameState.RUNNING:
+            # Game may have ended during the round
+            if game.state not in (GameState.RUNNING, GameState.PAUSED):
                 break
 
+            # Worker khác đã nhận game (mất lease) → không resolve vòng này
+            if not await self.bot.confirm_lease(game):
+                return
+
             # Resolve
+            eliminated_before = len(game.eliminated)
             result = game.resolve_round()
             if not result:
                 continue
@@ -244,8 +292,14 @@ class KRoCommands(commands.Cog):
                 f"winners={result.winners}, losers={result.losers}"
             )
 
-            # Announce result
-            if channel:
+            # Announce result (có live board thì chỉ gửi khi có người bị loại)
+            if board:
+                target = f"{result.target:.2f}" if result.target is not None else "N/A"
+                board.last_result = (
+                    f"🎯 Mục tiêu: **{target}** | Thắng: **{len(result.winners)}** | "
+                    f"Bị phạt: **{len(result.losers)}**"
+                )
+            if channel and (board is None or len(game.eliminated) > eliminated_before):
                 embed = _build_round_embed(result, self.bot)
                 try:
                     await channel.send(embed=embed)
@@ -277,10 +331,15 @@ class KRoCommands(commands.Cog):
                     except discord.Forbidden:
                         pass
 
-                self.bot.current_game = None
-                self.bot.current_game_type = None
+                if board:
+                    await board.close()
+                await self.bot.archive_game(game)
+                await self.bot.end_current_game()
                 return
 
+        if board:
+            await board.close()
+
     # ------------------------------------------------------------------
     # /pick
     # ------------------------------------------------------------------
@@ -314,24 +373,7 @@ class KRoCommands(commands.Cog):
     # /rules_update
     # ------------------------------------------------------------------
 
-    @app_commands.command(
-        name="rules_update",
-        description="[K Rô] Xem luật bổ sung đang kích hoạt",
-    )
-    async def rules_update(self, interaction: discord.Interaction):
-        if not _in_game_channel(self.bot, interaction):
-            await interaction.response.send_message(
-                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
-            )
-            return
-
-        game = self._get_running_game()
-        if not game:
-            await interaction.response.send_message(
-                "❌ Không có game K Rô nào đang chạy!", ephemeral=True
-            )
-            return
-
+    def _build_rules_embed(self, game: KRoGame) -> discord.Embed:
         rules = game.get_active_rules()
         alive_count = len(game.alive_players)
         eliminated_count = len(game.eliminated)
@@ -357,17 +399,13 @@ class KRoCommands(commands.Cog):
                 value="Chưa có luật bổ sung nào được kích hoạt (>4 người chơi).",
                 inline=False,
             )
-
-        await interaction.response.send_message(embed=embed)
-
-    # ------------------------------------------------------------------
-    # /status
-    # ------------------------------------------------------------------
+        return embed
 
     @app_commands.command(
-        name="status_kro", description="[K Rô] Xem điểm phạt và danh sách bị loại"
+        name="rules_update",
+        description="[K Rô] Xem luật bổ sung đang kích hoạt",
     )
-    async def status_kro(self, interaction: discord.Interaction):
+    async def rules_update(self, interaction: discord.Interaction):
         if not _in_game_channel(self.bot, interaction):
             await interaction.response.send_message(
                 "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
@@ -381,6 +419,14 @@ class KRoCommands(commands.Cog):
             )
             return
 
+        embed = game.cached_view("rules", lambda: self._build_rules_embed(game))
+        await interaction.response.send_message(embed=embed)
+
+    # ------------------------------------------------------------------
+    # /status
+    # ------------------------------------------------------------------
+
+    def _build_status_embed(self, game: KRoGame) -> discord.Embed:
         alive_data, eliminated_ids = game.get_status_embed_data()
         max_pen = game.settings["max_penalty"]
 
@@ -402,7 +448,7 @@ class KRoCommands(commands.Cog):
 
         embed.add_field(
             name=f"✅ Còn sống ({len(alive_data)})",
-            value="\n".join(alive_lines) if alive_lines else "Không có",
+            value=_join_limited(alive_lines) if alive_lines else "Không có",
             inline=False,
         )
 
@@ -415,10 +461,29 @@ class KRoCommands(commands.Cog):
                 elim_lines.append(f"{idx}. ~~{name}~~")
             embed.add_field(
                 name=f"💀 Đã bị loại ({len(eliminated_ids)})",
-                value="\n".join(elim_lines),
+                value=_join_limited(elim_lines),
                 inline=False,
             )
+        return embed
+
+    @app_commands.command(
+        name="status_kro", description="[K Rô] Xem điểm phạt và danh sách bị loại"
+    )
+    async def status_kro(self, interaction: discord.Interaction):
+        if not _in_game_channel(self.bot, interaction):
+            await interaction.response.send_message(
+                "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
+            )
+            return
+
+        game = self._get_running_game()
+        if not game:
+            await interaction.response.send_message(
+                "❌ Không có game K Rô nào đang chạy!", ephemeral=True
+            )
+            return
 
+        embed = game.cached_view("status", lambda: self._build_status_embed(game))
         await interaction.response.send_message(embed=embed)
 
     # ------------------------------------------------------------------
@@ -6,40 +6,49 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+import config
 from enums import GameState
-from games.li_xi_game import LiXiNgayTetGame
+from games.li_xi_game import GAMBLE_DAILY_LIMIT, LEADERBOARD_PAGE_SIZE, LiXiNgayTetGame
 
 if TYPE_CHECKING:
     from bot import MinigameBot
 
 
 class LeaderboardView(discord.ui.View):
-    """View cho phân trang bảng xếp hạng."""
+    """View cho phân trang bảng xếp hạng.
 
-    def __init__(self, leaderboard_data: list, game_day: int, bot, user_id: int):
+    Chỉ giữ tham chiếu tới snapshot dùng chung của game + số trang; mỗi lần
+    bấm nút lấy snapshot mới nhất (nếu game đã đổi) và giữ nguyên trang.
+    """
+
+    def __init__(self, game: LiXiNgayTetGame, bot, user_id: int):
         super().__init__()
-        self.leaderboard_data = leaderboard_data
-        self.game_day = game_day
+        self.game = game
+        self.snapshot = game.leaderboard_snapshot(config.LEADERBOARD_STALE_SECONDS)
         self.bot = bot
         self.user_id = user_id
         self.current_page = 0
-        self.total_pages = (len(leaderboard_data) + 9) // 10  # Làm tròn lên
         self.update_buttons()
 
+    def refresh(self):
+        """Lấy snapshot mới nhất, giữ trang hiện tại (kẹp lại nếu số trang giảm)."""
+        self.snapshot = self.game.leaderboard_snapshot(config.LEADERBOARD_STALE_SECONDS)
+        self.current_page = min(self.current_page, self.snapshot.total_pages - 1)
+
     def update_buttons(self):
         """Cập nhật trạng thái các nút."""
         self.prev_button.disabled = self.current_page == 0
-        self.next_button.disabled = self.current_page == self.total_pages - 1
+        self.next_button.disabled = self.current_page >= self.snapshot.total_pages - 1
 
     def get_page_embed(self) -> discord.Embed:
         """Tạo embed cho trang hiện tại."""
-        start_idx = self.current_page * 10
-        end_idx = start_idx + 10
-        page_data = self.leaderboard_data[start_idx:end_idx]
+        snapshot = self.snapshot
+        start_idx = self.current_page * LEADERBOARD_PAGE_SIZE
+        page_data = snapshot.page(self.current_page)
 
         embed = discord.Embed(
             title="🏆 BẢNG XẾP HẠNG",
-            description=f"Ngày {self.game_day} | Trang {self.current_page + 1}/{self.total_pages}",
+            description=f"Ngày {snapshot.day} | Trang {self.current_page + 1}/{snapshot.total_pages}",
             color=discord.Color.gold(),
         )
 
@@ -67,10 +76,11 @@ class LeaderboardView(discord.ui.View):
             )
             return
         
+        self.refresh()
         if self.current_page > 0:
             self.current_page -= 1
-            self.update_buttons()
-            await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
 
     @discord.ui.button(label="➡️", style=discord.ButtonStyle.blurple)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -80,10 +90,11 @@ class LeaderboardView(discord.ui.View):
             )
             return
         
-        if self.current_page < self.total_pages - 1:
+        self.refresh()
+        if self.current_page < self.snapshot.total_pages - 1:
             self.current_page += 1
-            self.update_buttons()
-            await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
 
 
 def _in_game_channel(bot: MinigameBot, interaction: discord.Interaction) -> bool:
@@ -330,8 +341,16 @@ class LiXiCommands(commands.Cog):
     @app_commands.command(
         name="gamble", description="[Lì Xì] Cố gắng vận may (1% thắng 200x, 99% thua)"
     )
-    @app_commands.describe(bet="Số tiền cược")
-    async def gamble(self, interaction: discord.Interaction, bet: int):
+    @app_commands.describe(
+        bet="Số tiền cược mỗi lần",
+        count="Số lần cược liên tiếp (mặc định 1, tối đa 200)",
+    )
+    async def gamble(
+        self,
+        interaction: discord.Interaction,
+        bet: int,
+        count: app_commands.Range[int, 1, GAMBLE_DAILY_LIMIT] = 1,
+    ):
         if not _in_game_channel(self.bot, interaction):
             await interaction.response.send_message(
                 "❌ Lệnh này chỉ được dùng trong kênh game!", ephemeral=True
@@ -351,13 +370,19 @@ class LiXiCommands(commands.Cog):
             )
             return
 
-        success, error, result = game.gamble(interaction.user.id, bet)
+        success, error, result = game.gamble(interaction.user.id, bet, count)
         if not success:
             await interaction.response.send_message(
                 f"❌ {error}", ephemeral=True
             )
             return
 
+        if result["bets"] > 1:
+            await interaction.response.send_message(
+                embed=self._gamble_batch_embed(game, interaction.user.id, bet, result)
+            )
+            return
+
         embed = discord.Embed(
             title="🎰 KẾT QUẢ CƯỢC",
             color=discord.Color.gold() if result["win"] else discord.Color.red(),
@@ -376,8 +401,39 @@ class LiXiCommands(commands.Cog):
                 inline=False,
             )
 
+        if result["stopped_early"]:
+            embed.set_footer(text=self._gamble_stop_reason(game, interaction.user.id, bet))
+
         await interaction.response.send_message(embed=embed)
 
+    def _gamble_batch_embed(
+        self, game: LiXiNgayTetGame, user_id: int, bet: int, result: dict
+    ) -> discord.Embed:
+        change = result["money_change"]
+        embed = discord.Embed(
+            title=f"🎰 KẾT QUẢ {result['bets']} LẦN CƯỢC",
+            description=f"Mỗi lần cược **{bet:,}** đồng",
+            color=discord.Color.gold() if result["wins"] else discord.Color.red(),
+        )
+        embed.add_field(name="🎉 Thắng", value=str(result["wins"]), inline=True)
+        embed.add_field(name="😢 Thua", value=str(result["losses"]), inline=True)
+        embed.add_field(
+            name="💰 Tổng", value=f"**{change:+,}** đồng", inline=True
+        )
+        embed.add_field(
+            name="👛 Còn lại",
+            value=f"{game.players[user_id]['money']:,} đồng",
+            inline=False,
+        )
+        if result["stopped_early"]:
+            embed.set_footer(text=self._gamble_stop_reason(game, user_id, bet))
+        return embed
+
+    def _gamble_stop_reason(self, game: LiXiNgayTetGame, user_id: int, bet: int) -> str:
+        if game.players[user_id]["gamble_count"] >= GAMBLE_DAILY_LIMIT:
+            return f"⏹️ Đã hết {GAMBLE_DAILY_LIMIT} lượt cược hôm nay"
+        return f"⏹️ Dừng sớm: không đủ {bet:,} đồng cho lần cược tiếp theo"
+
     # ------------------------------------------------------------------
     # /leaderboard
     # ------------------------------------------------------------------
@@ -399,15 +455,13 @@ class LiXiCommands(commands.Cog):
             )
             return
 
-        leaderboard_data = game.get_leaderboard()
-        
-        if not leaderboard_data:
+        if not game.players:
             await interaction.response.send_message(
                 "❌ Không có người chơi nào!", ephemeral=True
             )
             return
 
-        view = LeaderboardView(leaderboard_data, game.current_day, self.bot, interaction.user.id)
+        view = LeaderboardView(game, self.bot, interaction.user.id)
         embed = view.get_page_embed()
         
         await interaction.response.send_message(embed=embed, view=view)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import math
 from typing import Optional, TYPE_CHECKING
 
 import discord
@@ -7,14 +9,10 @@ from discord import app_commands
 from discord.ext import commands
 
 from enums import GameState, GameType
-from games.li_xi_game import LiXiNgayTetGame
-from games.kro_game import KRoGame
-from games.jco_game import JCoGame
-from games.chen_thanh_game import ChenThanhGame
-from games.arena_game import ArenaGame
 
 if TYPE_CHECKING:
     from bot import MinigameBot
+    from profile_store import RankIndex
 
 
 def _check_game_channel(bot: MinigameBot, interaction: discord.Interaction) -> bool:
@@ -26,6 +24,107 @@ def _check_game_channel(bot: MinigameBot, interaction: discord.Interaction) -> b
     return interaction.channel_id == bot.current_game.game_channel_id
 
 
+# Tên game + cách hiển thị chỉ số riêng (score) trong /profile
+_GAME_NAMES = {
+    GameType.LI_XI_NGAY_TET.value: "🧧 Lì Xì Ngày Tết",
+    GameType.KRO.value: "♦️ K Rô",
+    GameType.JCO.value: "🃏 J Cơ",
+    GameType.CHEN_THANH.value: "🏆 Chén Thánh Phản Bội",
+    GameType.ARENA.value: "⚔️ Đấu Trường Sinh Tử",
+}
+
+
+def _format_score(game_type: str, p: dict) -> str:
+    if game_type == GameType.LI_XI_NGAY_TET.value:
+        return f"Tiền cao nhất: **{p['score_max']:,}** đồng"
+    if game_type == GameType.KRO.value:
+        return f"Điểm phạt: tổng {p['score_sum']}, ít nhất {p['score_min']}"
+    if game_type == GameType.JCO.value:
+        return f"Làm J Cơ: **{p['score_sum']}** lần"
+    if game_type == GameType.CHEN_THANH.value:
+        return f"Đóng góp: tổng **{p['score_sum']}** lần"
+    if game_type == GameType.ARENA.value:
+        return f"Hủy diệt: **{p['score_sum']}** kill"
+    return f"Điểm: {p['score_sum']}"
+
+
+ALLTIME_PAGE_SIZE = 10
+
+
+class AllTimeView(discord.ui.View):
+    """Phân trang bảng xếp hạng trọn đời; mỗi trang là một lát cắt của RankIndex."""
+
+    def __init__(self, bot: MinigameBot, index: RankIndex, game_type: str, user_id: int):
+        super().__init__()
+        self.bot = bot
+        self.index = index
+        self.game_type = game_type
+        self.user_id = user_id
+        self.current_page = 0
+        self.update_buttons()
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, math.ceil(len(self.index) / ALLTIME_PAGE_SIZE))
+
+    def update_buttons(self):
+        self.current_page = min(self.current_page, self.total_pages - 1)
+        self.prev_button.disabled = self.current_page == 0
+        self.next_button.disabled = self.current_page >= self.total_pages - 1
+
+    def get_page_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"🏛️ BXH TRỌN ĐỜI: {_GAME_NAMES[self.game_type]}",
+            description=f"Trang {self.current_page + 1}/{self.total_pages}",
+            color=discord.Color.gold(),
+        )
+        lines = []
+        rows = self.index.page(self.current_page * ALLTIME_PAGE_SIZE, ALLTIME_PAGE_SIZE)
+        for rank, player_id, (wins, points, games) in rows:
+            user = self.bot.get_user(player_id)
+            name = user.display_name if user else f"ID {player_id}"
+            medal = ["🥇", "🥈", "🥉"][rank - 1] if rank <= 3 else f"#{rank}"
+            lines.append(
+                f"{medal} **{name}**: {wins} thắng | {points} điểm | {games} game"
+            )
+        embed.add_field(
+            name="Xếp theo số trận thắng, rồi điểm (số người xếp dưới mỗi game)",
+            value="\n".join(lines) or "Chưa có dữ liệu",
+            inline=False,
+        )
+
+        my_rank = self.index.rank_of(self.user_id)
+        if my_rank is not None:
+            embed.set_footer(text=f"Hạng của bạn: #{my_rank}/{len(self.index)}")
+        return embed
+
+    @discord.ui.button(label="⬅️", style=discord.ButtonStyle.blurple)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message(
+                "❌ Chỉ người gọi lệnh mới có thể sử dụng nút này!", ephemeral=True
+            )
+            return
+
+        if self.current_page > 0:
+            self.current_page -= 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
+
+    @discord.ui.button(label="➡️", style=discord.ButtonStyle.blurple)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message(
+                "❌ Chỉ người gọi lệnh mới có thể sử dụng nút này!", ephemeral=True
+            )
+            return
+
+        if self.current_page < self.total_pages - 1:
+            self.current_page += 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.get_page_embed(), view=self)
+
+
 class UserCommands(commands.Cog):
     """Lệnh chung cho người chơi."""
 
@@ -141,6 +240,7 @@ class UserCommands(commands.Cog):
                 "`/endregister` - Đóng đăng ký\n"
                 "`/startgame` - Bắt đầu game\n"
                 "`/pausegame` - Tạm dừng\n"
+                "`/resumegame` - Tiếp tục\n"
                 "`/endgame` - Kết thúc game\n"
                 "`/log` - Xuất log\n"
                 "`/setnotifchannel` - Set kênh thông báo\n"
@@ -313,7 +413,7 @@ class UserCommands(commands.Cog):
             embed.add_field(
                 name="Vote (từ vòng 2)",
                 value=(
-                    "• Mỗi người vote 1 người nghi là J Cơ\n"
+                    "• Mỗi người vote 1 người nghi là J Cơ (được đổi vote trong vòng)\n"
                     "• Quá bán (>50%) → người đó bị loại\n"
                     "• J Cơ bị vote loại → tất cả còn lại thắng"
                 ),
@@ -466,57 +566,16 @@ class UserCommands(commands.Cog):
             return
 
         # Kiểm tra giới hạn
-        if isinstance(self.bot.current_game, LiXiNgayTetGame):
-            if (
-                len(self.bot.current_game.players)
-                >= self.bot.current_game.settings["player_limit"]
-            ):
-                await interaction.response.send_message(
-                    "❌ Game đã đầy!", ephemeral=True
-                )
-                return
-
-        if isinstance(self.bot.current_game, KRoGame):
-            if (
-                len(self.bot.current_game.players)
-                >= self.bot.current_game.settings["player_limit"]
-            ):
-                await interaction.response.send_message(
-                    "❌ Game đã đầy!", ephemeral=True
-                )
-                return
-
-        if isinstance(self.bot.current_game, JCoGame):
-            if (
-                len(self.bot.current_game.players)
-                >= self.bot.current_game.settings["player_limit"]
-            ):
-                await interaction.response.send_message(
-                    "❌ Game đã đầy!", ephemeral=True
-                )
-                return
-
-        if isinstance(self.bot.current_game, ChenThanhGame):
-            if (
-                len(self.bot.current_game.players)
-                >= self.bot.current_game.settings["player_limit"]
-            ):
-                await interaction.response.send_message(
-                    "❌ Game đã đầy!", ephemeral=True
-                )
-                return
-
-        if isinstance(self.bot.current_game, ArenaGame):
-            if (
-                len(self.bot.current_game.players)
-                >= self.bot.current_game.settings["player_limit"]
-            ):
-                await interaction.response.send_message(
-                    "❌ Game đã đầy!", ephemeral=True
-                )
-                return
+        player_limit = self.bot.current_game.settings.get("player_limit")
+        if player_limit and len(self.bot.current_game.players) >= player_limit:
+            await interaction.response.send_message(
+                "❌ Game đã đầy!", ephemeral=True
+            )
+            return
 
         self.bot.current_game.players[interaction.user.id] = {}
+        self.bot.current_game.bump_version()
+        self.bot.remember_player(interaction.user)
         self.bot.current_game.log_event(f"Player {interaction.user.id} joined")
 
         await interaction.response.send_message(
@@ -552,12 +611,103 @@ class UserCommands(commands.Cog):
             return
 
         del self.bot.current_game.players[interaction.user.id]
+        self.bot.current_game.bump_version()
+        if interaction.user.id != self.bot.current_game.host_id:
+            self.bot.forget_player(interaction.user.id)
         self.bot.current_game.log_event(f"Player {interaction.user.id} left")
 
         await interaction.response.send_message(
             f"👋 {interaction.user.mention} đã rời game!"
         )
 
+    # ------------------------------------------------------------------
+    # /profile
+    # ------------------------------------------------------------------
+
+    @app_commands.command(name="profile", description="Xem thành tích trọn đời")
+    @app_commands.describe(user="Người cần xem (mặc định: bạn)")
+    async def profile(
+        self, interaction: discord.Interaction, user: Optional[discord.User] = None
+    ):
+        target = user or interaction.user
+        profile = await asyncio.to_thread(self.bot.profiles.get_profile, target.id)
+        if not profile:
+            await interaction.response.send_message(
+                f"❌ {target.display_name} chưa chơi xong game nào!", ephemeral=True
+            )
+            return
+
+        total_games = sum(p["games"] for p in profile.values())
+        total_wins = sum(p["wins"] for p in profile.values())
+        embed = discord.Embed(
+            title=f"📇 HỒ SƠ: {target.display_name}",
+            description=(
+                f"🎮 **{total_games}** game | 🏆 **{total_wins}** lần thắng "
+                f"({total_wins * 100 // total_games}%)"
+            ),
+            color=discord.Color.blue(),
+        )
+        for game_type, name in _GAME_NAMES.items():
+            p = profile.get(game_type)
+            if not p:
+                continue
+            embed.add_field(
+                name=name,
+                value=(
+                    f"Game: **{p['games']}** | Thắng: **{p['wins']}**\n"
+                    f"Hạng tốt nhất: #{p['best_placement']} | "
+                    f"Hạng TB: {p['placement_sum'] / p['games']:.1f}\n"
+                    + _format_score(game_type, p)
+                ),
+                inline=False,
+            )
+        await interaction.response.send_message(embed=embed)
+
+    # ------------------------------------------------------------------
+    # /alltime
+    # ------------------------------------------------------------------
+
+    @app_commands.command(
+        name="alltime", description="Bảng xếp hạng trọn đời của server theo loại game"
+    )
+    @app_commands.describe(game_type="Loại game", page="Trang (mặc định: trang có bạn)")
+    @app_commands.choices(
+        game_type=[
+            app_commands.Choice(name=name, value=value)
+            for value, name in _GAME_NAMES.items()
+        ]
+    )
+    async def alltime(
+        self,
+        interaction: discord.Interaction,
+        game_type: app_commands.Choice[str],
+        page: Optional[app_commands.Range[int, 1]] = None,
+    ):
+        if interaction.guild_id is None:
+            await interaction.response.send_message(
+                "❌ Lệnh này chỉ dùng được trong server!", ephemeral=True
+            )
+            return
+
+        index = await asyncio.to_thread(
+            self.bot.profiles.rank_index, interaction.guild_id, game_type.value
+        )
+        if not len(index):
+            await interaction.response.send_message(
+                "❌ Server chưa có game nào loại này kết thúc!", ephemeral=True
+            )
+            return
+
+        view = AllTimeView(self.bot, index, game_type.value, interaction.user.id)
+        if page is not None:
+            view.current_page = page - 1
+        else:
+            my_rank = index.rank_of(interaction.user.id)
+            if my_rank is not None:
+                view.current_page = (my_rank - 1) // ALLTIME_PAGE_SIZE
+        view.update_buttons()
+        await interaction.response.send_message(embed=view.get_page_embed(), view=view)
+
 
 async def setup(bot: MinigameBot):
     await bot.add_cog(UserCommands(bot))
@@ -0,0 +1,211 @@
+"""Cấu hình bot đọc từ biến môi trường (hoặc file .env)."""
+
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _get_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_int(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+# ----------------------------------------------------------------------
+# Slash command sync
+# ----------------------------------------------------------------------
+
+# File lưu hash của command tree lần sync gần nhất
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", ".command_tree_hash.json")
+
+# Luôn sync kể cả khi hash không đổi
+FORCE_COMMAND_SYNC = _get_bool("FORCE_COMMAND_SYNC")
+
+# Guild dùng để dev: sync riêng cho guild này (cập nhật tức thì)
+DEV_GUILD_ID = _get_int("DEV_GUILD_ID")
+
+# ----------------------------------------------------------------------
+# Game
+# ----------------------------------------------------------------------
+
+# Các loại game được bật (vd: "kro,jco"); để trống = tất cả
+ENABLED_GAMES = [
+    v.strip().lower()
+    for v in os.getenv("ENABLED_GAMES", "").split(",")
+    if v.strip()
+]
+
+# File SQLite lưu kết quả các game đã kết thúc (/profile)
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", "minigame_profiles.db")
+
+# Bảng xếp hạng Lì Xì: snapshot dùng lại tối đa ngần này giây dù game đã đổi
+LEADERBOARD_STALE_SECONDS = _get_int("LEADERBOARD_STALE_SECONDS", 5)
+
+# Game chạy theo vòng dùng một tin nhắn ghim sửa tại chỗ thay cho thông báo
+# mỗi vòng; chỉ gửi tin mới khi có người bị loại / game kết thúc
+LIVE_BOARD = _get_bool("LIVE_BOARD")
+
+# Sửa live board thêm một lần giữa vòng (số người đã gửi lựa chọn); tắt thì
+# board chỉ được sửa lúc bắt đầu vòng
+LIVE_BOARD_MID_ROUND_UPDATE = _get_bool("LIVE_BOARD_MID_ROUND_UPDATE")
+
+# ----------------------------------------------------------------------
+# Gateway intents & cache
+# ----------------------------------------------------------------------
+
+# "all": cache toàn bộ member (cần SERVER MEMBERS INTENT)
+# "players": chỉ giữ host + người chơi của game đang diễn ra
+MEMBER_CACHE_POLICY = os.getenv("MEMBER_CACHE_POLICY", "all").strip().lower()
+
+# Tải toàn bộ member của mọi guild lúc khởi động
+CHUNK_GUILDS_AT_STARTUP = _get_bool(
+    "CHUNK_GUILDS_AT_STARTUP", MEMBER_CACHE_POLICY == "all"
+)
+
+# Lệnh prefix (g!help) cần MESSAGE CONTENT INTENT; tắt để bỏ intent này
+ENABLE_PREFIX_COMMANDS = _get_bool("ENABLE_PREFIX_COMMANDS", True)
+
+# Số message giữ trong cache (0 = tắt)
+MAX_MESSAGES = _get_int("MAX_MESSAGES", 1000)
+
+# ----------------------------------------------------------------------
+# Sharding
+# ----------------------------------------------------------------------
+
+# Chạy nhiều worker process: mỗi worker nhận một phần shard
+WORKER_ID = _get_int("WORKER_ID", 0)
+WORKER_COUNT = _get_int("WORKER_COUNT", 1)
+
+# Dùng AutoShardedBot (bot ở nhiều guild); luôn bật khi có nhiều worker
+SHARDING = _get_bool("SHARDING") or WORKER_COUNT > 1
+
+# Số shard; để trống = dùng số Discord đề xuất
+SHARD_COUNT = _get_int("SHARD_COUNT")
+
+# Chỉ chạy một phần shard (vd: "0,1"); cần đặt kèm SHARD_COUNT
+SHARD_IDS = [
+    int(v) for v in os.getenv("SHARD_IDS", "").split(",") if v.strip()
+] or None
+
+# ----------------------------------------------------------------------
+# DM
+# ----------------------------------------------------------------------
+
+# Số DM gửi song song tối đa
+DM_CONCURRENCY = _get_int("DM_CONCURRENCY", 10)
+
+# Số lần thử lại khi gửi DM lỗi tạm thời (5xx, timeout)
+DM_MAX_RETRIES = _get_int("DM_MAX_RETRIES", 3)
+
+# User chặn DM được ghi nhớ ngần này giây (DM bot tự gửi bị bỏ qua trong lúc đó)
+DM_FORBIDDEN_TTL_SECONDS = _get_int("DM_FORBIDDEN_TTL_SECONDS", 600)
+
+# ----------------------------------------------------------------------
+# Interaction
+# ----------------------------------------------------------------------
+
+# Slash command chưa trả lời sau ngần này ms thì tự defer (0 = tắt).
+# Discord chỉ cho 3 giây để trả lời lần đầu.
+AUTO_DEFER_MS = _get_int("AUTO_DEFER_MS", 2000)
+
+# ----------------------------------------------------------------------
+# Logging
+# ----------------------------------------------------------------------
+
+LOG_FILE = os.getenv("LOG_FILE", "discord.log")
+
+# "json" (mỗi dòng một record) hoặc "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()
+
+# Xoay file theo dung lượng ("size") hoặc thời gian ("time")
+LOG_ROTATE = os.getenv("LOG_ROTATE", "size").strip().lower()
+LOG_MAX_BYTES = _get_int("LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = _get_int("LOG_BACKUP_COUNT", 5)
+
+# Level mặc định và level riêng theo logger (vd: "discord.gateway=DEBUG")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "discord=INFO,minigame=DEBUG")
+
+# Logger ồn ào chỉ giữ 1/N record dưới WARNING
+LOG_SAMPLED_LOGGERS = [
+    v.strip()
+    for v in os.getenv("LOG_SAMPLED_LOGGERS", "discord.gateway,discord.http").split(",")
+    if v.strip()
+]
+LOG_SAMPLE_RATE = _get_int("LOG_SAMPLE_RATE", 10)
+
+# ----------------------------------------------------------------------
+# State backend (snapshot game + lease giữa các worker)
+# ----------------------------------------------------------------------
+
+# "" (tắt), "sqlite" hoặc "memory" (chỉ dùng để test, một process)
+STATE_BACKEND = os.getenv("STATE_BACKEND", "").strip().lower()
+
+# File SQLite dùng chung giữa các worker trên cùng máy
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "minigame_state.db")
+
+# Thời hạn lease (giây); worker gia hạn mỗi 1/3 khoảng này
+LEASE_SECONDS = _get_int("LEASE_SECONDS", 30)
+
+# ----------------------------------------------------------------------
+# Tắt bot / khôi phục
+# ----------------------------------------------------------------------
+
+# File SQLite lưu snapshot game lúc tắt bot (khi không dùng STATE_BACKEND)
+SNAPSHOT_DB_PATH = os.getenv("SNAPSHOT_DB_PATH", "minigame_snapshots.db")
+
+# Thời gian tối đa chờ các lệnh đang xử lý xong trước khi chụp snapshot
+SHUTDOWN_GRACE_SECONDS = _get_int("SHUTDOWN_GRACE_SECONDS", 5)
+
+# Deadline vòng / ngày sau khi khôi phục:
+#   wallclock: giữ nguyên (thời gian bot tắt vẫn tính)
+#   shift: dời thêm đúng khoảng bot tắt
+RESTORE_POLICY = os.getenv("RESTORE_POLICY", "wallclock").strip().lower()
+
+# Vòng đã quá hạn khi khôi phục được chờ thêm ít nhất ngần này giây
+RESTORE_GRACE_SECONDS = _get_int("RESTORE_GRACE_SECONDS", 10)
+
+# ----------------------------------------------------------------------
+# Profiler (/profiler, POST /profiler/start|stop)
+# ----------------------------------------------------------------------
+
+# Chu kỳ lấy mẫu stack (ms)
+PROFILER_INTERVAL_MS = _get_int("PROFILER_INTERVAL_MS", 10)
+
+# Profiler quên tắt sẽ tự dừng sau ngần này giây
+PROFILER_MAX_SECONDS = _get_int("PROFILER_MAX_SECONDS", 300)
+
+# Token cho endpoint HTTP của profiler (header X-Profiler-Token); rỗng = tắt endpoint
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+
+# ----------------------------------------------------------------------
+# Watchdog event loop
+# ----------------------------------------------------------------------
+
+# Chu kỳ đo độ trễ event loop (ms)
+LOOP_WATCHDOG_INTERVAL_MS = _get_int("LOOP_WATCHDOG_INTERVAL_MS", 100)
+
+# Callback giữ loop lâu hơn ngần này ms thì bị chụp stack (0 = tắt watchdog)
+LOOP_BLOCK_THRESHOLD_MS = _get_int("LOOP_BLOCK_THRESHOLD_MS", 250)
+
+# Cửa sổ tính percentile của độ trễ (giây)
+LOOP_LAG_WINDOW_SECONDS = _get_int("LOOP_LAG_WINDOW_SECONDS", 60)
+
+# ----------------------------------------------------------------------
+# Webserver
+# ----------------------------------------------------------------------
+
+# Mỗi worker một cổng để chạy nhiều worker trên cùng máy
+WEB_PORT = _get_int("WEB_PORT", 8080 + WORKER_ID)
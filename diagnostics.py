@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+def memory_usage_mb() -> Optional[float]:
+    """RSS hiện tại của process (MB), None nếu không đo được."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte (đây là mức đỉnh, không phải hiện tại)
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ShardMetrics:
+    """Đếm event theo shard trong một cửa sổ trượt (gom theo từng giây)."""
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = window_seconds
+        # shard_id -> deque[(giây, số event)]
+        self._buckets: Dict[int, Deque[Tuple[int, int]]] = defaultdict(deque)
+        self.total_events: Dict[int, int] = defaultdict(int)
+        self.connects: Dict[int, int] = defaultdict(int)
+        self.disconnects: Dict[int, int] = defaultdict(int)
+
+    def record_event(self, shard_id: int):
+        now = int(time.monotonic())
+        buckets = self._buckets[shard_id]
+        if buckets and buckets[-1][0] == now:
+            buckets[-1] = (now, buckets[-1][1] + 1)
+        else:
+            buckets.append((now, 1))
+        self._trim(buckets, now)
+        self.total_events[shard_id] += 1
+
+    def record_connect(self, shard_id: int):
+        self.connects[shard_id] += 1
+
+    def record_disconnect(self, shard_id: int):
+        self.disconnects[shard_id] += 1
+
+    def events_per_minute(self, shard_id: int) -> float:
+        buckets = self._buckets.get(shard_id)
+        if not buckets:
+            return 0.0
+        self._trim(buckets, int(time.monotonic()))
+        count = sum(n for _, n in buckets)
+        return count * 60 / self.window_seconds
+
+    def _trim(self, buckets: Deque[Tuple[int, int]], now: int):
+        while buckets and buckets[0][0] <= now - self.window_seconds:
+            buckets.popleft()
+
+
+class DeferStats:
+    """Đếm số lần gọi và số lần phải defer tự động của từng slash command."""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.deferred: Dict[str, int] = defaultdict(int)
+
+    def record_call(self, command: str):
+        self.calls[command] += 1
+
+    def record_deferred(self, command: str):
+        self.deferred[command] += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Chỉ gồm lệnh đã từng bị defer, sắp xếp theo số lần defer."""
+        return {
+            command: {
+                "calls": self.calls.get(command, 0),
+                "deferred": count,
+                "ratio": round(count / max(1, self.calls.get(command, 0)), 3),
+            }
+            for command, count in sorted(
+                self.deferred.items(), key=lambda item: item[1], reverse=True
+            )
+        }
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+import aiohttp
+import discord
+
+if TYPE_CHECKING:
+    from bot import MinigameBot
+
+
+UserLike = Union[int, discord.abc.User]
+
+
+class DMService:
+    """Gửi DM: cache DM channel theo user, gửi song song có giới hạn, retry lỗi tạm thời.
+
+    - DM channel id được cache → lần gửi sau không cần gọi REST ``create_dm``.
+    - User chặn DM (Forbidden) được ghi nhớ ``forbidden_ttl`` giây, trong thời
+      gian đó DM do bot tự gửi bị bỏ qua; DM do chính user yêu cầu (``/log``,
+      ``/checknumber``...) vẫn thử gửi và xoá ghi nhớ nếu thành công.
+    - Semaphore giới hạn số DM gửi cùng lúc; rate limit 429 do discord.py xử lý.
+    """
+
+    def __init__(
+        self,
+        bot: MinigameBot,
+        concurrency: int = 10,
+        max_retries: int = 3,
+        forbidden_ttl: float = 600,
+    ):
+        self.bot = bot
+        self.max_retries = max_retries
+        self.forbidden_ttl = forbidden_ttl
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._channel_ids: Dict[int, int] = {}
+        # user_id -> thời điểm (monotonic) hết ghi nhớ "chặn DM"
+        self.forbidden: Dict[int, float] = {}
+        self.stats: Dict[str, int] = {
+            "sent": 0,
+            "failed": 0,
+            "forbidden": 0,
+            "retries": 0,
+            "channel_cache_hits": 0,
+            "channels_created": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+
+    async def send(
+        self,
+        user: UserLike,
+        *,
+        retries: Optional[int] = None,
+        user_initiated: bool = False,
+        **kwargs,
+    ) -> Tuple[bool, str]:
+        """Gửi một DM. Trả về (thành công, lỗi); lỗi "forbidden" = user chặn DM.
+
+        ``user_initiated``: DM trả lời lệnh của chính user → luôn thử gửi (user
+        có thể vừa bật lại DM).
+        """
+        user_id = user if isinstance(user, int) else user.id
+        if not user_initiated and self._is_forbidden(user_id):
+            return False, "forbidden"
+
+        max_retries = self.max_retries if retries is None else retries
+        async with self._semaphore:
+            for attempt in range(max_retries + 1):
+                if attempt:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                    file = kwargs.get("file")
+                    if file:
+                        file.reset()
+                try:
+                    channel = await self._get_channel(user)
+                    await channel.send(**kwargs)
+                    self.stats["sent"] += 1
+                    self.forbidden.pop(user_id, None)
+                    return True, ""
+                except discord.Forbidden:
+                    self.forbidden[user_id] = time.monotonic() + self.forbidden_ttl
+                    self.stats["forbidden"] += 1
+                    return False, "forbidden"
+                except discord.NotFound:
+                    # DM channel trong cache không còn hợp lệ → tạo lại
+                    self._channel_ids.pop(user_id, None)
+                    error = "not found"
+                except discord.HTTPException as e:
+                    if e.status < 500:
+                        self.stats["failed"] += 1
+                        return False, str(e)
+                    error = str(e)
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    error = str(e) or type(e).__name__
+
+        self.stats["failed"] += 1
+        return False, error
+
+    def format_stats(self) -> str:
+        return ", ".join(f"{k}={v}" for k, v in self.stats.items())
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _is_forbidden(self, user_id: int) -> bool:
+        expires_at = self.forbidden.get(user_id)
+        if expires_at is None:
+            return False
+        if time.monotonic() >= expires_at:
+            del self.forbidden[user_id]
+            return False
+        return True
+
+    async def _get_channel(self, user: UserLike) -> discord.abc.Messageable:
+        user_id = user if isinstance(user, int) else user.id
+        channel_id = self._channel_ids.get(user_id)
+        if channel_id is not None:
+            self.stats["channel_cache_hits"] += 1
+            return self.bot.get_partial_messageable(
+                channel_id, type=discord.ChannelType.private
+            )
+
+        dm = None if isinstance(user, int) else user.dm_channel
+        if dm is None:
+            # Không cần fetch_user: create_dm chỉ cần id
+            dm = await self.bot.create_dm(discord.Object(id=user_id))
+            self.stats["channels_created"] += 1
+        self._channel_ids[user_id] = dm.id
+        return dm
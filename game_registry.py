@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import ast
+import asyncio
+import hashlib
+import importlib
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Type
+
+import discord
+from discord.ext import commands
+
+import config
+from enums import GameType
+
+if TYPE_CHECKING:
+    from bot import MinigameBot
+    from games.base_game import BaseGame
+
+
+@dataclass(frozen=True)
+class GamePlugin:
+    """Mô tả một loại game: engine + cog, chỉ import khi cần."""
+
+    game_type: GameType
+    engine: str  # "module:ClassName"
+    extension: str  # extension chứa slash command của game
+    cog_name: str
+
+    def load_engine(self) -> Type[BaseGame]:
+        module_name, _, class_name = self.engine.partition(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+PLUGINS: Dict[GameType, GamePlugin] = {
+    GameType.LI_XI_NGAY_TET: GamePlugin(
+        GameType.LI_XI_NGAY_TET,
+        "games.li_xi_game:LiXiNgayTetGame",
+        "commands.lixi_commands",
+        "LiXiCommands",
+    ),
+    GameType.KRO: GamePlugin(
+        GameType.KRO,
+        "games.kro_game:KRoGame",
+        "commands.kro_commands",
+        "KRoCommands",
+    ),
+    GameType.JCO: GamePlugin(
+        GameType.JCO,
+        "games.jco_game:JCoGame",
+        "commands.jco_commands",
+        "JCoCommands",
+    ),
+    GameType.CHEN_THANH: GamePlugin(
+        GameType.CHEN_THANH,
+        "games.chen_thanh_game:ChenThanhGame",
+        "commands.chen_thanh_commands",
+        "ChenThanhCommands",
+    ),
+    GameType.ARENA: GamePlugin(
+        GameType.ARENA,
+        "games.arena_game:ArenaGame",
+        "commands.arena_commands",
+        "ArenaCommands",
+    ),
+}
+
+# Extension luôn được nạp lúc khởi động
+CORE_EXTENSIONS = ("commands.host_commands", "commands.user_commands")
+
+# Thời gian tối đa chờ các round loop về điểm an toàn trước khi reload
+RELOAD_SAFE_POINT_TIMEOUT = 10.0
+
+_ROOT = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+# Biến config quyết định tree slash command (DEV_GUILD_ID đã nằm trong scope
+# của hash); token, cổng, log... không được đưa vào digest
+_TREE_SETTINGS = ("ENABLED_GAMES",)
+
+# Field chứa câu lệnh con (if / try / def / class / with / match...)
+_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def _at_safe_point(game: BaseGame) -> bool:
+    """Round loop đang chờ hết vòng (``BaseGame.wait_round``), không ở giữa lúc
+    thông báo vòng mới, mở board hay xử lý kết quả."""
+    if game.round_task is None or game.round_task.done():
+        return True
+    return game.waiting_round
+
+
+def _project_file(name: str) -> Optional[str]:
+    """File nguồn của module ``name`` nếu nó thuộc project (không phải thư viện)."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.startswith(_ROOT):
+        return None
+    return spec.origin
+
+
+def _import_nodes(body: List[ast.stmt]) -> Iterable[ast.stmt]:
+    # Chỉ duyệt câu lệnh, không đi vào biểu thức (nhanh hơn ``ast.walk`` nhiều lần)
+    for node in body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        for field in _BODY_FIELDS:
+            children = getattr(node, field, None)
+            if children:
+                yield from _import_nodes(children)
+
+
+def _imported_names(source: str) -> List[str]:
+    """Tên các module mà file import (``from a import b`` → ``a`` và ``a.b``),
+    kể cả import nằm trong hàm."""
+    names: List[str] = []
+    for node in _import_nodes(ast.parse(source).body):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif node.module and not node.level:
+            names.append(node.module)
+            names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return names
+
+
+def _detach_round(game: BaseGame):
+    """Dừng round loop cũ nhưng giữ deadline của vòng để loop mới chạy tiếp."""
+    timer = game.round_timer
+    if timer is not None and timer.deadline is not None:
+        game.restored_round = (
+            timer.deadline,
+            timer.remaining if timer.is_paused else None,
+        )
+    game.round_task.cancel()
+    game.round_task = None
+    if timer is not None:
+        timer.cancel()
+    game.round_timer = None
+
+
+class GameRegistry:
+    """Nạp cog/engine của từng loại game theo yêu cầu (lần /host đầu tiên)."""
+
+    def __init__(self, bot: MinigameBot, enabled: Iterable[GameType]):
+        self.bot = bot
+        self.enabled: List[GameType] = [gt for gt in PLUGINS if gt in set(enabled)]
+        # [(tên module / extension, số giây)] để in báo cáo import
+        self.import_report: List[Tuple[str, float]] = []
+        # Một lock cho mỗi extension: hai /host cùng lúc không nạp hai lần
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+
+    def is_enabled(self, game_type: GameType) -> bool:
+        return game_type in self.enabled
+
+    def get(self, game_type: Optional[GameType]) -> Optional[GamePlugin]:
+        if game_type is None or not self.is_enabled(game_type):
+            return None
+        return PLUGINS[game_type]
+
+    def is_loaded(self, game_type: GameType) -> bool:
+        return PLUGINS[game_type].extension in self.bot.extensions
+
+    async def load_extension(self, name: str):
+        """Nạp extension và ghi lại thời gian import."""
+        started = time.perf_counter()
+        await self.bot.load_extension(name)
+        self.import_report.append((name, time.perf_counter() - started))
+
+    async def ensure_loaded(self, game_type: GameType) -> Optional[GamePlugin]:
+        """Đảm bảo cog của game đã được nạp; trả về None nếu game bị tắt."""
+        plugin = self.get(game_type)
+        if plugin is None:
+            return None
+        if not self.is_loaded(game_type):
+            lock = self._load_locks.setdefault(plugin.extension, asyncio.Lock())
+            async with lock:
+                if not self.is_loaded(game_type):
+                    await self.load_extension(plugin.extension)
+                    name, seconds = self.import_report[-1]
+                    print(f"Đã nạp {name} ({seconds * 1000:.1f} ms)")
+        return plugin
+
+    async def reload(self, game_type: GameType) -> Tuple[bool, str, float]:
+        """Reload cog của game mà không bỏ vòng đang chạy.
+
+        Chờ mọi round loop của game đó về điểm an toàn (đang chờ timer), tách
+        loop khỏi cog cũ, reload extension rồi chạy lại loop bằng cog mới với
+        đúng deadline cũ. Trả về (thành công, lỗi, số giây của bước hoán đổi).
+        """
+        plugin = self.get(game_type)
+        if plugin is None:
+            return False, "Game này không được bật", 0.0
+        if not self.is_loaded(game_type):
+            return False, "Cog của game chưa được nạp, không cần reload", 0.0
+
+        games = [
+            g for g in self.bot.sessions.games_of(game_type)
+            if g.round_task is not None and not g.round_task.done()
+        ]
+        deadline = time.monotonic() + RELOAD_SAFE_POINT_TIMEOUT
+        while not all(_at_safe_point(g) for g in games):
+            if time.monotonic() > deadline:
+                return False, "Round loop đang xử lý kết quả, thử lại sau", 0.0
+            await asyncio.sleep(0.05)
+
+        # Từ đây tới lúc chạy lại loop không có await nào chen vào ngoài reload
+        started = time.perf_counter()
+        live = [g for g in games if g.round_task is not None and not g.round_task.done()]
+        for game in live:
+            _detach_round(game)
+
+        error = ""
+        try:
+            await self.bot.reload_extension(plugin.extension)
+        except commands.ExtensionError as e:
+            # discord.py khôi phục module cũ khi reload lỗi → chạy lại bằng cog cũ
+            error = str(e)
+
+        # Embed đã cache được dựng bởi code của cog cũ → buộc dựng lại
+        for game in self.bot.sessions.games_of(game_type):
+            game.bump_version()
+        for game in live:
+            self.bot.start_round_loop(game)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Reload {plugin.extension}: {elapsed * 1000:.1f} ms, "
+            f"{len(live)} vòng chạy tiếp" + (f" (lỗi: {error})" if error else "")
+        )
+        return not error, error, elapsed
+
+    async def load_all(self):
+        """Nạp cog của mọi game đang bật (cần khi phải sync command tree)."""
+        for game_type in self.enabled:
+            await self.ensure_loaded(game_type)
+
+    def source_digest(self) -> str:
+        """Hash mã nguồn các extension đang bật, không cần import chúng.
+
+        Gồm cả mọi module của project mà extension import (trực tiếp hoặc gián
+        tiếp: ``enums``, ``config``, engine...) vì choices / mô tả lệnh lấy từ
+        đó, và giá trị các biến ``config`` quyết định lệnh nào được bật.
+        """
+        digest = hashlib.sha256(discord.__version__.encode())
+        pending = list(CORE_EXTENSIONS) + [PLUGINS[gt].extension for gt in self.enabled]
+        seen: Dict[str, str] = {}
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            path = _project_file(name)
+            if path is None:
+                continue
+            seen[name] = path
+            with open(path, encoding="utf-8") as f:
+                pending.extend(_imported_names(f.read()))
+
+        # Thứ tự cố định theo đường dẫn file (mỗi file hash một lần)
+        for path in sorted(set(seen.values())):
+            digest.update(os.path.relpath(path, _ROOT).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        for key in _TREE_SETTINGS:
+            digest.update(f"{key}={getattr(config, key)!r}".encode())
+        return digest.hexdigest()
+
+    def format_import_report(self) -> str:
+        lines = [
+            f"  {name:<32} {seconds * 1000:8.1f} ms"
+            for name, seconds in self.import_report
+        ]
+        total = sum(seconds for _, seconds in self.import_report)
+        lines.append(f"  {'TOTAL':<32} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
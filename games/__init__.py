@@ -1,6 +1,18 @@
+import importlib
+
 from games.base_game import BaseGame
-from games.li_xi_game import LiXiNgayTetGame
-from games.kro_game import KRoGame
-from games.jco_game import JCoGame
-from games.chen_thanh_game import ChenThanhGame
-from games.arena_game import ArenaGame
+
+# Engine của từng game chỉ được import khi thật sự dùng tới
+_LAZY_ENGINES = {
+    "LiXiNgayTetGame": "games.li_xi_game",
+    "KRoGame": "games.kro_game",
+    "JCoGame": "games.jco_game",
+    "ChenThanhGame": "games.chen_thanh_game",
+    "ArenaGame": "games.arena_game",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ENGINES:
+        return getattr(importlib.import_module(_LAZY_ENGINES[name]), name)
+    raise AttributeError(f"module 'games' has no attribute {name!r}")
@@ -3,8 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
-from enums import GameState
-from games.base_game import BaseGame
+from enums import GameState, GameType
+from games.base_game import BaseGame, PlayerResult
 
 
 @dataclass
@@ -25,6 +25,10 @@ class ArenaRoundResult:
 class ArenaGame(BaseGame):
     """Game Đấu trường sinh tử – Arena Deathmatch."""
 
+    game_type = GameType.ARENA
+
+    ACTION_TYPES = ("attack", "defend", "charge", "destroy", "none")
+
     INTERVAL_MAP = {
         "1m": 60,
         "2m": 120,
@@ -45,6 +49,13 @@ class ArenaGame(BaseGame):
         # Per-round actions: {player_id: {"type": str, "target": Optional[int]}}
         self.current_actions: Dict[int, dict] = {}
 
+        # Chia hành động theo loại ngay khi chọn: {type: [player_id]}
+        self.action_buckets: Dict[str, List[int]] = {
+            t: [] for t in self.ACTION_TYPES
+        }
+        # Ai đang tấn công ai: {target_id: [attacker_id]}
+        self.attackers_per_target: Dict[int, List[int]] = {}
+
         # Eliminated (dead) players
         self.eliminated: List[int] = []
 
@@ -104,6 +115,7 @@ class ArenaGame(BaseGame):
             self.stamina[pid] = M
 
         self.current_round = 0
+        self.bump_version()
         self.log_event(
             f"Game Đấu trường bắt đầu với {len(self.players)} người chơi | M={M}"
         )
@@ -133,7 +145,7 @@ class ArenaGame(BaseGame):
             return False, "Bạn đã bị loại khỏi game"
 
         action_type = action_type.lower()
-        valid_actions = ("attack", "defend", "charge", "destroy", "none")
+        valid_actions = self.ACTION_TYPES
         if action_type not in valid_actions:
             return False, f"Hành động phải là một trong: {', '.join(valid_actions)}"
 
@@ -177,8 +189,24 @@ class ArenaGame(BaseGame):
             "type": action_type,
             "target": target_id,
         }
+        self.action_buckets[action_type].append(player_id)
+        if action_type == "attack":
+            self.attackers_per_target.setdefault(target_id, []).append(player_id)
+        self.bump_version()
         return True, ""
 
+    def clear_actions(self):
+        """Xoá hành động của vòng (và các bucket đi kèm)."""
+        self.current_actions.clear()
+        for bucket in self.action_buckets.values():
+            bucket.clear()
+        self.attackers_per_target.clear()
+        self.bump_version()
+
+    def attackers_of(self, player_id: int) -> int:
+        """Số người đang chọn tấn công player trong vòng này."""
+        return len(self.attackers_per_target.get(player_id, ()))
+
     # ------------------------------------------------------------------
     # Core: resolve round
     # ------------------------------------------------------------------
@@ -198,27 +226,27 @@ class ArenaGame(BaseGame):
             return None
 
         self.current_round += 1
+        self.bump_version()
         M = self.settings["M"]
 
         stamina_changes: Dict[int, int] = {pid: 0 for pid in alive}
         deaths: List[int] = []
         destroy_kills: List[Tuple[int, int]] = []
 
-        # Build action lookup for alive players only
-        actions: Dict[int, dict] = {}
-        for pid in alive:
-            if pid in self.current_actions:
-                actions[pid] = self.current_actions[pid]
-            else:
-                actions[pid] = {"type": "none", "target": None}
+        # Hành động đã được chia bucket lúc chọn; người chưa chọn = "none".
+        # Chỉ người còn sống mới chọn được hành động.
+        actions = self.current_actions
+        buckets = self.action_buckets
 
         # ==============================================================
         # Phase 1: DESTROY
         # ==============================================================
+        # Xét theo thứ tự tham gia game (ai trước được hủy diệt trước)
+        seat = {pid: i for i, pid in enumerate(self.players)}
         destroyed_this_round: List[int] = []
-        for pid, act in actions.items():
-            if act["type"] == "destroy" and pid not in destroyed_this_round:
-                target = act["target"]
+        for pid in sorted(buckets["destroy"], key=seat.__getitem__):
+            if pid not in destroyed_this_round:
+                target = actions[pid]["target"]
                 if target and target not in self.eliminated and target not in destroyed_this_round:
                     # Cost M stamina
                     self.stamina[pid] -= M
@@ -237,13 +265,14 @@ class ArenaGame(BaseGame):
                 deaths.append(pid)
 
         # Remaining alive after destroy (excludes destroyed targets)
-        alive_after_destroy = [p for p in alive if p not in destroyed_this_round]
+        destroyed = set(destroyed_this_round)
+        alive_after_destroy = [p for p in alive if p not in destroyed]
 
         # ==============================================================
         # Phase 2: CHARGE
         # ==============================================================
-        for pid in alive_after_destroy:
-            if actions.get(pid, {}).get("type") == "charge":
+        for pid in buckets["charge"]:
+            if pid not in destroyed:
                 self.stamina[pid] += 25
                 stamina_changes[pid] += 25
 
@@ -251,26 +280,26 @@ class ArenaGame(BaseGame):
         # Phase 3: ATTACK vs DEFEND
         # ==============================================================
 
-        # Count attackers per target (only from alive, non-destroyed players)
-        attackers_per_target: Dict[int, List[int]] = {}
-        for pid in alive_after_destroy:
-            act = actions.get(pid, {})
-            if act.get("type") == "attack":
-                target = act["target"]
-                if target and target not in destroyed_this_round:
-                    attackers_per_target.setdefault(target, []).append(pid)
+        # Attackers per target đã đếm sẵn lúc chọn; chỉ cần bỏ người bị
+        # hủy diệt (cả vai trò mục tiêu lẫn người tấn công)
+        attackers_per_target = self.attackers_per_target
+        for pid in destroyed:
+            attackers_per_target.pop(pid, None)
+            act = actions.get(pid)
+            if act and act["type"] == "attack" and act["target"] in attackers_per_target:
+                attackers_per_target[act["target"]].remove(pid)
+                if not attackers_per_target[act["target"]]:
+                    del attackers_per_target[act["target"]]
 
         # Deduct attack cost
-        for pid in alive_after_destroy:
-            act = actions.get(pid, {})
-            if act.get("type") == "attack":
+        for pid in buckets["attack"]:
+            if pid not in destroyed:
                 self.stamina[pid] -= 20
                 stamina_changes[pid] -= 20
 
         # Deduct defend cost
-        for pid in alive_after_destroy:
-            act = actions.get(pid, {})
-            if act.get("type") == "defend":
+        for pid in buckets["defend"]:
+            if pid not in destroyed:
                 self.stamina[pid] -= 10
                 stamina_changes[pid] -= 10
 
@@ -343,7 +372,7 @@ class ArenaGame(BaseGame):
         self.round_history.append(result)
 
         # Clear per-round data
-        self.current_actions.clear()
+        self.clear_actions()
 
         return result
 
@@ -367,6 +396,20 @@ class ArenaGame(BaseGame):
 
         return False, "", []
 
+    def get_results(self) -> List[PlayerResult]:
+        """Người còn sống (nhiều stamina trước), rồi người bị loại muộn hơn; điểm = số kill."""
+        is_over, _, winners = self.check_game_over()
+        alive = sorted(
+            self.alive_players, key=lambda pid: self.stamina.get(pid, 0), reverse=True
+        )
+        kills: Dict[int, int] = {}
+        for rr in self.round_history:
+            for killer, _victim in rr.destroy_kills:
+                kills[killer] = kills.get(killer, 0) + 1
+        return self.build_results(
+            alive + self.eliminated[::-1], winners if is_over else [], kills
+        )
+
     # ------------------------------------------------------------------
     # Info helpers
     # ------------------------------------------------------------------
@@ -1,12 +1,35 @@
-from datetime import datetime
-from typing import Optional, Dict, List
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Collection, Optional, Dict, List, Tuple
 
-from enums import GameState
+from enums import GameState, GameType
+from round_timer import RoundTimer
+
+if TYPE_CHECKING:
+    from live_board import LiveBoard
+
+logger = logging.getLogger("minigame.game")
+
+
+@dataclass
+class PlayerResult:
+    """Kết quả cuối game của một người chơi (lưu vào profile)."""
+
+    player_id: int
+    placement: int
+    won: bool
+    # Chỉ số riêng của từng game: tiền cuối (Lì Xì), điểm phạt (K Rô),
+    # số lần làm J Cơ, số lần đóng góp (Chén Thánh), số kill (Đấu Trường)
+    score: int = 0
 
 
 class BaseGame:
     """Lớp cơ sở cho tất cả các game."""
 
+    game_type: Optional[GameType] = None
+
     def __init__(self, host_id: int):
         self.host_id = host_id
         self.state = GameState.REGISTERING
@@ -18,6 +41,35 @@ class BaseGame:
         self.next_day_at: Optional[datetime] = None
         self.event_log: List[str] = []
 
+        # Tăng mỗi khi trạng thái game đổi (dùng để cache bảng xếp hạng / embed)
+        self.version = 0
+        # Đã lưu kết quả vào profile store chưa (tránh ghi hai lần)
+        self.archived = False
+        # key -> (version, giá trị) của các view dựng từ trạng thái game
+        # (embed status...); không lưu vào snapshot
+        self._view_cache: Dict[str, Tuple[int, Any]] = {}
+
+        # Guild đang chạy game (gán bởi SessionRouter)
+        self.guild_id: Optional[int] = None
+
+        # Timer của vòng hiện tại (game chạy theo vòng) và mốc tạm dừng
+        self.round_timer: Optional[RoundTimer] = None
+        self.paused_at: Optional[datetime] = None
+        self.round_task: Optional[asyncio.Task] = None
+        # Round loop đang chờ hết vòng (``wait_round``): điểm duy nhất /reload
+        # được phép huỷ loop
+        self.waiting_round: bool = False
+        # Live board đang mở (LIVE_BOARD) và id tin nhắn của nó; id được giữ
+        # trong snapshot để dùng lại board cũ sau khi khôi phục
+        self.live_board: Optional["LiveBoard"] = None
+        self.board_message_id: Optional[int] = None
+
+        # Vòng đang dở khi khôi phục từ snapshot: (deadline, số giây còn lại
+        # nếu đang tạm dừng)
+        self.restored_round: Optional[Tuple[Optional[datetime], Optional[float]]] = None
+        # Thời điểm chụp snapshot gần nhất (chỉ có ở game khôi phục từ snapshot)
+        self.saved_at: Optional[datetime] = None
+
     def get_default_settings(self) -> dict:
         """Trả về settings mặc định, override trong subclass."""
         return {}
@@ -38,7 +90,177 @@ class BaseGame:
         """Hook khi chuyển ngày."""
         pass
 
+    def get_results(self) -> List[PlayerResult]:
+        """Kết quả từng người chơi khi game kết thúc, override trong subclass."""
+        return []
+
+    @staticmethod
+    def build_results(
+        standings: List[int],
+        winners: Collection[int],
+        scores: Dict[int, int],
+    ) -> List[PlayerResult]:
+        """Gán hạng theo thứ tự ``standings``; người thắng cùng hạng 1."""
+        winner_set = set(winners)
+        results = [
+            PlayerResult(pid, 1, True, scores.get(pid, 0))
+            for pid in standings
+            if pid in winner_set
+        ]
+        placement = len(results) + 1
+        for pid in standings:
+            if pid in winner_set:
+                continue
+            results.append(PlayerResult(pid, placement, False, scores.get(pid, 0)))
+            placement += 1
+        return results
+
+    def bump_version(self):
+        """Đánh dấu trạng thái game đã thay đổi."""
+        self.version += 1
+
+    def cached_view(self, key: str, build: Callable[[], Any]) -> Any:
+        """Trả về view ``key`` đã dựng ở version hiện tại, hoặc gọi ``build()``
+        để dựng lại nếu game đã thay đổi từ lần dựng trước."""
+        entry = self._view_cache.get(key)
+        if entry is not None and entry[0] == self.version:
+            return entry[1]
+        value = build()
+        self._view_cache[key] = (self.version, value)
+        return value
+
     def log_event(self, event: str):
         """Ghi log event với timestamp."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.event_log.append(f"[{timestamp}] {event}")
+        logger.info(
+            event,
+            extra={
+                "game_type": self.game_type.value if self.game_type else None,
+                "guild_id": self.guild_id,
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Pause / resume
+    # ------------------------------------------------------------------
+
+    def start_round_timer(self, seconds: float) -> RoundTimer:
+        """Tạo timer cho vòng mới; nếu game đang tạm dừng thì timer đứng yên."""
+        if self.round_timer:
+            self.round_timer.cancel()
+        self.round_timer = RoundTimer(seconds)
+        self.round_timer.start()
+        if self.state == GameState.PAUSED:
+            self.round_timer.pause()
+        return self.round_timer
+
+    async def wait_round(self, timer: RoundTimer, board: Optional["LiveBoard"] = None):
+        """Chờ hết vòng (qua live board nếu có). Chỉ trong lúc này round loop
+        mới được huỷ để /reload, không phải giữa lúc gửi thông báo / board."""
+        self.waiting_round = True
+        try:
+            if board:
+                await board.follow(timer)
+            else:
+                await timer.wait()
+        finally:
+            self.waiting_round = False
+
+    def pause(self) -> bool:
+        """Tạm dừng game và đóng băng thời gian còn lại của vòng."""
+        if self.state != GameState.RUNNING:
+            return False
+        self.state = GameState.PAUSED
+        self.paused_at = datetime.now()
+        self.bump_version()
+        if self.round_timer:
+            self.round_timer.pause()
+        return True
+
+    def resume(self) -> bool:
+        """Tiếp tục game, chạy nốt phần thời gian còn lại của vòng / ngày."""
+        if self.state != GameState.PAUSED:
+            return False
+        if self.next_day_at and self.paused_at:
+            # Không tính thời gian tạm dừng vào chu kỳ ngày
+            self.next_day_at += datetime.now() - self.paused_at
+        self.paused_at = None
+        self.state = GameState.RUNNING
+        self.bump_version()
+        if self.round_timer:
+            self.round_timer.resume()
+        return True
+
+    def take_restored_round(self) -> Optional[float]:
+        """Số giây còn lại của vòng đang dở (None nếu không khôi phục vòng nào)."""
+        restored = self.restored_round
+        self.restored_round = None
+        if restored is None:
+            return None
+        deadline, frozen_remaining = restored
+        if frozen_remaining is not None:
+            return frozen_remaining
+        if deadline is None:
+            return None
+        return max(0.0, (deadline - datetime.now()).total_seconds())
+
+    def rearm_after_restore(self, policy: str, grace: float = 0.0):
+        """Chỉnh deadline của vòng / ngày sau khi khôi phục từ snapshot.
+
+        - ``wallclock``: giữ nguyên deadline; thời gian bot ngừng chạy vẫn tính
+          (vòng đã quá hạn được xử lý sau ``grace`` giây, ngày được bù dần).
+        - ``shift``: dời deadline thêm đúng khoảng bot ngừng chạy, người chơi
+          còn nguyên thời gian như lúc tắt bot.
+        """
+        if self.saved_at is None:
+            return
+        now = datetime.now()
+        downtime = max(now - self.saved_at, timedelta(0))
+
+        if self.restored_round is not None:
+            deadline, frozen_remaining = self.restored_round
+            # Vòng đang tạm dừng: thời gian còn lại đã đóng băng, không cần chỉnh
+            if frozen_remaining is None and deadline is not None:
+                if policy == "shift":
+                    deadline += downtime
+                deadline = max(deadline, now + timedelta(seconds=grace))
+                self.restored_round = (deadline, None)
+
+        # Game tạm dừng: resume() đã bù khoảng từ lúc tạm dừng cho next_day_at
+        if policy == "shift" and self.next_day_at and self.state == GameState.RUNNING:
+            self.next_day_at += downtime
+
+    # ------------------------------------------------------------------
+    # Snapshot (state backend)
+    # ------------------------------------------------------------------
+
+    def __getstate__(self) -> dict:
+        """Snapshot để lưu vào state backend: bỏ timer / task của event loop,
+        chỉ giữ deadline của vòng hiện tại."""
+        state = self.__dict__.copy()
+        timer = state.pop("round_timer", None)
+        state.pop("round_task", None)
+        state.pop("waiting_round", None)
+        state.pop("live_board", None)
+        state.pop("_view_cache", None)
+        state["saved_at"] = datetime.now()
+        if timer and not timer.expired and timer.deadline is not None:
+            state["restored_round"] = (
+                timer.deadline,
+                timer.remaining if timer.is_paused else None,
+            )
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.round_timer = None
+        self.round_task = None
+        self.waiting_round = False
+        self.live_board = None
+        self._view_cache = {}
+        self.restored_round = state.get("restored_round")
+        self.version = state.get("version", 0)
+        self.archived = state.get("archived", False)
+        self.saved_at = state.get("saved_at")
+        self.board_message_id = state.get("board_message_id")
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from enums import GameState
-from games.base_game import BaseGame
+from enums import GameState, GameType
+from games.base_game import BaseGame, PlayerResult
 
 
 @dataclass
@@ -31,6 +32,8 @@ class ChenThanhRoundResult:
 class ChenThanhGame(BaseGame):
     """Game Chén Thánh Phản Bội – Contribute or Steal."""
 
+    game_type = GameType.CHEN_THANH
+
     INTERVAL_MAP = {
         "1m": 60,
         "2m": 120,
@@ -69,6 +72,12 @@ class ChenThanhGame(BaseGame):
         # Total contributions per player (for tiebreaker)
         self.total_contributions: Dict[int, int] = {}
 
+        # Bảng xếp hạng: max-heap theo (balance, total_contributions), dạng
+        # (-balance, -contributions, player_id). Entry cũ (số dư đã đổi / người
+        # đã chết) được bỏ qua khi đọc đỉnh heap thay vì xoá ngay.
+        self._rank_heap: List[Tuple[int, int, int]] = []
+        self._dead: Set[int] = set()
+
     # ------------------------------------------------------------------
     # Settings
     # ------------------------------------------------------------------
@@ -118,12 +127,75 @@ class ChenThanhGame(BaseGame):
 
     @property
     def alive_players(self) -> List[int]:
-        return [pid for pid in self.players if pid not in self.eliminated]
+        return [pid for pid in self.players if pid not in self._dead]
 
     @property
     def interval_seconds(self) -> int:
         return self.INTERVAL_MAP.get(self.settings["game_interval"], 300)
 
+    def _eliminate(self, player_id: int):
+        if player_id not in self._dead:
+            self._dead.add(player_id)
+            self.eliminated.append(player_id)
+
+    # ------------------------------------------------------------------
+    # Ranking index
+    # ------------------------------------------------------------------
+
+    def _rank_key(self, player_id: int) -> Tuple[int, int, int]:
+        return (
+            -self.balances.get(player_id, 0),
+            -self.total_contributions.get(player_id, 0),
+            player_id,
+        )
+
+    def _is_current(self, entry: Tuple[int, int, int]) -> bool:
+        pid = entry[2]
+        return pid not in self._dead and entry == self._rank_key(pid)
+
+    def _update_rank(self, player_id: int):
+        """Gọi sau khi số dư / số lần đóng góp của player thay đổi."""
+        heapq.heappush(self._rank_heap, self._rank_key(player_id))
+        # Dọn entry cũ khi heap phình quá lớn so với số người còn sống
+        if len(self._rank_heap) > 2 * (len(self.players) - len(self._dead)) + 16:
+            self._rank_heap = list(
+                {e for e in self._rank_heap if self._is_current(e)}
+            )
+            heapq.heapify(self._rank_heap)
+
+    def _rank_top(self) -> Optional[Tuple[int, int, int]]:
+        heap = self._rank_heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def leaders(self) -> List[int]:
+        """Những người đứng đầu (cùng balance và cùng số lần đóng góp)."""
+        top = self._rank_top()
+        if top is None:
+            return []
+        popped = []
+        leaders: List[int] = []
+        heap = self._rank_heap
+        while heap and heap[0][:2] == top[:2]:
+            entry = heapq.heappop(heap)
+            popped.append(entry)
+            if self._is_current(entry) and entry[2] not in leaders:
+                leaders.append(entry[2])
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return leaders
+
+    def ranking(self) -> List[int]:
+        """Người còn sống, xếp theo balance rồi số lần đóng góp (giảm dần)."""
+        seen: Set[int] = set()
+        result: List[int] = []
+        for entry in sorted(self._rank_heap):
+            if entry[2] not in seen and self._is_current(entry):
+                seen.add(entry[2])
+                result.append(entry[2])
+        return result
+
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
@@ -135,9 +207,14 @@ class ChenThanhGame(BaseGame):
             self.balances[pid] = 0
             self.total_contributions[pid] = 0
 
+        self._dead = set(self.eliminated)
+        self._rank_heap = [self._rank_key(pid) for pid in self.alive_players]
+        heapq.heapify(self._rank_heap)
+
         self.pot = 0
         self.current_round = 0
         self.previous_actions.clear()
+        self.bump_version()
         self.log_event(
             f"Game Chén Thánh bắt đầu với {len(self.players)} người chơi | "
             f"M={M}, N={self.settings['N']}"
@@ -155,7 +232,7 @@ class ChenThanhGame(BaseGame):
         if player_id not in self.players:
             return False, "Bạn chưa tham gia game"
 
-        if player_id in self.eliminated:
+        if player_id in self._dead:
             return False, "Bạn đã bị loại khỏi game"
 
         action = action.lower()
@@ -166,6 +243,7 @@ class ChenThanhGame(BaseGame):
             return False, "Bạn đã chọn hành động rồi, không thể thay đổi"
 
         self.current_actions[player_id] = action
+        self.bump_version()
         return True, ""
 
     # ------------------------------------------------------------------
@@ -181,13 +259,13 @@ class ChenThanhGame(BaseGame):
         if challenger_id not in self.players:
             return False, "Bạn chưa tham gia game", None
 
-        if challenger_id in self.eliminated:
+        if challenger_id in self._dead:
             return False, "Bạn đã bị loại", None
 
         if target_id not in self.players:
             return False, "Người này chưa tham gia game", None
 
-        if target_id in self.eliminated:
+        if target_id in self._dead:
             return False, "Người này đã bị loại", None
 
         if challenger_id == target_id:
@@ -220,8 +298,8 @@ class ChenThanhGame(BaseGame):
                 f"Player {target_id} → Target đã Đóng góp → Challenger chết!"
             )
 
-        if dead_id not in self.eliminated:
-            self.eliminated.append(dead_id)
+        self._eliminate(dead_id)
+        self.bump_version()
 
         return True, "", dead_id
 
@@ -244,6 +322,7 @@ class ChenThanhGame(BaseGame):
             return None
 
         self.current_round += 1
+        self.bump_version()
         M = self.settings["M"]
 
         # --- Phase 0: Distribute M and apply actions ---
@@ -281,9 +360,9 @@ class ChenThanhGame(BaseGame):
 
         # --- Phase 1: Resolve pot distribution ---
         # Only count actions of players still alive (not eliminated by dare)
-        contributors = [p for p in contributors if p not in self.eliminated]
-        stealers = [p for p in stealers if p not in self.eliminated]
-        no_action = [p for p in no_action if p not in self.eliminated]
+        contributors = [p for p in contributors if p not in self._dead]
+        stealers = [p for p in stealers if p not in self._dead]
+        no_action = [p for p in no_action if p not in self._dead]
 
         alive_after_dares = self.alive_players
         money_gained: Dict[int, int] = {pid: 0 for pid in alive_after_dares}
@@ -324,6 +403,10 @@ class ChenThanhGame(BaseGame):
         for pid in contributors:
             self.total_contributions[pid] = self.total_contributions.get(pid, 0) + 1
 
+        # Chỉ người có hành động mới đổi balance / contributions
+        for pid in contributors + stealers:
+            self._update_rank(pid)
+
         # Save previous actions for next round's dare (only those who acted)
         self.previous_actions = dict(self.current_actions)
 
@@ -360,43 +443,35 @@ class ChenThanhGame(BaseGame):
           reason: "target_reached" | "last_survivor" | "all_dead" | ""
           winner_ids: list of winner player IDs (can be multiple for ties)
         """
-        alive = self.alive_players
         N = self.settings["N"]
 
-        # Check if anyone reached N
-        reached = [pid for pid in alive if self.balances.get(pid, 0) >= N]
-        if reached:
-            # Sort by balance descending, then by total_contributions descending
-            reached.sort(
-                key=lambda pid: (
-                    self.balances[pid],
-                    self.total_contributions.get(pid, 0),
-                ),
-                reverse=True,
-            )
-            # Winner(s): highest balance
-            max_balance = self.balances[reached[0]]
-            top = [pid for pid in reached if self.balances[pid] == max_balance]
-            if len(top) == 1:
-                return True, "target_reached", top
-            # Tiebreaker: most contributions
-            max_contrib = max(self.total_contributions.get(pid, 0) for pid in top)
-            winners = [
-                pid for pid in top
-                if self.total_contributions.get(pid, 0) == max_contrib
-            ]
-            return True, "target_reached", winners
+        # Check if anyone reached N: chỉ cần xem đỉnh heap. Người thắng là
+        # người có balance cao nhất, hoà thì xét số lần đóng góp nhiều nhất.
+        top = self._rank_top()
+        if top is not None and -top[0] >= N:
+            return True, "target_reached", self.leaders()
+
+        alive_count = len(self.players) - len(self._dead)
 
         # Last survivor
-        if len(alive) == 1:
-            return True, "last_survivor", alive
+        if alive_count == 1:
+            return True, "last_survivor", self.alive_players
 
         # All dead
-        if len(alive) == 0:
+        if alive_count == 0:
             return True, "all_dead", []
 
         return False, "", []
 
+    def get_results(self) -> List[PlayerResult]:
+        """Xếp theo bảng xếp hạng của người còn sống, rồi người bị loại muộn hơn."""
+        is_over, _, winners = self.check_game_over()
+        return self.build_results(
+            self.ranking() + self.eliminated[::-1],
+            winners if is_over else [],
+            self.total_contributions,
+        )
+
     # ------------------------------------------------------------------
     # Info helpers
     # ------------------------------------------------------------------
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import random
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Set, Tuple
 
-from enums import GameState
-from games.base_game import BaseGame
+from enums import GameState, GameType
+from games.base_game import BaseGame, PlayerResult
 
 
 @dataclass
@@ -20,9 +21,37 @@ class JCoRoundResult:
     new_jco_id: Optional[int]  # new J Cơ after rotation (None if no rotation)
 
 
+class OthersNumbers(Sequence):
+    """Số của mọi người trừ một người, đọc thẳng từ bảng số chung của vòng.
+
+    Không copy bảng: chỉ nhớ vị trí cần bỏ qua, nên mỗi /checknumber là O(1)
+    thay vì dựng lại danh sách N phần tử.
+    """
+
+    def __init__(self, board: List[Tuple[int, int]], skip: Optional[int]):
+        self.board = board
+        self.skip = skip
+
+    def __len__(self) -> int:
+        return len(self.board) - (1 if self.skip is not None else 0)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if self.skip is not None and index >= self.skip:
+            index += 1
+        return self.board[index]
+
+
 class JCoGame(BaseGame):
     """Game J Cơ – Guess your hidden number."""
 
+    game_type = GameType.JCO
+
     INTERVAL_MAP = {
         "5m": 300,
         "10m": 600,
@@ -46,6 +75,8 @@ class JCoGame(BaseGame):
 
         # J Cơ identity
         self.jco_id: Optional[int] = None
+        # Số lần làm J Cơ của từng người (J Cơ đầu game + mỗi lần đảo vai)
+        self.jco_stints: Dict[int, int] = {}
 
         # Per-round answers: {player_id: int}
         self.current_answers: Dict[int, int] = {}
@@ -53,12 +84,22 @@ class JCoGame(BaseGame):
         # Per-round votes: {voter_id: target_id}
         self.current_votes: Dict[int, int] = {}
 
+        # Tally theo target, cập nhật O(1) mỗi lần vote / đổi vote
+        self.vote_counts: Dict[int, int] = {}
+        # Người đang có >50% phiếu (tối đa một người), None nếu chưa có
+        self.majority_target: Optional[int] = None
+
         # Eliminated players (in order)
         self.eliminated: List[int] = []
 
         # Consecutive rounds with no elimination (for rotation)
         self.no_elimination_streak: int = 0
 
+        # Bảng số của vòng hiện tại (dùng chung cho mọi /checknumber):
+        # [(player_id, number)] theo thứ tự người còn sống + vị trí của từng người
+        self.number_board: List[Tuple[int, int]] = []
+        self.board_index: Dict[int, int] = {}
+
     # ------------------------------------------------------------------
     # Settings
     # ------------------------------------------------------------------
@@ -69,6 +110,7 @@ class JCoGame(BaseGame):
             "game_interval": "1h",
             "player_limit": 10,
             "rotation": True,  # on/off
+            "early_resolve": False,  # kết thúc vòng ngay khi có người >50% phiếu
         }
 
     def validate_settings(self, settings: dict) -> tuple[bool, str]:
@@ -93,6 +135,11 @@ class JCoGame(BaseGame):
             if not isinstance(v, bool):
                 return False, "rotation phải là On hoặc Off"
 
+        if "early_resolve" in settings:
+            v = settings["early_resolve"]
+            if not isinstance(v, bool):
+                return False, "early_resolve phải là On hoặc Off"
+
         return True, ""
 
     # ------------------------------------------------------------------
@@ -103,15 +150,27 @@ class JCoGame(BaseGame):
     def alive_players(self) -> List[int]:
         return [pid for pid in self.players if pid not in self.eliminated]
 
+    @property
+    def alive_count(self) -> int:
+        return len(self.players) - len(self.eliminated)
+
     @property
     def interval_seconds(self) -> int:
         return self.INTERVAL_MAP.get(self.settings["game_interval"], 3600)
 
     def _assign_numbers(self):
-        """Gán số ngẫu nhiên (1..M) cho tất cả người chơi còn sống."""
+        """Gán số ngẫu nhiên (1..M) cho tất cả người chơi còn sống.
+
+        Bốc toàn bộ số trong một lần gọi và dựng sẵn bảng số của vòng.
+        """
         M = self.settings["M"]
-        for pid in self.alive_players:
-            self.players[pid]["number"] = random.randint(1, M)
+        alive = self.alive_players
+        numbers = random.choices(range(1, M + 1), k=len(alive))
+        for pid, number in zip(alive, numbers):
+            self.players[pid]["number"] = number
+        # List mới mỗi vòng: view cũ vẫn giữ bảng của vòng trước
+        self.number_board = list(zip(alive, numbers))
+        self.board_index = {pid: i for i, pid in enumerate(alive)}
 
     def _pick_jco(self, exclude: Optional[int] = None) -> int:
         """Chọn ngẫu nhiên J Cơ từ người chơi còn sống."""
@@ -123,19 +182,21 @@ class JCoGame(BaseGame):
     # ------------------------------------------------------------------
 
     async def on_game_start(self):
-        M = self.settings["M"]
         for pid in self.players:
             self.players[pid] = {
-                "number": random.randint(1, M),
+                "number": 0,
                 "mirror_used": False,
             }
+        self._assign_numbers()
 
         # Pick J Cơ
         alive = list(self.players.keys())
         self.jco_id = random.choice(alive)
+        self.jco_stints = {self.jco_id: 1}
 
         self.current_round = 0
         self.no_elimination_streak = 0
+        self.bump_version()
         self.log_event(
             f"Game J Cơ bắt đầu với {len(self.players)} người chơi | "
             f"J Cơ: Player {self.jco_id}"
@@ -161,6 +222,7 @@ class JCoGame(BaseGame):
             return False, f"Số phải từ 1 đến {M}"
 
         self.current_answers[player_id] = number
+        self.bump_version()
         return True, ""
 
     # ------------------------------------------------------------------
@@ -187,12 +249,39 @@ class JCoGame(BaseGame):
         if voter_id == target_id:
             return False, "Bạn không thể vote chính mình"
 
-        if voter_id in self.current_votes:
-            return False, "Bạn đã vote rồi, không thể thay đổi"
+        previous = self.current_votes.get(voter_id)
+        if previous == target_id:
+            return False, "Bạn đã vote người này rồi"
 
+        # Đổi vote: trả phiếu cho người cũ trước
+        if previous is not None:
+            self._remove_vote(previous)
         self.current_votes[voter_id] = target_id
+        self._add_vote(target_id)
+        self.bump_version()
         return True, ""
 
+    def _add_vote(self, target_id: int):
+        count = self.vote_counts.get(target_id, 0) + 1
+        self.vote_counts[target_id] = count
+        if count > self.alive_count / 2:
+            self.majority_target = target_id
+
+    def _remove_vote(self, target_id: int):
+        count = self.vote_counts.get(target_id, 0) - 1
+        if count > 0:
+            self.vote_counts[target_id] = count
+        else:
+            self.vote_counts.pop(target_id, None)
+        if self.majority_target == target_id and count <= self.alive_count / 2:
+            self.majority_target = None
+
+    def clear_votes(self):
+        self.current_votes.clear()
+        self.vote_counts.clear()
+        self.majority_target = None
+        self.bump_version()
+
     # ------------------------------------------------------------------
     # Core: mirror
     # ------------------------------------------------------------------
@@ -209,6 +298,7 @@ class JCoGame(BaseGame):
             return False, "Bạn đã dùng gương rồi!", None
 
         self.players[player_id]["mirror_used"] = True
+        self.bump_version()
         number = self.players[player_id]["number"]
         self.log_event(f"Player {player_id} đã dùng gương")
         return True, "", number
@@ -229,7 +319,7 @@ class JCoGame(BaseGame):
     # Core: get others' numbers (checkNumber)
     # ------------------------------------------------------------------
 
-    def get_others_numbers(self, player_id: int) -> Tuple[bool, str, List[Tuple[int, int]]]:
+    def get_others_numbers(self, player_id: int) -> Tuple[bool, str, Sequence]:
         """Xem số trên gáy của tất cả người chơi khác còn sống."""
         if player_id not in self.players:
             return False, "Bạn chưa tham gia game", []
@@ -237,12 +327,9 @@ class JCoGame(BaseGame):
         if player_id in self.eliminated:
             return False, "Bạn đã bị loại", []
 
-        result = []
-        for pid in self.alive_players:
-            if pid != player_id:
-                result.append((pid, self.players[pid]["number"]))
-
-        return True, "", result
+        return True, "", OthersNumbers(
+            self.number_board, self.board_index.get(player_id)
+        )
 
     # ------------------------------------------------------------------
     # Core: resolve round
@@ -255,6 +342,7 @@ class JCoGame(BaseGame):
             return None
 
         self.current_round += 1
+        self.bump_version()
 
         eliminated_this_round: List[int] = []
         voted_out_this_round: List[int] = []
@@ -286,24 +374,19 @@ class JCoGame(BaseGame):
 
         # --- Phase 2: Vote resolution (from round 2+) ---
         if self.current_round >= 2 and self.current_votes:
-            # Count votes per target
-            vote_counts: Dict[int, int] = {}
-            for target_id in self.current_votes.values():
-                vote_counts[target_id] = vote_counts.get(target_id, 0) + 1
-
-            # >50% of alive players needed
+            # >50% of alive players needed — tally đã tính sẵn khi vote
             alive_count = len(alive)
-            threshold = alive_count / 2
+            target_id = self.majority_target
 
-            for target_id, count in vote_counts.items():
-                if count > threshold and target_id not in eliminated_this_round:
-                    voted_out_this_round.append(target_id)
-                    if target_id == self.jco_id:
-                        jco_voted_out = True
-                    self.log_event(
-                        f"Vòng {self.current_round}: Player {target_id} bị vote loại "
-                        f"({count}/{alive_count} phiếu)"
-                    )
+            if target_id is not None and target_id not in eliminated_this_round:
+                count = self.vote_counts[target_id]
+                voted_out_this_round.append(target_id)
+                if target_id == self.jco_id:
+                    jco_voted_out = True
+                self.log_event(
+                    f"Vòng {self.current_round}: Player {target_id} bị vote loại "
+                    f"({count}/{alive_count} phiếu)"
+                )
 
         # Apply eliminations
         for pid in eliminated_this_round:
@@ -329,6 +412,7 @@ class JCoGame(BaseGame):
             old_jco = self.jco_id
             new_jco_id = self._pick_jco(exclude=old_jco)
             self.jco_id = new_jco_id
+            self.jco_stints[new_jco_id] = self.jco_stints.get(new_jco_id, 0) + 1
             rotation_happened = True
             self.no_elimination_streak = 0
             self.log_event(
@@ -352,7 +436,7 @@ class JCoGame(BaseGame):
 
         # Clear per-round data
         self.current_answers.clear()
-        self.current_votes.clear()
+        self.clear_votes()
 
         return result
 
@@ -386,6 +470,22 @@ class JCoGame(BaseGame):
 
         return False, "", None
 
+    def get_results(self) -> List[PlayerResult]:
+        """Người còn sống trước, người bị loại muộn hơn xếp trên; điểm = số lần làm J Cơ."""
+        is_over, reason, winner_id = self.check_game_over()
+        alive = self.alive_players
+        if not is_over:
+            winners: List[int] = []
+        elif reason == "jco_voted_out":
+            winners = [pid for pid in alive if pid != self.jco_id]
+        else:
+            winners = [winner_id] if winner_id is not None else []
+        # Snapshot từ bản cũ chưa có jco_stints → chỉ tính J Cơ hiện tại
+        scores = dict(getattr(self, "jco_stints", None) or {})
+        if not scores and self.jco_id is not None:
+            scores = {self.jco_id: 1}
+        return self.build_results(alive + self.eliminated[::-1], winners, scores)
+
     # ------------------------------------------------------------------
     # Info helpers
     # ------------------------------------------------------------------
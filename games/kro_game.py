@@ -3,8 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 
-from enums import GameState
-from games.base_game import BaseGame
+from enums import GameState, GameType
+from games.base_game import BaseGame, PlayerResult
 
 
 @dataclass
@@ -27,6 +27,12 @@ class RoundResult:
 class KRoGame(BaseGame):
     """Game K Rô – Guess 0.8× average."""
 
+    game_type = GameType.KRO
+
+    MAX_NUMBER = 100
+    # Bàn lớn: hàng trăm / hàng nghìn người chơi
+    MAX_PLAYER_LIMIT = 1000
+
     # ----- intervals accepted by this game (in seconds) -----
     INTERVAL_MAP = {
         "1m": 60,
@@ -48,6 +54,15 @@ class KRoGame(BaseGame):
         # per-round picks  {player_id: number}
         self.current_picks: Dict[int, int] = {}
 
+        # Aggregate của vòng, cập nhật ngay khi pick (kể cả đổi số) để
+        # resolve_round chỉ cần quét 101 giá trị thay vì toàn bộ người chơi
+        self.pick_sum: int = 0
+        self.pick_histogram: List[int] = [0] * (self.MAX_NUMBER + 1)
+        # pickers_by_value[n] = {player_id: None} theo thứ tự pick
+        self.pickers_by_value: List[Dict[int, None]] = [
+            {} for _ in range(self.MAX_NUMBER + 1)
+        ]
+
         # penalty scores  {player_id: int}
         self.penalties: Dict[int, int] = {}
 
@@ -73,8 +88,10 @@ class KRoGame(BaseGame):
 
         if "player_limit" in settings:
             v = settings["player_limit"]
-            if not isinstance(v, int) or not (2 <= v <= 5):
-                return False, "Giới hạn người chơi phải từ 2 đến 5"
+            if not isinstance(v, int) or not (2 <= v <= self.MAX_PLAYER_LIMIT):
+                return False, (
+                    f"Giới hạn người chơi phải từ 2 đến {self.MAX_PLAYER_LIMIT}"
+                )
 
         if "game_interval" in settings:
             v = settings["game_interval"]
@@ -91,7 +108,8 @@ class KRoGame(BaseGame):
     @property
     def alive_players(self) -> List[int]:
         """Danh sách player còn sống (chưa bị loại)."""
-        return [pid for pid in self.players if pid not in self.eliminated]
+        eliminated = set(self.eliminated)
+        return [pid for pid in self.players if pid not in eliminated]
 
     @property
     def interval_seconds(self) -> int:
@@ -106,6 +124,7 @@ class KRoGame(BaseGame):
             self.players[pid] = {}
             self.penalties[pid] = 0
         self.current_round = 0
+        self.bump_version()
         self.log_event(f"Game K Rô bắt đầu với {len(self.players)} người chơi")
 
     async def on_game_end(self):
@@ -123,12 +142,47 @@ class KRoGame(BaseGame):
         if player_id in self.eliminated:
             return False, "Bạn đã bị loại khỏi game"
 
-        if not (0 <= number <= 100):
-            return False, "Số phải từ 0 đến 100"
+        if not (0 <= number <= self.MAX_NUMBER):
+            return False, f"Số phải từ 0 đến {self.MAX_NUMBER}"
+
+        # Đổi số: gỡ số cũ khỏi aggregate trước
+        previous = self.current_picks.get(player_id)
+        if previous is not None:
+            self.pick_sum -= previous
+            self.pick_histogram[previous] -= 1
+            del self.pickers_by_value[previous][player_id]
 
         self.current_picks[player_id] = number
+        self.pick_sum += number
+        self.pick_histogram[number] += 1
+        self.pickers_by_value[number][player_id] = None
+        self.bump_version()
         return True, ""
 
+    def clear_picks(self):
+        """Xoá lựa chọn của vòng (và aggregate đi kèm)."""
+        self.current_picks.clear()
+        self.pick_sum = 0
+        self.pick_histogram = [0] * (self.MAX_NUMBER + 1)
+        for pickers in self.pickers_by_value:
+            pickers.clear()
+        self.bump_version()
+
+    def _closest_values(self, target: float) -> List[int]:
+        """Các giá trị đã được chọn gần mục tiêu nhất (tối đa 2 giá trị)."""
+        best: List[int] = []
+        min_dist: Optional[float] = None
+        for value, count in enumerate(self.pick_histogram):
+            if not count:
+                continue
+            dist = abs(value - target)
+            if min_dist is None or dist < min_dist:
+                min_dist = dist
+                best = [value]
+            elif dist == min_dist:
+                best.append(value)
+        return best
+
     # ------------------------------------------------------------------
     # Core: resolve round
     # ------------------------------------------------------------------
@@ -140,11 +194,10 @@ class KRoGame(BaseGame):
             return None
 
         self.current_round += 1
+        self.bump_version()
 
-        picks: Dict[int, int] = {}
-        for pid in alive:
-            if pid in self.current_picks:
-                picks[pid] = self.current_picks[pid]
+        # Chỉ người còn sống mới pick được, nên current_picks đã là picks
+        picks: Dict[int, int] = dict(self.current_picks)
 
         # Players that didn't pick get penalty automatically
         no_pick = [pid for pid in alive if pid not in picks]
@@ -153,22 +206,25 @@ class KRoGame(BaseGame):
 
         # --- Duplicate rule (≤4 alive) ---
         invalid_numbers: List[int] = []
-        valid_picks: Dict[int, int] = dict(picks)
+        valid_picks: Dict[int, int] = picks
+        valid_sum = self.pick_sum
+        valid_count = len(picks)
 
         if active_count <= 4:
-            # Count occurrences of each number among pickers
-            from collections import Counter
-
-            num_counts = Counter(picks.values())
-            invalid_numbers = [n for n, c in num_counts.items() if c >= 2]
+            invalid_numbers = [
+                n for n, c in enumerate(self.pick_histogram) if c >= 2
+            ]
             if invalid_numbers:
+                for n in invalid_numbers:
+                    valid_sum -= n * self.pick_histogram[n]
+                    valid_count -= self.pick_histogram[n]
                 valid_picks = {
                     pid: n for pid, n in picks.items() if n not in invalid_numbers
                 }
 
         # --- Compute average & target ---
-        if valid_picks:
-            avg = sum(valid_picks.values()) / len(valid_picks)
+        if valid_count:
+            avg = valid_sum / valid_count
             target = avg * 0.8
         else:
             avg = None
@@ -211,7 +267,7 @@ class KRoGame(BaseGame):
 
                 self._apply_penalties(result, no_pick)
                 self.round_history.append(result)
-                self.current_picks.clear()
+                self.clear_picks()
                 return result
 
         if target is not None:
@@ -232,14 +288,13 @@ class KRoGame(BaseGame):
                     losers = [pid for pid in picks if pid not in winners]
 
             # --- Normal closest-to-target logic ---
+            # (tính trên mọi số đã chọn, kể cả số bị vô hiệu)
             if not winners:
-                distances = {
-                    pid: abs(n - target) for pid, n in picks.items()
-                }
-                if distances:
-                    min_dist = min(distances.values())
-                    winners = [pid for pid, d in distances.items() if d == min_dist]
-                    losers = [pid for pid in picks if pid not in winners]
+                for value in self._closest_values(target):
+                    winners.extend(self.pickers_by_value[value])
+                if winners:
+                    winner_set = set(winners)
+                    losers = [pid for pid in picks if pid not in winner_set]
         else:
             # No valid picks at all – everyone who picked is loser? 
             # Actually if all picks are invalid (duplicates), no target.
@@ -262,23 +317,26 @@ class KRoGame(BaseGame):
 
         self._apply_penalties(result, no_pick)
         self.round_history.append(result)
-        self.current_picks.clear()
+        self.clear_picks()
         return result
 
     def _apply_penalties(self, result: RoundResult, no_pick: List[int]):
         """Áp dụng điểm phạt và loại người chạm mức giới hạn."""
         max_pen = self.settings["max_penalty"]
+        no_pick_set = set(no_pick)
 
         for pid in result.losers:
             self.penalties[pid] = self.penalties.get(pid, 0) + result.penalty
-            if pid in no_pick:
+            if pid in no_pick_set:
                 self.log_event(
                     f"Vòng {result.round_number}: Player {pid} không chọn số → +{result.penalty} điểm phạt"
                 )
 
         # Eliminate players that hit the cap
+        eliminated = set(self.eliminated)
         for pid in list(result.losers):
-            if self.penalties.get(pid, 0) >= max_pen and pid not in self.eliminated:
+            if self.penalties.get(pid, 0) >= max_pen and pid not in eliminated:
+                eliminated.add(pid)
                 self.eliminated.append(pid)
                 self.log_event(
                     f"Vòng {result.round_number}: Player {pid} bị loại "
@@ -296,6 +354,19 @@ class KRoGame(BaseGame):
             return True, alive[0] if alive else None
         return False, None
 
+    def get_results(self) -> List[PlayerResult]:
+        """Người còn sống (ít điểm phạt trước), rồi người bị loại muộn hơn xếp trên."""
+        dead = set(self.eliminated)
+        alive = sorted(
+            (pid for pid in self.players if pid not in dead),
+            key=lambda pid: self.penalties.get(pid, 0),
+        )
+        is_over, winner_id = self.check_game_over()
+        winners = [winner_id] if is_over and winner_id is not None else []
+        return self.build_results(
+            alive + self.eliminated[::-1], winners, self.penalties
+        )
+
     # ------------------------------------------------------------------
     # Info helpers
     # ------------------------------------------------------------------
@@ -323,10 +394,11 @@ class KRoGame(BaseGame):
 
     def get_status_embed_data(self) -> Tuple[List[Tuple[int, int]], List[int]]:
         """Trả về (alive_list[(pid, penalty)], eliminated_list)."""
+        eliminated = set(self.eliminated)
         alive = [
             (pid, self.penalties.get(pid, 0))
             for pid in self.players
-            if pid not in self.eliminated
+            if pid not in eliminated
         ]
         alive.sort(key=lambda x: x[1])
         return alive, list(self.eliminated)
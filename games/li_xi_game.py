@@ -1,13 +1,74 @@
+import math
 import random
-from typing import List
-
-from enums import GameInterval, GameState
-from games.base_game import BaseGame
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from enums import GameInterval, GameState, GameType
+from games.base_game import BaseGame, PlayerResult
+
+GAMBLE_DAILY_LIMIT = 200
+GAMBLE_PAYOUT = 200
+GAMBLE_WIN_CHANCE = 0.01
+LEADERBOARD_PAGE_SIZE = 10
+
+
+def _losses_before_win() -> int:
+    """Số lần thua liên tiếp trước lần thắng kế tiếp (phân phối hình học, p = 1%)."""
+    return int(math.log(1.0 - random.random()) / math.log(1.0 - GAMBLE_WIN_CHANCE))
+
+
+def _run_gambles(money: int, bet: int, count: int) -> tuple[int, int, int]:
+    """Chạy tối đa ``count`` lần cược ``bet``; trả về (số lần đã cược, số lần thắng, tiền còn).
+
+    Thay vì tung xu từng lần, nhảy thẳng tới lần thắng kế tiếp bằng khoảng cách
+    hình học → O(số lần thắng), cùng phân phối với cược từng lần (số lần thắng
+    ~ Binomial(count, 1%)). Dừng sớm khi không đủ tiền cho lần cược tiếp theo.
+    """
+    placed = wins = 0
+    remaining = count
+    while remaining > 0:
+        gap = _losses_before_win()
+        losses = min(gap, remaining, money // bet)
+        money -= losses * bet
+        placed += losses
+        remaining -= losses
+        if losses < gap or remaining == 0 or money < bet:
+            break
+        # Lần cược tiếp theo thắng
+        money += bet * GAMBLE_PAYOUT
+        wins += 1
+        placed += 1
+        remaining -= 1
+    return placed, wins, money
+
+
+@dataclass(frozen=True)
+class LeaderboardSnapshot:
+    """Bảng xếp hạng tại một version của game; dùng chung cho mọi view, không sửa."""
+
+    version: int
+    day: int
+    entries: Tuple[Tuple[int, int], ...]
+    built_at: float
+
+    @property
+    def total_pages(self) -> int:
+        return max(1, math.ceil(len(self.entries) / LEADERBOARD_PAGE_SIZE))
+
+    def page(self, page: int) -> Tuple[Tuple[int, int], ...]:
+        start = page * LEADERBOARD_PAGE_SIZE
+        return self.entries[start:start + LEADERBOARD_PAGE_SIZE]
 
 
 class LiXiNgayTetGame(BaseGame):
     """Game Lì Xì Ngày Tết."""
 
+    game_type = GameType.LI_XI_NGAY_TET
+
+    # Snapshot bảng xếp hạng gần nhất (mặc định ở class: snapshot cũ chưa có)
+    _leaderboard: Optional[LeaderboardSnapshot] = None
+
     def __init__(self, host_id: int):
         super().__init__(host_id)
         self.settings = self.get_default_settings()
@@ -68,6 +129,7 @@ class LiXiNgayTetGame(BaseGame):
                 "gamble_count": 0,
             }
 
+        self.bump_version()
         self.log_event(f"Game bắt đầu với {len(self.players)} người chơi")
 
     async def on_day_change(self):
@@ -84,6 +146,7 @@ class LiXiNgayTetGame(BaseGame):
             # Random lại tuổi đầu ngày
             self.players[player_id]["age"] = random.randint(1, 2 * N)
 
+        self.bump_version()
         self.log_event(f"Ngày {self.current_day}: Reset trạng thái người chơi")
 
     # ------------------------------------------------------------------
@@ -174,6 +237,7 @@ class LiXiNgayTetGame(BaseGame):
         # Đánh dấu đã đấu hôm nay
         player1["fights_today"].add(player2_id)
         player2["fights_today"].add(player1_id)
+        self.bump_version()
 
         return True, "", result
 
@@ -190,6 +254,7 @@ class LiXiNgayTetGame(BaseGame):
         new_age = random.randint(1, 2 * N)
         self.players[player_id]["age"] = new_age
         self.players[player_id]["reroll_used"] = True
+        self.bump_version()
 
         self.log_event(f"Player {player_id} reroll age. Old age: {old_age}.")
         return True, "", new_age
@@ -210,48 +275,67 @@ class LiXiNgayTetGame(BaseGame):
 
         self.players[giver_id]["money"] -= amount
         self.players[recipient_id]["money"] += amount
+        self.bump_version()
 
         self.log_event(
             f"Player {giver_id} giveaway {amount} đồng cho Player {recipient_id}"
         )
         return True, ""
 
-    def gamble(self, player_id: int, bet: int) -> tuple[bool, str, dict]:
-        """Cố gắng vận may: 1% thắng 200*bet, 99% thua bet."""
+    def gamble(self, player_id: int, bet: int, count: int = 1) -> tuple[bool, str, dict]:
+        """Cố gắng vận may: 1% thắng 200*bet, 99% thua bet.
+
+        ``count`` > 1: cược ``count`` lần liên tiếp cùng mức ``bet`` trong một bước,
+        dừng sớm khi hết tiền hoặc hết lượt trong ngày; chỉ ghi một dòng log tổng.
+        """
         if player_id not in self.players:
             return False, "Bạn chưa tham gia game", {}
 
         if bet <= 0:
             return False, "Số tiền phải lớn hơn 0", {}
 
+        if count <= 0:
+            return False, "Số lần cược phải lớn hơn 0", {}
+
+        player = self.players[player_id]
+
         # Kiểm tra giới hạn gamble hôm nay (200 lần/ngày)
-        if self.players[player_id]["gamble_count"] >= 200:
-            return False, "❌ Bạn đã đạt giới hạn 200 lần cược hôm nay!", {}
+        if player["gamble_count"] >= GAMBLE_DAILY_LIMIT:
+            return False, f"❌ Bạn đã đạt giới hạn {GAMBLE_DAILY_LIMIT} lần cược hôm nay!", {}
+
+        if player["money"] < bet:
+            return False, f"Bạn chỉ có {player['money']} đồng", {}
 
-        if self.players[player_id]["money"] < bet:
-            return False, f"Bạn chỉ có {self.players[player_id]['money']} đồng", {}
+        requested = count
+        count = min(count, GAMBLE_DAILY_LIMIT - player["gamble_count"])
+        placed, wins, money = _run_gambles(player["money"], bet, count)
 
         result = {
-            "win": False,
-            "money_change": 0,
+            "win": wins > 0,
+            "money_change": money - player["money"],
+            "bets": placed,
+            "wins": wins,
+            "losses": placed - wins,
+            "requested": requested,
+            # Dừng trước khi đủ số lần (hết tiền / hết lượt trong ngày)
+            "stopped_early": placed < requested,
         }
 
-        # 1% để thắng
-        if random.randint(1, 100) == 1:
-            reward = bet * 200
-            self.players[player_id]["money"] += reward
-            result["win"] = True
-            result["money_change"] = reward
-            self.log_event(f"Player {player_id} gamble THẮNG! +{reward} đồng")
-        else:
-            # 99% thua
-            self.players[player_id]["money"] -= bet
-            result["win"] = False
-            result["money_change"] = -bet
-            self.log_event(f"Player {player_id} gamble THUA! -{bet} đồng")
+        # Áp dụng một lần cho cả loạt cược
+        player["money"] = money
+        player["gamble_count"] += placed
+        self.bump_version()
 
-        # Tăng counter cược hôm nay
-        self.players[player_id]["gamble_count"] += 1
+        if placed == 1:
+            if wins:
+                self.log_event(f"Player {player_id} gamble THẮNG! +{bet * GAMBLE_PAYOUT} đồng")
+            else:
+                self.log_event(f"Player {player_id} gamble THUA! -{bet} đồng")
+        else:
+            self.log_event(
+                f"Player {player_id} gamble {placed} lần x {bet} đồng: "
+                f"{wins} thắng, {placed - wins} thua, {result['money_change']:+} đồng"
+            )
 
         return True, "", result
 
@@ -263,3 +347,36 @@ class LiXiNgayTetGame(BaseGame):
         ]
         leaderboard.sort(key=lambda x: x[1], reverse=True)
         return leaderboard
+
+    def get_results(self) -> List[PlayerResult]:
+        """Xếp hạng theo tiền cuối game; người nhiều tiền nhất (kể cả hoà) thắng."""
+        leaderboard = self.get_leaderboard()
+        if not leaderboard:
+            return []
+        top_money = leaderboard[0][1]
+        return self.build_results(
+            [pid for pid, _ in leaderboard],
+            [pid for pid, money in leaderboard if money == top_money],
+            dict(leaderboard),
+        )
+
+    def leaderboard_snapshot(self, max_age: float = 0.0) -> LeaderboardSnapshot:
+        """Snapshot bảng xếp hạng dùng chung cho mọi người xem.
+
+        Chỉ dựng lại khi game đã đổi version *và* snapshot cũ hơn ``max_age``
+        giây → nhiều người bấm /leaderboard liên tục vẫn chỉ sort một lần.
+        """
+        snapshot = self._leaderboard
+        now = time.time()
+        if snapshot is not None and (
+            snapshot.version == self.version or now - snapshot.built_at < max_age
+        ):
+            return snapshot
+
+        self._leaderboard = LeaderboardSnapshot(
+            version=self.version,
+            day=self.current_day,
+            entries=tuple(self.get_leaderboard()),
+            built_at=now,
+        )
+        return self._leaderboard
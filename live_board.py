@@ -0,0 +1,195 @@
+"""Board trực tiếp: một tin nhắn ghim cho mỗi game, sửa tại chỗ mỗi vòng.
+
+Thay cho thông báo "Vòng N bắt đầu" + embed kết quả gửi mới mỗi vòng
+(``LIVE_BOARD=1``). Board hiển thị đếm ngược, số người đã gửi lựa chọn, người
+còn sống và tóm tắt vòng trước; chỉ các mốc quan trọng (có người bị loại, game
+kết thúc) mới được gửi thành tin nhắn mới.
+
+Mỗi vòng board chỉ được sửa một lần, lúc vòng mới bắt đầu (kèm kết quả vòng
+trước), cộng thêm khi tạm dừng / tiếp tục; ``LIVE_BOARD_MID_ROUND_UPDATE`` bật
+thêm đúng một lần sửa ở giữa vòng để cập nhật số người đã gửi. Id của tin nhắn
+nằm trong game (``board_message_id``) nên sau ``/reload`` hay khôi phục snapshot
+board cũ vẫn được dùng tiếp.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple, Union
+
+import discord
+
+from enums import GameState
+from round_timer import RoundTimer
+
+if TYPE_CHECKING:
+    from bot import MinigameBot
+    from games.base_game import BaseGame
+
+# Số tên tối đa trong ô "Còn sống"
+_MAX_NAMES = 40
+
+
+class LiveBoard:
+    """Tin nhắn trạng thái của một game, sửa tại chỗ mỗi vòng một lần."""
+
+    def __init__(
+        self,
+        bot: MinigameBot,
+        game: BaseGame,
+        channel: discord.abc.Messageable,
+        title: str,
+        hint: str,
+        submitted: Callable[[], int],
+        color: discord.Color,
+        mid_round: bool = False,
+    ):
+        self.bot = bot
+        self.game = game
+        self.channel = channel
+        self.title = title
+        self.hint = hint
+        self.submitted = submitted
+        self.color = color
+        self.mid_round = mid_round
+        # Tóm tắt vòng vừa xong (cog gán sau mỗi resolve_round)
+        self.last_result: Optional[str] = None
+        self._message: Optional[Union[discord.Message, discord.PartialMessage]] = None
+        self._drawn: Optional[Tuple] = None
+
+    @classmethod
+    async def open(cls, bot: MinigameBot, game: BaseGame, channel, **kwargs) -> Optional[LiveBoard]:
+        """Dùng lại board của game (nếu còn) hoặc gửi + ghim board mới.
+
+        Trả về None nếu không gửi được (thiếu quyền...) → cog gửi thông báo như cũ.
+        """
+        board = cls(bot, game, channel, **kwargs)
+        if game.board_message_id and hasattr(channel, "get_partial_message"):
+            board._message = channel.get_partial_message(game.board_message_id)
+            await board.refresh(force=True)
+        else:
+            await board._post()
+        if board._message is None:
+            return None
+        game.live_board = board
+        return board
+
+    async def _post(self):
+        """Gửi + ghim board mới (lần đầu, hoặc khi tin nhắn cũ đã bị xoá)."""
+        self._message = None
+        stamp = self._stamp()
+        try:
+            message = await self.channel.send(embed=self.build_embed())
+        except discord.HTTPException as e:
+            print(f"⚠️ Không gửi được live board: {e}")
+            return
+        self._message = message
+        self._drawn = stamp
+        self.game.board_message_id = message.id
+        try:
+            await message.pin()
+        except discord.HTTPException:
+            pass
+
+    # ------------------------------------------------------------------
+    # Render
+    # ------------------------------------------------------------------
+
+    def _stamp(self) -> Tuple:
+        timer = self.game.round_timer
+        return (
+            self.game.version,
+            self.game.state,
+            timer.deadline if timer else None,
+            self.last_result,
+        )
+
+    def _names(self, pids: List[int]) -> str:
+        names = []
+        for pid in pids[:_MAX_NAMES]:
+            user = self.bot.get_user(pid)
+            names.append(user.display_name if user else f"ID {pid}")
+        if len(pids) > _MAX_NAMES:
+            names.append(f"… và {len(pids) - _MAX_NAMES} người khác")
+        return ", ".join(names)[:1024] if names else "Không còn ai"
+
+    def _countdown(self) -> str:
+        game = self.game
+        timer = game.round_timer
+        if game.state == GameState.ENDED:
+            return "🏁 Game đã kết thúc"
+        if game.state == GameState.PAUSED:
+            remaining = int(timer.remaining) if timer else 0
+            return f"⏸️ Đang tạm dừng (còn **{remaining}** giây)"
+        if timer is None or timer.deadline is None or timer.expired:
+            return "⏳ Đang tính kết quả..."
+        # Discord tự đếm ngược phía client, không cần sửa tin nhắn mỗi giây
+        return f"⏰ Kết thúc vòng <t:{int(timer.deadline.timestamp())}:R>"
+
+    def build_embed(self) -> discord.Embed:
+        game = self.game
+        alive = game.alive_players
+        ended = game.state == GameState.ENDED
+        round_number = game.current_round if ended else game.current_round + 1
+        embed = discord.Embed(
+            title=f"📌 {self.title} — Vòng {round_number}",
+            description=self._countdown() if ended else f"{self._countdown()}\n{self.hint}",
+            color=discord.Color.gold() if ended else self.color,
+        )
+        if not ended and self.mid_round:
+            # Không sửa giữa vòng thì lúc vẽ luôn là 0 → bỏ ô này
+            embed.add_field(
+                name="✍️ Đã gửi lựa chọn",
+                value=f"**{self.submitted()}**/{len(alive)}",
+                inline=True,
+            )
+        embed.add_field(name="❤️ Còn sống", value=f"**{len(alive)}**", inline=True)
+        embed.add_field(name="👥 Người chơi", value=self._names(alive), inline=False)
+        if self.last_result:
+            embed.add_field(name="📊 Vòng trước", value=self.last_result[:1024], inline=False)
+        return embed
+
+    # ------------------------------------------------------------------
+    # Update
+    # ------------------------------------------------------------------
+
+    async def refresh(self, force: bool = False):
+        """Sửa board nếu game đã đổi từ lần vẽ trước."""
+        stamp = self._stamp()
+        if self._message is None or (not force and stamp == self._drawn):
+            return
+        try:
+            await self._message.edit(embed=self.build_embed())
+        except discord.NotFound:
+            # Board đã bị xoá (hoặc không còn sau khi khôi phục) → gửi lại
+            await self._post()
+            return
+        except discord.HTTPException as e:
+            print(f"⚠️ Không sửa được live board: {e}")
+            return
+        self._drawn = stamp
+
+    async def follow(self, timer: RoundTimer):
+        """Chờ hết vòng như ``timer.wait()``; có ``mid_round`` thì sửa board
+        thêm một lần ở giữa vòng (nếu game có thay đổi)."""
+        if not self.mid_round:
+            return await timer.wait()
+        waiter = asyncio.ensure_future(timer.wait())
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timer.remaining / 2)
+            if not done:
+                await self.refresh()
+            return await waiter
+        finally:
+            waiter.cancel()
+
+    async def close(self):
+        """Game kết thúc (hết vòng hoặc ``/endgame``): vẽ lần cuối rồi bỏ ghim."""
+        await self.refresh(force=True)
+        if self._message is not None:
+            try:
+                await self._message.unpin()
+            except discord.HTTPException:
+                pass
+        self.game.board_message_id = None
+        self.game.live_board = None
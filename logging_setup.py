@@ -0,0 +1,137 @@
+"""Logging qua queue: event loop chỉ đẩy record vào queue, thread nền format + ghi file."""
+
+import atexit
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import config
+
+# Thuộc tính mặc định của LogRecord (không đưa vào JSON như field "extra")
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Mỗi record một dòng JSON; field truyền qua ``extra=`` được giữ nguyên."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Chỉ giữ 1/N record dưới WARNING của các logger ồn ào (gateway, http)."""
+
+    def __init__(self, prefixes: Iterable[str], rate: int):
+        super().__init__()
+        self.prefixes = tuple(prefixes)
+        self.rate = max(1, rate)
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.prefixes):
+            return True
+        return next(self._counter) % self.rate == 0
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler chỉ ghép ``msg % args`` trên event loop; phần format đắt
+    (JSON, field extra, traceback) để thread nền làm."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # args thường là dict / list của game hay payload gateway mà loop sẽ sửa
+        # tiếp → phải ghép ngay, không để thread nền đọc lúc chúng đang đổi
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Đọc level theo logger, vd ``discord=INFO,minigame=DEBUG``."""
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def _file_handler() -> logging.Handler:
+    if config.LOG_ROTATE == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            config.LOG_FILE,
+            when=config.LOG_ROTATE_WHEN,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            config.LOG_FILE,
+            maxBytes=config.LOG_MAX_BYTES,
+            backupCount=config.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    if config.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter(
+                "[{asctime}] [{levelname:<8}] {name}: {message}",
+                "%Y-%m-%d %H:%M:%S",
+                style="{",
+            )
+        )
+    return handler
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Gắn queue handler vào root logger và chạy thread ghi file."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(
+        SamplingFilter(config.LOG_SAMPLED_LOGGERS, config.LOG_SAMPLE_RATE)
+    )
+
+    root = logging.getLogger()
+    root.setLevel(logging.getLevelName(config.LOG_LEVEL))
+    root.addHandler(queue_handler)
+    for name, level in parse_levels(config.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, _file_handler(), respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Ghi nốt các record còn trong queue rồi dừng thread nền."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
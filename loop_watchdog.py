@@ -0,0 +1,183 @@
+"""Đo độ trễ event loop và bắt stack của callback chặn loop quá lâu.
+
+- Task ``_tick`` ngủ ``interval`` giây rồi đo xem thực tế bị trễ bao nhiêu
+  (lag); lag của cửa sổ gần nhất dùng để tính p50 / p95 / p99.
+- Thread ``_watch`` theo dõi nhịp của task đó: quá ``threshold`` giây không có
+  nhịp mới nghĩa là có callback đang giữ loop → chụp stack của thread event
+  loop ngay lúc đó (hoặc của thread khác đang giữ GIL nếu loop chỉ đang chờ).
+- Mỗi lần bị chặn được gán cho lệnh / round loop (frame trong ``commands/``),
+  không có thì lấy tên task asyncio đang chạy.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sampling_profiler import attribute_stack, is_idle_frame
+
+logger = logging.getLogger("minigame.watchdog")
+
+# Số dòng stack cuối cùng giữ lại cho mỗi lần bị chặn (trong /metrics)
+_STACK_LINES = 12
+
+
+class LoopWatchdog:
+    """Lag của event loop (percentile) + đếm các lần bị chặn theo lệnh / round loop."""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, window: float = 60):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: Deque[float] = deque(maxlen=max(1, int(window / interval)))
+        self.offenders: Counter = Counter()
+        self.recent: Deque[dict] = deque(maxlen=10)
+        self.blocked_total = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Nhịp gần nhất của _tick (monotonic) và (nhịp, stack) chụp được khi trễ
+        self._beat = 0.0
+        self._capture: Optional[Tuple[float, dict]] = None
+
+    # ------------------------------------------------------------------
+    # Start / stop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Gọi từ trong event loop (vd setup_hook)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Event loop side
+    # ------------------------------------------------------------------
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.lags.append(lag)
+            if lag >= self.threshold:
+                capture = self._capture
+                # Bỏ qua stack chụp cho một nhịp cũ (thread chụp chậm hơn loop)
+                self._record_block(lag, capture[1] if capture and capture[0] == self._beat else None)
+            self._beat = now
+
+    def _record_block(self, lag: float, capture: Optional[dict]):
+        capture = capture or {"tag": "unknown", "thread": None, "stack": []}
+        self.blocked_total += 1
+        self.offenders[capture["tag"]] += 1
+        self.recent.append(
+            {
+                "at": time.time(),
+                "lag_ms": round(lag * 1000, 1),
+                "tag": capture["tag"],
+                "thread": capture["thread"],
+                "stack": capture["stack"][-_STACK_LINES:],
+            }
+        )
+        logger.warning(
+            "Event loop bị chặn %.0f ms bởi %s\n%s",
+            lag * 1000,
+            capture["tag"],
+            "".join(capture["stack"]),
+            extra={"lag_ms": round(lag * 1000, 1), "offender": capture["tag"]},
+        )
+
+    # ------------------------------------------------------------------
+    # Watcher thread
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        beat = None
+        while not self._stop.wait(self.threshold / 2):
+            current = self._beat
+            if current == beat or time.monotonic() - current < self.threshold:
+                continue
+            # Chụp một lần cho mỗi nhịp bị trễ (lúc callback vẫn đang chạy)
+            beat = current
+            self._capture = (current, self._snapshot())
+
+    def _snapshot(self) -> dict:
+        frames = sys._current_frames()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        frame = frames.get(self._loop_thread)
+        thread = self._loop_thread
+        if frame is None or is_idle_frame(frame):
+            # Loop chỉ đang chờ → thread khác (Flask, executor...) giữ GIL
+            frame = None
+            for ident, other in frames.items():
+                if ident not in (self._loop_thread, threading.get_ident()) and not is_idle_frame(other):
+                    thread, frame = ident, other
+                    break
+        if frame is None:
+            return {"tag": "unknown", "thread": None, "stack": []}
+
+        command, engine = attribute_stack(frame)
+        if thread == self._loop_thread:
+            tag = command or self._task_name()
+        else:
+            tag = command or f"thread:{names.get(thread, thread)}"
+        if engine:
+            tag = f"{tag} > {engine}"
+        return {
+            "tag": tag,
+            "thread": names.get(thread, str(thread)),
+            "stack": traceback.format_stack(frame),
+        }
+
+    def _task_name(self) -> str:
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is None:
+            return "callback"
+        coro = task.get_coro()
+        return getattr(coro, "__qualname__", None) or task.get_name()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def percentiles(self) -> Dict[str, float]:
+        lags = sorted(self.lags)
+        if not lags:
+            return {}
+
+        def at(q: float) -> float:
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))] * 1000, 1)
+
+        return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(lags[-1] * 1000, 1)}
+
+    def as_dict(self) -> dict:
+        recent: List[dict] = list(self.recent)
+        return {
+            "lag_ms": self.percentiles(),
+            "samples": len(self.lags),
+            "threshold_ms": round(self.threshold * 1000),
+            "blocked_total": self.blocked_total,
+            "offenders": dict(self.offenders.most_common(20)),
+            "recent": recent,
+        }
@@ -1,10 +1,11 @@
 import os
-import logging
 import webserver
 
 from dotenv import load_dotenv
 
+import config
 from bot import MinigameBot
+from logging_setup import setup_logging
 
 if __name__ == "__main__":
     load_dotenv()
@@ -14,9 +15,8 @@ if __name__ == "__main__":
         print("⚠️ Vui lòng set biến môi trường DISCORD_BOT_TOKEN")
         print("Ví dụ: export DISCORD_BOT_TOKEN='your_token_here'")
     else:
-        handler = logging.FileHandler(
-            filename="discord.log", encoding="utf-8", mode="w"
-        )
+        # Ghi log qua queue + thread nền (xoay file, không xoá log cũ)
+        setup_logging()
         bot = MinigameBot()
-        webserver.keep_alive()
-        bot.run(TOKEN, log_handler=handler, log_level=logging.DEBUG)
+        webserver.keep_alive(bot, config.WEB_PORT)
+        bot.run(TOKEN, log_handler=None)
@@ -0,0 +1,237 @@
+"""Lưu kết quả mọi game đã kết thúc + thống kê trọn đời của từng người chơi."""
+
+import bisect
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from games.base_game import PlayerResult
+
+
+class RankIndex:
+    """Bảng xếp hạng trọn đời của một (guild, loại game), sắp sẵn trong bộ nhớ.
+
+    ``keys`` là danh sách key (-wins, -points, player_id) đã sort → hạng của
+    một người = vị trí bisect (O(log n)), trang k = một lát cắt của danh sách.
+    """
+
+    def __init__(self, rows: List[Tuple[int, int, int, int]], through: int = 0):
+        # Id game lớn nhất đã nằm trong ``rows`` (game sau đó mới được cộng dần)
+        self.through = through
+        # player_id -> (wins, points, games)
+        self.stats: Dict[int, Tuple[int, int, int]] = {}
+        for player_id, wins, points, games in rows:
+            self.stats[player_id] = (wins, points, games)
+        self.keys = sorted(self._key(pid) for pid in self.stats)
+
+    def _key(self, player_id: int) -> Tuple[int, int, int]:
+        wins, points, _ = self.stats[player_id]
+        return (-wins, -points, player_id)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, player_id: int, won: bool, points: int):
+        if player_id in self.stats:
+            old = self._key(player_id)
+            del self.keys[bisect.bisect_left(self.keys, old)]
+            wins, total, games = self.stats[player_id]
+        else:
+            wins = total = games = 0
+        self.stats[player_id] = (wins + int(won), total + points, games + 1)
+        bisect.insort(self.keys, self._key(player_id))
+
+    def rank_of(self, player_id: int) -> Optional[int]:
+        if player_id not in self.stats:
+            return None
+        return bisect.bisect_left(self.keys, self._key(player_id)) + 1
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, int, Tuple[int, int, int]]]:
+        """[(hạng, player_id, (wins, points, games))] bắt đầu từ hạng offset + 1."""
+        return [
+            (offset + i + 1, key[2], self.stats[key[2]])
+            for i, key in enumerate(self.keys[offset:offset + limit])
+        ]
+
+
+class ProfileStore:
+    """SQLite: lịch sử kết quả (``results``) + bảng tổng hợp theo người chơi (``profiles``).
+
+    Bảng ``profiles`` được cộng dồn ngay khi ghi kết quả (cùng transaction),
+    nên ``/profile`` chỉ là một lần tra khoá chính, không quét lịch sử.
+    Tương tự, ``standings`` giữ tổng thắng / điểm theo (guild, loại game) cho
+    ``/alltime``; điểm một game = số người chơi xếp dưới mình.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " guild_id INTEGER, game_type TEXT NOT NULL,"
+                " player_count INTEGER NOT NULL, ended_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_games_guild_type"
+                " ON games (guild_id, game_type, ended_at)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " game_id INTEGER NOT NULL REFERENCES games (id),"
+                " player_id INTEGER NOT NULL, placement INTEGER NOT NULL,"
+                " won INTEGER NOT NULL, score INTEGER NOT NULL,"
+                " PRIMARY KEY (game_id, player_id))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_player"
+                " ON results (player_id, game_id)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                " player_id INTEGER NOT NULL, game_type TEXT NOT NULL,"
+                " games INTEGER NOT NULL, wins INTEGER NOT NULL,"
+                " placement_sum INTEGER NOT NULL, best_placement INTEGER NOT NULL,"
+                " score_sum INTEGER NOT NULL, score_min INTEGER NOT NULL,"
+                " score_max INTEGER NOT NULL, last_played REAL NOT NULL,"
+                " PRIMARY KEY (player_id, game_type))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS standings ("
+                " guild_id INTEGER NOT NULL, game_type TEXT NOT NULL,"
+                " player_id INTEGER NOT NULL, games INTEGER NOT NULL,"
+                " wins INTEGER NOT NULL, points INTEGER NOT NULL,"
+                " PRIMARY KEY (guild_id, game_type, player_id))"
+            )
+            if self._conn.execute("SELECT 1 FROM standings LIMIT 1").fetchone() is None:
+                # File tạo từ bản cũ chưa có standings → dựng lại từ lịch sử
+                self._conn.execute(
+                    "INSERT INTO standings (guild_id, game_type, player_id,"
+                    " games, wins, points)"
+                    " SELECT g.guild_id, g.game_type, r.player_id, COUNT(*),"
+                    " SUM(r.won), SUM(g.player_count - r.placement)"
+                    " FROM results r JOIN games g ON g.id = r.game_id"
+                    " WHERE g.guild_id IS NOT NULL"
+                    " GROUP BY g.guild_id, g.game_type, r.player_id"
+                )
+        # (guild_id, game_type) -> RankIndex, nạp từ standings lần đầu được hỏi
+        self._ranks: Dict[Tuple[int, str], RankIndex] = {}
+
+    def record_game(
+        self,
+        guild_id: Optional[int],
+        game_type: str,
+        results: List[PlayerResult],
+        ended_at: Optional[float] = None,
+    ) -> int:
+        """Ghi kết quả một game (một transaction cho cả game). Trả về id của game.
+
+        Chạy qua ``asyncio.to_thread`` (DB có thể bị worker khác khoá tới 10 s);
+        bảng xếp hạng trong bộ nhớ được cập nhật sau bằng ``apply_to_ranks``
+        trên event loop.
+        """
+        ended_at = time.time() if ended_at is None else ended_at
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO games (guild_id, game_type, player_count, ended_at)"
+                " VALUES (?, ?, ?, ?)",
+                (guild_id, game_type, len(results), ended_at),
+            )
+            game_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO results (game_id, player_id, placement, won, score)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (game_id, r.player_id, r.placement, int(r.won), r.score)
+                    for r in results
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO profiles (player_id, game_type, games, wins,"
+                " placement_sum, best_placement, score_sum, score_min, score_max,"
+                " last_played) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (player_id, game_type) DO UPDATE SET"
+                " games = games + 1,"
+                " wins = wins + excluded.wins,"
+                " placement_sum = placement_sum + excluded.placement_sum,"
+                " best_placement = MIN(best_placement, excluded.best_placement),"
+                " score_sum = score_sum + excluded.score_sum,"
+                " score_min = MIN(score_min, excluded.score_min),"
+                " score_max = MAX(score_max, excluded.score_max),"
+                " last_played = excluded.last_played",
+                [
+                    (
+                        r.player_id, game_type, int(r.won), r.placement,
+                        r.placement, r.score, r.score, r.score, ended_at,
+                    )
+                    for r in results
+                ],
+            )
+            if guild_id is not None:
+                self._conn.executemany(
+                    "INSERT INTO standings (guild_id, game_type, player_id,"
+                    " games, wins, points) VALUES (?, ?, ?, 1, ?, ?) "
+                    "ON CONFLICT (guild_id, game_type, player_id) DO UPDATE SET"
+                    " games = games + 1,"
+                    " wins = wins + excluded.wins,"
+                    " points = points + excluded.points",
+                    [
+                        (guild_id, game_type, r.player_id, int(r.won),
+                         len(results) - r.placement)
+                        for r in results
+                    ],
+                )
+        return game_id
+
+    def apply_to_ranks(
+        self,
+        game_id: int,
+        guild_id: Optional[int],
+        game_type: str,
+        results: List[PlayerResult],
+    ):
+        """Bảng xếp hạng đã nạp thì cộng dần game vừa ghi (gọi trên event loop)."""
+        index = self._ranks.get((guild_id, game_type))
+        # Nạp sau khi game được ghi thì standings đã có game này rồi
+        if index is None or game_id <= index.through:
+            return
+        for r in results:
+            index.add(r.player_id, r.won, len(results) - r.placement)
+
+    def get_profile(self, player_id: int) -> Dict[str, dict]:
+        """Thống kê trọn đời theo từng loại game: {game_type: {...}}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM profiles WHERE player_id = ?", (player_id,)
+            ).fetchall()
+        return {row["game_type"]: dict(row) for row in rows}
+
+    def rank_index(self, guild_id: int, game_type: str) -> RankIndex:
+        """Bảng xếp hạng trọn đời của guild (nạp một lần, sau đó cập nhật dần).
+
+        Lần đầu đọc SQLite → gọi qua ``asyncio.to_thread``.
+        """
+        key = (guild_id, game_type)
+        with self._lock:
+            index = self._ranks.get(key)
+            if index is None:
+                rows = self._conn.execute(
+                    "SELECT player_id, wins, points, games FROM standings"
+                    " WHERE guild_id = ? AND game_type = ?",
+                    key,
+                ).fetchall()
+                through = self._conn.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM games"
+                ).fetchone()[0]
+                index = self._ranks[key] = RankIndex(
+                    [tuple(row) for row in rows], through
+                )
+        return index
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
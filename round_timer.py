@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class RoundTimer:
+    """Bộ đếm giờ cho một vòng chơi, hỗ trợ tạm dừng / tiếp tục.
+
+    Timer chỉ dùng một ``loop.call_later`` duy nhất: khi tạm dừng thì huỷ
+    handle và đóng băng thời gian còn lại, khi tiếp tục thì đặt lại đúng
+    phần còn lại đó. Vòng lặp chờ trên ``wait()`` không cần biết có bao
+    nhiêu lần pause/resume đã xảy ra.
+    """
+
+    def __init__(self, duration: float):
+        self.duration = float(duration)
+        self.deadline: Optional[datetime] = None
+        self.paused_at: Optional[datetime] = None
+
+        self._frozen_remaining: Optional[float] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expired: Optional[asyncio.Future] = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    @property
+    def remaining(self) -> float:
+        """Số giây còn lại của vòng (đóng băng khi đang tạm dừng)."""
+        if self.paused_at is not None:
+            return self._frozen_remaining or 0.0
+        if self.deadline is None:
+            return self.duration
+        return max(0.0, (self.deadline - datetime.now()).total_seconds())
+
+    @property
+    def is_paused(self) -> bool:
+        return self.paused_at is not None
+
+    @property
+    def expired(self) -> bool:
+        return self._expired is not None and self._expired.done()
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    def start(self, remaining: Optional[float] = None):
+        """Bắt đầu đếm giờ (mặc định toàn bộ ``duration``)."""
+        if self._expired is None:
+            self._expired = asyncio.get_running_loop().create_future()
+        self._arm(self.duration if remaining is None else remaining)
+
+    def pause(self) -> bool:
+        """Đóng băng thời gian còn lại. Trả về False nếu không có gì để dừng."""
+        if self.paused_at is not None or self._expired is None or self.expired:
+            return False
+        self._frozen_remaining = self.remaining
+        self.paused_at = datetime.now()
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        return True
+
+    def resume(self) -> bool:
+        """Đặt lại đúng phần thời gian còn lại lúc tạm dừng."""
+        if self.paused_at is None:
+            return False
+        self._arm(self._frozen_remaining or 0.0)
+        return True
+
+    def finish(self):
+        """Kết thúc vòng ngay (vd: vote đã đủ đa số)."""
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        self.deadline = datetime.now()
+        self.paused_at = None
+        self._frozen_remaining = None
+        self._fire()
+
+    def cancel(self):
+        """Huỷ timer; ai đang ``wait()`` sẽ nhận CancelledError."""
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        if self._expired and not self._expired.done():
+            self._expired.cancel()
+
+    async def wait(self):
+        """Chờ đến khi hết giờ (không tính thời gian tạm dừng)."""
+        if self._expired is None:
+            self.start()
+        await self._expired
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _arm(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.deadline = datetime.now() + timedelta(seconds=seconds)
+        self.paused_at = None
+        self._frozen_remaining = None
+        if self._handle:
+            self._handle.cancel()
+        self._handle = asyncio.get_running_loop().call_later(seconds, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        if self._expired and not self._expired.done():
+            self._expired.set_result(None)
@@ -0,0 +1,267 @@
+"""Sampling profiler bật / tắt lúc bot đang chạy (``/profiler``, ``POST /profiler/...``).
+
+Dùng timer ``ITIMER_PROF`` (theo CPU time của process): mỗi ``interval`` giây
+CPU, handler SIGPROF chạy trên thread chính (thread của event loop) ngay giữa
+đoạn code đang chạy, rồi đọc stack của thread đó và của các thread khác
+(executor, Flask...) qua ``sys._current_frames()``. Không cài hook vào code nên
+khi tắt không tốn gì, khi bật chỉ tốn một lần đọc stack mỗi mẫu.
+
+Không dùng thread nền để lấy mẫu: thread đó chỉ giành được GIL khi event loop
+nhả GIL (lúc ``select``), nên gần như không bao giờ thấy code đang chạy.
+
+Mỗi mẫu được gán cho:
+
+- lệnh / round loop của cog: frame ngoài cùng nằm trong ``commands/``
+  (vd ``ArenaCommands.action_arena``, ``KRoCommands.start_round_loop``);
+- method của engine: frame trong cùng nằm trong ``games/``
+  (vd ``ArenaGame.resolve_round``, ``LiXiNgayTetGame.get_leaderboard``).
+
+Báo cáo là file zip gồm ``summary.txt`` và ``stacks.folded`` (định dạng folded
+stack, mở bằng speedscope / flamegraph.pl).
+"""
+
+import asyncio
+import io
+import os
+import signal
+import sys
+import threading
+import time
+import zipfile
+from collections import Counter
+from datetime import datetime
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+_COMMANDS_DIR = os.path.join(_ROOT, "commands") + os.sep
+_GAMES_DIR = os.path.join(_ROOT, "games") + os.sep
+
+# Frame lá của thread đang rảnh (chờ I/O / chờ việc) → không tính là bận
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("handlers.py", "dequeue"),
+    ("socketserver.py", "serve_forever"),
+}
+
+# Số dòng tối đa của mỗi bảng trong summary.txt
+_TOP = 25
+
+
+def _owner_name(code: CodeType) -> str:
+    """Tên method chứa đoạn code (listcomp / lambda được tính cho method ngoài)."""
+    return getattr(code, "co_qualname", code.co_name).split(".<locals>", 1)[0]
+
+
+def is_idle_frame(frame: FrameType) -> bool:
+    """Thread đang chờ I/O / chờ việc (frame lá là select, queue.get...)."""
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+def attribute_stack(frame: Optional[FrameType]) -> Tuple[Optional[str], Optional[str]]:
+    """(lệnh / round loop của cog, method engine) mà stack đang chạy thuộc về.
+
+    Cog: frame ngoài cùng trong ``commands/`` (điểm vào); engine: frame trong
+    cùng trong ``games/``.
+    """
+    command: Optional[str] = None
+    engine: Optional[str] = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_COMMANDS_DIR):
+            # Đi từ lá ra gốc → frame commands/ cuối cùng gặp là điểm vào
+            command = _owner_name(frame.f_code)
+        elif engine is None and filename.startswith(_GAMES_DIR):
+            engine = _owner_name(frame.f_code)
+        frame = frame.f_back
+    return command, engine
+
+
+class SamplingProfiler:
+    """Lấy mẫu stack mỗi ``interval`` giây CPU, tự dừng sau ``max_seconds``.
+
+    ``start`` / ``stop`` phải gọi trên thread chính (handler signal chỉ đặt
+    được ở đó); từ thread khác thì chuyển lời gọi sang event loop.
+    """
+
+    def __init__(self, interval: float = 0.01, max_seconds: float = 300):
+        self.interval = max(0.001, interval)
+        self.max_seconds = max_seconds
+        self.running = False
+        self.started_at: Optional[datetime] = None
+        self._started: float = 0.0
+        self._elapsed: float = 0.0
+        self._previous_handler = None
+        self._in_sample = False
+        # Hẹn giờ tự dừng trên event loop (handler signal không được print / log)
+        self._timeout: Optional[asyncio.TimerHandle] = None
+        self._reset()
+
+    def _reset(self):
+        self.auto_stopped = False
+        self.samples = 0
+        self.idle = 0
+        self.stacks: Counter = Counter()
+        self.by_command: Counter = Counter()
+        self.by_engine: Counter = Counter()
+        self.by_function: Counter = Counter()
+        self.by_thread: Counter = Counter()
+        # code object -> nhãn "qualname (file:dòng)" (tránh format lại mỗi mẫu)
+        self._labels: Dict[CodeType, str] = {}
+
+    # ------------------------------------------------------------------
+    # Start / stop
+    # ------------------------------------------------------------------
+
+    def start(self) -> Tuple[bool, str]:
+        if not hasattr(signal, "setitimer"):
+            return False, "Profiler cần signal.setitimer (Linux / macOS)"
+        if threading.current_thread() is not threading.main_thread():
+            return False, "Profiler chỉ bật được từ thread chính"
+        if self.running:
+            return False, "Profiler đang chạy rồi"
+        self._reset()
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self.running = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._timeout = loop.call_later(self.max_seconds, self._auto_stop)
+        return True, ""
+
+    def stop(self) -> Tuple[bool, str]:
+        """Dừng lấy mẫu (kể cả khi đã tự dừng); sau đó gọi ``build_report``."""
+        if self.started_at is None or self._previous_handler is None:
+            return False, "Profiler chưa chạy"
+        if threading.current_thread() is not threading.main_thread():
+            return False, "Profiler chỉ tắt được từ thread chính"
+        if self._timeout is not None:
+            self._timeout.cancel()
+            self._timeout = None
+        self._disarm()
+        # Tắt timer trước rồi mới trả handler cũ: không còn SIGPROF nào tới nữa
+        signal.signal(signal.SIGPROF, self._previous_handler)
+        self._previous_handler = None
+        return True, ""
+
+    def _auto_stop(self):
+        """Chạy trên event loop sau ``max_seconds``: dừng (nếu handler chưa dừng) và log."""
+        self._timeout = None
+        if self.running:
+            self._disarm()
+            self.auto_stopped = True
+        if self.auto_stopped:
+            print(f"⏱️ Profiler tự dừng sau {self.max_seconds:.0f} giây")
+
+    def _disarm(self):
+        if self.running:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            self.running = False
+            self._elapsed = time.perf_counter() - self._started
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def _on_signal(self, signum: int, frame: Optional[FrameType]):
+        if not self.running or self._in_sample:
+            return
+        self._in_sample = True
+        try:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            main = threading.main_thread().ident
+            if frame is not None:
+                self._sample(names.get(main, "MainThread"), frame)
+            for ident, other in sys._current_frames().items():
+                if ident != main:
+                    self._sample(names.get(ident, str(ident)), other)
+            if time.perf_counter() - self._started >= self.max_seconds:
+                # Không print ở đây: handler chen vào giữa code bất kỳ (kể cả một
+                # lần print khác) → ghi stdout lồng nhau lỗi "reentrant call".
+                # _auto_stop trên event loop sẽ log.
+                self._disarm()
+                self.auto_stopped = True
+        finally:
+            self._in_sample = False
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, thread_name: str, frame: FrameType):
+        if is_idle_frame(frame):
+            self.idle += 1
+            return
+
+        leaf = frame.f_code
+        command, engine = attribute_stack(frame)
+        codes: List[CodeType] = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+
+        self.samples += 1
+        self.by_thread[thread_name] += 1
+        self.by_function[self._label(leaf)] += 1
+        if command:
+            self.by_command[command] += 1
+        if engine:
+            self.by_engine[engine] += 1
+        folded = ";".join(self._label(code) for code in reversed(codes))
+        self.stacks[f"{thread_name};{folded}"] += 1
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def summary(self) -> str:
+        total = max(1, self.samples)
+        lines = [
+            f"Bắt đầu: {self.started_at:%Y-%m-%d %H:%M:%S}" if self.started_at else "",
+            f"Thời gian: {self._elapsed:.1f} giây | chu kỳ {self.interval * 1000:.0f} ms CPU",
+            f"Mẫu bận: {self.samples} | mẫu rảnh: {self.idle}"
+            + (" | tự dừng khi hết thời gian tối đa" if self.auto_stopped else ""),
+        ]
+
+        def table(title: str, counter: Counter):
+            lines.append("")
+            lines.append(f"== {title} ==")
+            if not counter:
+                lines.append("  (không có)")
+            for name, count in counter.most_common(_TOP):
+                lines.append(f"  {count:8d}  {count / total * 100:5.1f}%  {name}")
+
+        table("Theo thread", self.by_thread)
+        table("Theo lệnh / round loop (cog)", self.by_command)
+        table("Theo method engine", self.by_engine)
+        table("Theo hàm (self time)", self.by_function)
+        return "\n".join(lines) + "\n"
+
+    def build_report(self) -> bytes:
+        """File zip của lần chạy gần nhất (gọi sau ``stop``, chạy được ở thread khác)."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("summary.txt", self.summary())
+            zf.writestr(
+                "stacks.folded",
+                "".join(f"{stack} {count}\n" for stack, count in self.stacks.items()),
+            )
+        return buffer.getvalue()
+
+    def report_filename(self) -> str:
+        started = self.started_at or datetime.now()
+        return f"profile-{started:%Y%m%d-%H%M%S}.zip"
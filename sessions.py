@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import discord
+
+from enums import GameType
+from games.base_game import BaseGame
+
+if TYPE_CHECKING:
+    from bot import MinigameBot
+
+
+# Guild của interaction / round loop đang chạy. Task con (round loop tạo bằng
+# asyncio.create_task trong lệnh) tự kế thừa giá trị này.
+current_guild_id: ContextVar[Optional[int]] = ContextVar(
+    "current_guild_id", default=None
+)
+
+
+@dataclass
+class GameSession:
+    """Một game đang diễn ra trong một guild."""
+
+    guild_id: Optional[int]
+    game: BaseGame
+    shard_id: int = 0
+    # User của host + người chơi (dùng cho MEMBER_CACHE_POLICY=players)
+    users: Dict[int, discord.abc.User] = field(default_factory=dict)
+
+    @property
+    def game_type(self) -> Optional[GameType]:
+        return self.game.game_type
+
+
+class SessionRouter:
+    """Định tuyến game theo guild, và guild theo shard."""
+
+    def __init__(self, bot: MinigameBot):
+        self.bot = bot
+        self._sessions: Dict[Optional[int], GameSession] = {}
+
+    # ------------------------------------------------------------------
+    # Shard
+    # ------------------------------------------------------------------
+
+    def shard_for(self, guild_id: Optional[int]) -> int:
+        """Công thức shard của Discord: (guild_id >> 22) % shard_count."""
+        shard_count = self.bot.shard_count or 1
+        if guild_id is None or shard_count <= 1:
+            return 0
+        return (guild_id >> 22) % shard_count
+
+    def by_shard(self, shard_id: int) -> List[GameSession]:
+        return [s for s in self._sessions.values() if s.shard_id == shard_id]
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @property
+    def current(self) -> Optional[GameSession]:
+        return self._sessions.get(current_guild_id.get())
+
+    def get(self, guild_id: Optional[int]) -> Optional[GameSession]:
+        return self._sessions.get(guild_id)
+
+    def all(self) -> List[GameSession]:
+        return list(self._sessions.values())
+
+    def games_of(self, game_type: GameType) -> List[BaseGame]:
+        return [s.game for s in self._sessions.values() if s.game_type == game_type]
+
+    def find_guild_of_player(self, user_id: int) -> Optional[int]:
+        """Guild có game mà user đang chơi (dùng cho lệnh gọi trong DM)."""
+        for guild_id, session in self._sessions.items():
+            if user_id in session.game.players or user_id == session.game.host_id:
+                return guild_id
+        return None
+
+    def resolve_guild(self, interaction: discord.Interaction) -> Optional[int]:
+        if interaction.guild_id is not None:
+            return interaction.guild_id
+        return self.find_guild_of_player(interaction.user.id)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def set_current(self, game: Optional[BaseGame]):
+        guild_id = current_guild_id.get()
+        if game is None:
+            self.discard(guild_id)
+            return
+        session = self._sessions.get(guild_id)
+        if session and session.game is game:
+            return
+        game.guild_id = guild_id
+        self._sessions[guild_id] = GameSession(
+            guild_id=guild_id,
+            game=game,
+            shard_id=self.shard_for(guild_id),
+        )
+
+    def discard(self, guild_id: Optional[int]):
+        self._sessions.pop(guild_id, None)
+
+    @contextmanager
+    def bind(self, guild_id: Optional[int]) -> Iterator[None]:
+        """Chạy một đoạn code trong ngữ cảnh của guild (vd: task nền)."""
+        token = current_guild_id.set(guild_id)
+        try:
+            yield
+        finally:
+            current_guild_id.reset(token)
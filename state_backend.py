@@ -0,0 +1,164 @@
+"""Nơi lưu snapshot game + lease dùng chung giữa các worker."""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StateBackend:
+    """Giao diện chung cho state backend, override trong subclass.
+
+    Key là guild của game (dạng chuỗi). Lease đảm bảo mỗi game chỉ có một
+    worker xử lý vòng chơi; worker phải gia hạn lease trước khi hết hạn.
+    """
+
+    def save_game(self, key: str, blob: bytes):
+        raise NotImplementedError
+
+    def load_game(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def delete_game(self, key: str):
+        raise NotImplementedError
+
+    def list_games(self) -> List[str]:
+        raise NotImplementedError
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        """Lấy / gia hạn lease. False nếu worker khác đang giữ lease còn hạn."""
+        raise NotImplementedError
+
+    def release_lease(self, key: str, owner: str):
+        raise NotImplementedError
+
+    def lease_owner(self, key: str) -> Optional[str]:
+        """Worker đang giữ lease còn hạn (None nếu lease trống / hết hạn)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(StateBackend):
+    """Key-value trong bộ nhớ (một process), dùng để test."""
+
+    def __init__(self):
+        self._games: Dict[str, bytes] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def save_game(self, key: str, blob: bytes):
+        self._games[key] = blob
+
+    def load_game(self, key: str) -> Optional[bytes]:
+        return self._games.get(key)
+
+    def delete_game(self, key: str):
+        self._games.pop(key, None)
+
+    def list_games(self) -> List[str]:
+        return list(self._games)
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        current = self._leases.get(key)
+        if current and current[0] != owner and current[1] >= now:
+            return False
+        self._leases[key] = (owner, now + ttl)
+        return True
+
+    def release_lease(self, key: str, owner: str):
+        current = self._leases.get(key)
+        if current and current[0] == owner:
+            del self._leases[key]
+
+    def lease_owner(self, key: str) -> Optional[str]:
+        current = self._leases.get(key)
+        if current and current[1] >= time.time():
+            return current[0]
+        return None
+
+
+class SQLiteBackend(StateBackend):
+    """Backend SQLite cho nhiều worker trên cùng một máy."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " key TEXT PRIMARY KEY, blob BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def save_game(self, key: str, blob: bytes):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO games (key, blob, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                " blob = excluded.blob, updated_at = excluded.updated_at",
+                (key, blob, time.time()),
+            )
+
+    def load_game(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blob FROM games WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete_game(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM games WHERE key = ?", (key,))
+
+    def list_games(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM games").fetchall()
+        return [row[0] for row in rows]
+
+    def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        # Một câu lệnh duy nhất → atomic giữa các process
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                " owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (key, owner, now + ttl, now),
+            )
+        return cursor.rowcount == 1
+
+    def release_lease(self, key: str, owner: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+            )
+
+    def lease_owner(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT owner FROM leases WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_backend(name: str, path: str) -> Optional[StateBackend]:
+    """Tạo backend theo tên trong config ("" / "none" = không dùng)."""
+    if name in ("", "none"):
+        return None
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(path)
+    raise ValueError(f"STATE_BACKEND không hợp lệ: {name}")
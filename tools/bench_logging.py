@@ -0,0 +1,86 @@
+"""So sánh chi phí log trên thread gọi: FileHandler DEBUG cũ vs queue pipeline.
+
+Chạy: python tools/bench_logging.py [số record]
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_setup import JsonFormatter, LazyQueueHandler, SamplingFilter  # noqa: E402
+
+# Giống một event gateway của discord.py (payload là dict, format lười)
+PAYLOAD = {"t": "MESSAGE_CREATE", "s": 42, "op": 0, "d": {"content": "x" * 200}}
+
+
+def _run(logger: logging.Logger, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        logger.debug("Dispatching event %s: %s", i, PAYLOAD)
+    return time.perf_counter() - started
+
+
+def bench_file_handler(path: str, n: int) -> float:
+    logger = logging.getLogger("bench.old.discord.gateway")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = logging.FileHandler(path, mode="w", encoding="utf-8")
+    handler.setFormatter(
+        logging.Formatter("[{asctime}] [{levelname:<8}] {name}: {message}", style="{")
+    )
+    logger.addHandler(handler)
+    try:
+        return _run(logger, n)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def bench_queue(path: str, n: int, sample_rate: int, level: int = logging.DEBUG) -> float:
+    logger = logging.getLogger("bench.new.discord.gateway")
+    logger.propagate = False
+    logger.setLevel(level)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(["bench.new.discord.gateway"], sample_rate))
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=10 * 1024 * 1024)
+    file_handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    logger.addHandler(handler)
+    try:
+        return _run(logger, n)
+    finally:
+        logger.removeHandler(handler)
+        listener.stop()
+        file_handler.close()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        old = bench_file_handler(os.path.join(tmp, "old.log"), n)
+        new = bench_queue(os.path.join(tmp, "new.log"), n, sample_rate=1)
+        sampled = bench_queue(os.path.join(tmp, "sampled.log"), n, sample_rate=10)
+        leveled = bench_queue(
+            os.path.join(tmp, "leveled.log"), n, sample_rate=10, level=logging.INFO
+        )
+
+    print(f"{n} record DEBUG (thời gian trên thread gọi):")
+    for label, seconds in (
+        ("FileHandler (cũ)", old),
+        ("Queue, không sampling", new),
+        ("Queue, sampling 1/10", sampled),
+        ("Queue, logger ở INFO", leveled),
+    ):
+        print(f"  {label:<24} {seconds * 1000:8.1f} ms  ({seconds / n * 1e6:6.2f} µs/record)")
+
+
+if __name__ == "__main__":
+    main()
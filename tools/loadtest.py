@@ -0,0 +1,574 @@
+"""Load test end-to-end: chạy cog thật với một Discord giả (không cần token / mạng).
+
+Discord giả thay phần client mà cog dùng: ``Interaction`` (``response``,
+``followup``), ``channel.send``, ``fetch_user``, ``create_dm`` /
+``get_partial_messageable``, ``get_channel``, ``get_user``. Mọi lời gọi REST
+giả có độ trễ (``--latency-ms`` ± ``--jitter-ms``) và rate limit giống Discord:
+5 tin / 5 giây mỗi kênh, ``--global-rate`` request / giây toàn bot; bị giới hạn
+thì chờ như discord.py (đếm là một lần 429).
+
+Mỗi guild chạy một game (host, /setgamechannel, /joingame, /endregister,
+/startgame đều đi qua cog thật), sau đó driver bắn ``--rate`` lệnh / giây
+(/pick, /action_arena, /fight, /gamble, /answer, /vote) từ người chơi ngẫu nhiên.
+Mỗi lệnh chạy trong task riêng qua ``MinigameTree.interaction_check`` rồi tới
+callback của cog, giống discord.py.
+
+Chạy: python tools/loadtest.py --guilds 8 --players 2000 --rate 1000 --duration 30
+
+Auto-defer bị tắt (``AutoDeferResponse`` gọi HTTP thật); thay vào đó lệnh trả
+lời lần đầu sau 3 giây được đếm là ``expired`` (Discord sẽ trả 404).
+Cài đặt game được gán thẳng (không mô phỏng modal /settinggame).
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import traceback
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# File SQLite của bot để trong thư mục tạm (phải đặt trước khi import config)
+_TMP = tempfile.mkdtemp(prefix="minigame-loadtest-")
+os.environ.setdefault("PROFILE_DB_PATH", os.path.join(_TMP, "profiles.db"))
+os.environ.setdefault("SNAPSHOT_DB_PATH", os.path.join(_TMP, "snapshots.db"))
+os.environ.setdefault("STATE_BACKEND", "")
+
+import discord  # noqa: E402
+from discord import app_commands  # noqa: E402
+
+import config  # noqa: E402
+from bot import MinigameBot  # noqa: E402
+from enums import GameState, GameType  # noqa: E402
+from game_registry import CORE_EXTENSIONS  # noqa: E402
+
+# Discord chỉ cho 3 giây để trả lời interaction lần đầu
+INTERACTION_DEADLINE = 3.0
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+# ----------------------------------------------------------------------
+# REST giả: độ trễ + rate limit
+# ----------------------------------------------------------------------
+
+
+class FakeRest:
+    """Mô phỏng độ trễ REST và rate limit (cửa sổ cố định theo bucket)."""
+
+    def __init__(self, latency: float, jitter: float, global_rate: int):
+        self.latency = latency
+        self.jitter = jitter
+        # bucket -> (giới hạn, số giây của cửa sổ)
+        self.limits: Dict[str, Tuple[int, float]] = {"global": (global_rate, 1.0)}
+        self._windows: Dict[str, Tuple[float, int]] = {}
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.rate_limited: Dict[str, int] = defaultdict(int)
+        self.waited = 0.0
+
+    async def _acquire(self, bucket: str, limit: int, per: float):
+        while True:
+            now = time.monotonic()
+            started, count = self._windows.get(bucket, (now, 0))
+            if now - started >= per:
+                started, count = now, 0
+            if count < limit:
+                self._windows[bucket] = (started, count + 1)
+                return
+            # 429: discord.py chờ tới khi bucket reset rồi gửi lại
+            self.rate_limited[bucket.split(":", 1)[0]] += 1
+            delay = started + per - now
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+    async def call(self, route: str, bucket: Optional[str] = None, limited: bool = True):
+        self.calls[route] += 1
+        if limited:
+            await self._acquire("global", *self.limits["global"])
+            if bucket:
+                await self._acquire(bucket, 5, 5.0)
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+
+
+# ----------------------------------------------------------------------
+# Đối tượng Discord giả
+# ----------------------------------------------------------------------
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+        self.dm_channel = None
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content: Optional[str]):
+        self.id = next(_snowflakes)
+        self.channel = channel
+        self.content = content
+
+    async def edit(self, **kwargs):
+        await self.channel.rest.call("message.edit", f"channel:{self.channel.id}")
+        self.content = kwargs.get("content", self.content)
+        return self
+
+    async def delete(self, *, delay: Optional[float] = None):
+        if delay:
+            await asyncio.sleep(delay)
+        await self.channel.rest.call("message.delete", f"channel:{self.channel.id}")
+
+    async def pin(self, **kwargs):
+        await self.channel.rest.call("message.pin", f"channel:{self.channel.id}")
+
+    async def unpin(self, **kwargs):
+        await self.channel.rest.call("message.unpin", f"channel:{self.channel.id}")
+
+
+class FakeChannel:
+    def __init__(self, rest: FakeRest, channel_id: int, name: str):
+        self.rest = rest
+        self.id = channel_id
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+        self.sent = 0
+
+    async def send(self, content: Optional[str] = None, **kwargs) -> FakeMessage:
+        await self.rest.call("channel.send", f"channel:{self.id}")
+        self.sent += 1
+        return FakeMessage(self, content)
+
+
+class FakeResponse:
+    """``interaction.response``: ghi lại thời điểm trả lời lần đầu."""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._parent = interaction
+        self._done = False
+        self.content: Optional[str] = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, content: Optional[str] = None):
+        if self._done:
+            raise discord.InteractionResponded(self._parent)
+        self._done = True
+        self.content = content
+        await self._parent.rest.call("interaction.callback", limited=False)
+        self._parent.acked_at = time.perf_counter()
+
+    async def send_message(self, content: Optional[str] = None, **kwargs):
+        await self._respond(None if content is None else str(content))
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def edit_message(self, **kwargs):
+        await self._respond(kwargs.get("content"))
+
+    async def send_modal(self, modal):
+        await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._parent = interaction
+
+    async def send(self, content: Optional[str] = None, *, wait: bool = False, **kwargs):
+        await self._parent.rest.call("webhook.send", f"webhook:{self._parent.id}")
+        if wait:
+            return FakeMessage(self._parent.channel, content)
+        return None
+
+
+class FakeInteraction:
+    def __init__(
+        self,
+        client: MinigameBot,
+        rest: FakeRest,
+        command: app_commands.Command,
+        user: FakeUser,
+        guild_id: int,
+        channel: FakeChannel,
+    ):
+        self.id = next(_snowflakes)
+        self.client = client
+        self.rest = rest
+        self.command = command
+        self.user = user
+        self.guild_id = guild_id
+        self.channel = channel
+        self.channel_id = channel.id
+        self.extras: dict = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = time.perf_counter()
+        self.acked_at: Optional[float] = None
+
+    async def delete_original_response(self):
+        await self.rest.call("interaction.delete", f"webhook:{self.id}")
+
+    async def edit_original_response(self, **kwargs):
+        await self.rest.call("interaction.edit", f"webhook:{self.id}")
+
+
+# ----------------------------------------------------------------------
+# Gắn Discord giả vào bot
+# ----------------------------------------------------------------------
+
+
+class FakeDiscord:
+    """Registry user / kênh; thay các method client của bot bằng bản giả."""
+
+    def __init__(self, bot: MinigameBot, rest: FakeRest):
+        self.bot = bot
+        self.rest = rest
+        self.users: Dict[int, FakeUser] = {}
+        self.channels: Dict[int, FakeChannel] = {}
+
+        bot.get_user = self.users.get
+        bot.get_channel = self.channels.get
+        bot.fetch_user = self.fetch_user
+        bot.create_dm = self.create_dm
+        bot.get_partial_messageable = self.get_partial_messageable
+
+    def new_user(self, name: str) -> FakeUser:
+        user = FakeUser(next(_snowflakes), name)
+        self.users[user.id] = user
+        return user
+
+    def new_channel(self, name: str) -> FakeChannel:
+        channel = FakeChannel(self.rest, next(_snowflakes), name)
+        self.channels[channel.id] = channel
+        return channel
+
+    async def fetch_user(self, user_id: int) -> FakeUser:
+        await self.rest.call("user.fetch")
+        return self.users[user_id]
+
+    async def create_dm(self, user) -> FakeChannel:
+        await self.rest.call("dm.create")
+        return self.new_channel(f"dm-{user.id}")
+
+    def get_partial_messageable(self, channel_id: int, **kwargs) -> FakeChannel:
+        return self.channels[channel_id]
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+
+class CommandStats:
+    def __init__(self):
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+        self.expired = 0
+        self.ack: List[float] = []
+        self.total: List[float] = []
+        self.first_error: Optional[str] = None
+        self.reasons: Counter = Counter()
+
+
+class Guild:
+    def __init__(self, guild_id: int, game_type: GameType, channel: FakeChannel):
+        self.id = guild_id
+        self.game_type = game_type
+        self.channel = channel
+        self.host: Optional[FakeUser] = None
+        self.players: List[FakeUser] = []
+        # J Cơ: người còn phải /answer trong vòng ``answer_round``
+        self.to_answer: List[FakeUser] = []
+        self.alive: List[FakeUser] = []
+        self.answer_round: Optional[int] = None
+
+
+class LoadDriver:
+    def __init__(self, bot: MinigameBot, fake: FakeDiscord):
+        self.bot = bot
+        self.fake = fake
+        self.stats: Dict[str, CommandStats] = defaultdict(CommandStats)
+        self.pending: set = set()
+
+    async def invoke(self, guild: Guild, user: FakeUser, name: str, **kwargs):
+        """Chạy một slash command qua tree check + callback thật của cog."""
+        command = self.bot.tree.get_command(name)
+        stats = self.stats[name]
+        stats.calls += 1
+        if command is None:
+            stats.errors += 1
+            stats.first_error = stats.first_error or f"/{name} chưa được nạp"
+            return
+        interaction = FakeInteraction(
+            self.bot, self.fake.rest, command, user, guild.id, guild.channel
+        )
+        try:
+            if await self.bot.tree.interaction_check(interaction):
+                await command.callback(command.binding, interaction, **kwargs)
+        except Exception:
+            stats.errors += 1
+            stats.first_error = stats.first_error or traceback.format_exc()
+        finally:
+            await self.bot.on_app_command_completion(interaction, command)
+
+        finished = time.perf_counter()
+        stats.total.append(finished - interaction.created_at)
+        if interaction.acked_at is not None:
+            ack = interaction.acked_at - interaction.created_at
+            stats.ack.append(ack)
+            if ack > INTERACTION_DEADLINE:
+                stats.expired += 1
+        content = interaction.response.content
+        if content and content.startswith("❌"):
+            stats.rejected += 1
+            stats.reasons[content] += 1
+
+    def spawn(self, guild: Guild, user: FakeUser, name: str, **kwargs):
+        # Mỗi interaction một task (giống discord.py) → ContextVar guild riêng
+        task = asyncio.create_task(self.invoke(guild, user, name, **kwargs))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    async def setup_guild(self, guild: Guild, players: int):
+        fake = self.fake
+        guild.host = fake.new_user(f"host-{guild.id % 1000}")
+        guild.players = [fake.new_user(f"p{guild.id % 1000}-{i}") for i in range(players)]
+
+        await self.invoke(guild, guild.host, "host", game_type=guild.game_type.value)
+        game = self.bot.sessions.get(guild.id).game
+        # /settinggame là modal → gán thẳng: không giới hạn số người, vòng ngắn nhất
+        game.settings["player_limit"] = None
+        await self.invoke(guild, guild.host, "setgamechannel", channel=guild.channel)
+        await self.invoke(guild, guild.host, "setnotifchannel", channel=guild.channel)
+        await asyncio.gather(
+            *(self.invoke(guild, user, "joingame") for user in guild.players)
+        )
+        await self.invoke(guild, guild.host, "endregister")
+        await self.invoke(guild, guild.host, "startgame")
+
+    # ------------------------------------------------------------------
+    # Steady state
+    # ------------------------------------------------------------------
+
+    def random_call(self, guild: Guild) -> Tuple[FakeUser, str, dict]:
+        user = random.choice(guild.players)
+        other = random.choice(guild.players)
+        if guild.game_type == GameType.KRO:
+            return user, "pick", {"number": random.randint(0, 100)}
+        if guild.game_type == GameType.JCO:
+            return self._jco_call(guild, user, other)
+        if guild.game_type == GameType.ARENA:
+            action = random.choice(["attack", "defend", "charge", "none"])
+            return user, "action_arena", {
+                "action": app_commands.Choice(name=action, value=action),
+                "target": other if action == "attack" else None,
+            }
+        if guild.game_type == GameType.CHEN_THANH:
+            action = random.choice(["contribute", "steal"])
+            return user, "action_chenthanh", {
+                "action": app_commands.Choice(name=action, value=action),
+            }
+        if random.random() < 0.5:
+            return user, "fight", {"opponent": other, "bet": random.randint(1, 50)}
+        return user, "gamble", {"bet": random.randint(1, 20), "count": random.randint(1, 3)}
+
+    def _jco_call(self, guild: Guild, user: FakeUser, other: FakeUser) -> Tuple[FakeUser, str, dict]:
+        """J Cơ loại ai không /answer đúng số mỗi vòng → mỗi vòng cho từng người
+        còn sống /answer (đúng số) trước, rồi mới /vote (từ vòng 2), để game không
+        chết sau vòng 1."""
+        session = self.bot.sessions.get(guild.id)
+        game = session.game if session else None
+        if game is None or game.state != GameState.RUNNING:
+            return user, "vote", {"player": other}
+        if guild.answer_round != game.current_round:
+            guild.answer_round = game.current_round
+            eliminated = set(game.eliminated)
+            guild.alive = [
+                p for p in guild.players if p.id in game.players and p.id not in eliminated
+            ]
+            guild.to_answer = [p for p in guild.alive if p.id != game.jco_id]
+            random.shuffle(guild.to_answer)
+        if guild.to_answer:
+            user = guild.to_answer.pop()
+            return user, "answer", {"number": game.players[user.id]["number"]}
+        if not guild.alive:
+            return user, "vote", {"player": other}
+        if game.current_round < 1:
+            # Vòng đầu chưa được vote → gửi lại câu trả lời
+            user = random.choice(guild.alive)
+            if user.id != game.jco_id:
+                return user, "answer", {"number": game.players[user.id]["number"]}
+        return random.choice(guild.alive), "vote", {"player": random.choice(guild.alive)}
+
+    async def run(self, guilds: List[Guild], rate: int, duration: float):
+        tick = 0.01
+        started = time.monotonic()
+        budget = 0.0
+        while time.monotonic() - started < duration:
+            budget += rate * tick
+            for _ in range(int(budget)):
+                guild = random.choice(guilds)
+                user, name, kwargs = self.random_call(guild)
+                self.spawn(guild, user, name, **kwargs)
+            budget -= int(budget)
+            await asyncio.sleep(tick)
+        if self.pending:
+            await asyncio.wait(set(self.pending), timeout=30)
+
+    # ------------------------------------------------------------------
+    # Report
+    # ------------------------------------------------------------------
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'lệnh':<16}{'gọi':>8}{'/giây':>9}{'❌':>7}{'lỗi':>6}{'>3s':>6}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        ]
+        for name, s in sorted(self.stats.items(), key=lambda item: -item[1].calls):
+            lines.append(
+                f"/{name:<15}{s.calls:>8}{s.calls / elapsed:>9.1f}{s.rejected:>7}"
+                f"{s.errors:>6}{s.expired:>6}"
+                + "".join(
+                    f"{_percentile(s.ack, q) * 1000:>9.1f}" for q in (0.5, 0.95, 0.99)
+                )
+                + f"{max(s.ack, default=0) * 1000:>9.1f}"
+            )
+        rest = self.fake.rest
+        lines.append("")
+        lines.append(
+            "REST: " + ", ".join(f"{route}={n}" for route, n in sorted(rest.calls.items()))
+        )
+        lines.append(
+            "429: " + (", ".join(f"{b}={n}" for b, n in rest.rate_limited.items()) or "0")
+            + f" (tổng thời gian chờ {rest.waited:.1f} s)"
+        )
+        for name, s in self.stats.items():
+            if s.reasons:
+                reason, count = s.reasons.most_common(1)[0]
+                lines.append(f"❌ /{name} thường gặp nhất ({count}): {reason}")
+        for name, s in self.stats.items():
+            if s.first_error:
+                lines.append(f"\nLỗi đầu tiên của /{name}:\n{s.first_error}")
+        return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+
+
+_GAMES = {
+    "kro": GameType.KRO,
+    "jco": GameType.JCO,
+    "arena": GameType.ARENA,
+    "chenthanh": GameType.CHEN_THANH,
+    "lixi": GameType.LI_XI_NGAY_TET,
+}
+
+
+def _patch_round_seconds(seconds: float):
+    """Rút ngắn vòng chơi (chỉ trong process load test)."""
+    from games.arena_game import ArenaGame
+    from games.chen_thanh_game import ChenThanhGame
+    from games.jco_game import JCoGame
+    from games.kro_game import KRoGame
+
+    for cls in (ArenaGame, ChenThanhGame, JCoGame, KRoGame):
+        cls.interval_seconds = property(lambda self: seconds)
+
+
+async def main_async(args):
+    config.AUTO_DEFER_MS = 0
+    if args.round_seconds:
+        _patch_round_seconds(args.round_seconds)
+
+    bot = MinigameBot()
+    rest = FakeRest(args.latency_ms / 1000, args.jitter_ms / 1000, args.global_rate)
+    fake = FakeDiscord(bot, rest)
+    for name in CORE_EXTENSIONS:
+        await bot.games.load_extension(name)
+    if bot.watchdog:
+        bot.watchdog.start()
+
+    game_types = [_GAMES[name.strip()] for name in args.games.split(",") if name.strip()]
+    guilds = [
+        Guild(next(_snowflakes), game_types[i % len(game_types)], fake.new_channel(f"game-{i}"))
+        for i in range(args.guilds)
+    ]
+    per_guild = max(2, args.players // len(guilds))
+
+    setup_started = time.perf_counter()
+    driver = LoadDriver(bot, fake)
+    await asyncio.gather(*(driver.setup_guild(guild, per_guild) for guild in guilds))
+    running = sum(
+        1 for guild in guilds
+        if (session := bot.sessions.get(guild.id)) and session.game.state == GameState.RUNNING
+    )
+    print(
+        f"Setup: {len(guilds)} guild, {per_guild * len(guilds)} người chơi, "
+        f"{running} game đang chạy ({time.perf_counter() - setup_started:.1f} s)"
+    )
+
+    started = time.perf_counter()
+    await driver.run(guilds, args.rate, args.duration)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"\n{args.rate} lệnh / giây trong {args.duration:.0f} s, "
+        f"lệnh cuối cùng xong sau {elapsed:.1f} s:"
+    )
+    print(driver.report(elapsed))
+    if bot.watchdog:
+        lag = bot.watchdog.as_dict()
+        print(f"\nĐộ trễ event loop (ms): {lag['lag_ms']}, bị chặn {lag['blocked_total']} lần")
+        for tag, count in lag["offenders"].items():
+            print(f"  {count:5d}  {tag}")
+        bot.watchdog.stop()
+
+    for session in bot.sessions.all():
+        if session.game.round_task:
+            session.game.round_task.cancel()
+    bot.profiles.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=8)
+    parser.add_argument("--players", type=int, default=2000, help="tổng số người chơi")
+    parser.add_argument("--rate", type=int, default=1000, help="số lệnh / giây")
+    parser.add_argument("--duration", type=float, default=30, help="số giây chạy tải")
+    parser.add_argument("--games", default="kro,jco,arena,lixi")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--global-rate", type=int, default=50, help="REST request / giây")
+    parser.add_argument(
+        "--round-seconds", type=float, default=10, help="độ dài vòng (0 = theo cài đặt game)"
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,72 @@
-from flask import Flask
+import asyncio
+import hmac
+import io
+
+from flask import Flask, jsonify, request, send_file
 from threading import Thread
 
+import config
+
 app = Flask('')
+_bot = None
+
 @app.route('/')
 def home():
   return "Your Bot is online"
 
-def run():
-  app.run(host='0.0.0.0',port=8080)
+@app.route('/metrics')
+def metrics():
+  if _bot is None:
+    return jsonify({"shards": []})
+  try:
+    shards = _bot.shard_stats()
+    auto_defer = _bot.defer_stats.as_dict()
+    loop = _bot.watchdog.as_dict() if _bot.watchdog else None
+  except RuntimeError:
+    # Dict của bot đổi kích thước giữa chừng (đọc từ thread khác) → thử lại sau
+    return jsonify({"error": "busy"}), 503
+  return jsonify({
+    "shards": shards,
+    "dm": dict(_bot.dm.stats),
+    "auto_defer": auto_defer,
+    "loop": loop,
+  })
+
+def _on_loop(func):
+  """Chạy func trên event loop của bot (profiler chỉ bật / tắt được ở thread chính)."""
+  async def call():
+    return func()
+  return asyncio.run_coroutine_threadsafe(call(), _bot.loop).result(timeout=10)
+
+@app.route('/profiler/<action>', methods=['POST'])
+def profiler(action):
+  token = config.PROFILER_TOKEN
+  given = request.headers.get('X-Profiler-Token', '')
+  # So sánh thời gian hằng để không lộ token qua thời gian phản hồi
+  if _bot is None or not token or not hmac.compare_digest(given.encode(), token.encode()):
+    return jsonify({"error": "forbidden"}), 403
+  if action == 'start':
+    success, error = _on_loop(_bot.profiler.start)
+    if not success:
+      return jsonify({"error": error}), 409
+    return jsonify({"started": True})
+  if action == 'stop':
+    success, error = _on_loop(_bot.profiler.stop)
+    if not success:
+      return jsonify({"error": error}), 409
+    return send_file(
+      io.BytesIO(_bot.profiler.build_report()),
+      mimetype='application/zip',
+      as_attachment=True,
+      download_name=_bot.profiler.report_filename(),
+    )
+  return jsonify({"error": "unknown action"}), 404
+
+def run(port=8080):
+  app.run(host='0.0.0.0',port=port)
 
-def keep_alive():
-  t = Thread(target=run)
-  t.start()
\ No newline at end of file
+def keep_alive(bot=None, port=8080):
+  global _bot
+  _bot = bot
+  t = Thread(target=run, args=(port,))
+  t.start()